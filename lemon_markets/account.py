@@ -79,12 +79,12 @@ class Account(_ApiClient):
         res = self._request('account')['results']
 
         for property in ['account_id', 'firstname', 'lastname', 'email', 'phone', 'address', 'billing_address', 'billing_email', 'billing_name', 'billing_vat', 'mode', 'deposit_id', 'client_id', 'iban_brokerage', 'iban_origin', 'bank_name_origin', 'trading_plan', 'data_plan']:
-            self[property] = res[property]
+            setattr(self, property, res[property])
         
         for property in ['balance', 'cash_to_invest', 'cash_to_withdraw', 'tax_allowance']:
-            self[property] = float(res[property])
+            setattr(self, property, float(res[property]))
         
         for property in ['tax_allowance_start', 'tax_allowance_end']:
-            self[property] = date.fromisoformat(res[property])
+            setattr(self, property, date.fromisoformat(res[property]))
 
         self.created_at = parse_datetime(res['created_at'])
@@ -0,0 +1,9 @@
+"""
+Benchmarks of the hot paths of the SDK.
+
+Run them with `python -m lemon_markets.benchmarks`. The results are printed as json
+to track regressions across releases.
+"""
+from .suite import BENCHMARKS, Environment, run
+
+__all__ = ['BENCHMARKS', 'Environment', 'run']
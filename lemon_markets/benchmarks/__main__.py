@@ -0,0 +1,42 @@
+"""Run the benchmarks from the command line: `python -m lemon_markets.benchmarks --help`."""
+import argparse
+import json
+import sys
+
+from .suite import BENCHMARKS, run
+
+
+def main(argv=None):
+    """
+    Run the benchmarks and print or write the results.
+
+    Parameters
+    ----------
+    argv : List[str], optional
+        The command line arguments, by default those of the process
+
+    """
+    parser = argparse.ArgumentParser(prog='python -m lemon_markets.benchmarks',
+                                     description='Benchmark the SDK and print the results as json.')
+    parser.add_argument('names', nargs='*', metavar='benchmark',
+                        help=f'the benchmarks to run, by default all of: {", ".join(BENCHMARKS)}')
+    parser.add_argument('--cassette', help='replay a recorded cassette instead of starting a fake server')
+    parser.add_argument('--latency', type=float, default=0, help='simulated latency of every response in seconds')
+    parser.add_argument('--quick', action='store_true', help='run smaller benchmarks')
+    parser.add_argument('--output', help='write the results to this file instead of stdout')
+    args = parser.parse_args(argv)
+
+    try:
+        report = run(args.names or None, args.cassette, args.quick, args.latency)
+    except KeyError as e:
+        parser.error(e.args[0])
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
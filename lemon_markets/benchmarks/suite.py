@@ -0,0 +1,383 @@
+"""The benchmarks and the environment they run in."""
+import gc
+import json
+import platform
+import subprocess
+import sys
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from statistics import mean, median
+from time import perf_counter
+from typing import Callable, Dict, Iterable, List
+
+from lemon_markets import __version__
+from lemon_markets.account import Account
+from lemon_markets.client import Client
+from lemon_markets.helpers.api_client import _ApiClient
+from lemon_markets.helpers.cassette import Cassette
+from lemon_markets.helpers.fake_server import FakeServer
+
+BENCHMARKS: Dict[str, Callable[['Environment'], dict]] = {}
+
+IMPORTED_MODULES = ('lemon_markets', 'lemon_markets.client', 'lemon_markets.instrument', 'lemon_markets.order',
+                    'lemon_markets.market_data')
+# dependencies that are only imported when they are used
+LAZY_DEPENDENCIES = ('pandas', 'pyarrow', 'dateutil', 'pytz')
+
+
+class Environment:
+    """
+    The client and data the benchmarks run against.
+
+    Parameters
+    ----------
+    cassette : str, optional
+        A cassette recorded from the API to replay, by default `None` (a :class:`FakeServer` is started)
+    quick : bool, optional
+        Whether to run smaller benchmarks, e.g. for tests, by default `False`
+    latency : float, optional
+        The simulated latency of every response in seconds, by default `0`
+
+    Attributes
+    ----------
+    client : Client
+        The client making the requests
+    source : str
+        `fake_server` or the path of the cassette
+    quick : bool
+        Whether to run smaller benchmarks
+
+    """
+
+    def __init__(self, cassette: str = None, quick: bool = False, latency: float = 0):
+        """Start the fake server or load the cassette, and create the client."""
+        self.quick = quick
+        self.server = None
+        if cassette is None:
+            self.server = FakeServer(latency=latency, instruments=200 if quick else 2000,
+                                     orders=100 if quick else 1000, positions=20).start()
+            self.client = Client('benchmark', base_url=self.server.url)
+            self.source = 'fake_server'
+        else:
+            self.client = Client('benchmark', cassette=Cassette(cassette, latency=latency or None))
+            self.source = cassette
+        self.account = Account(self.client)
+        self.api = _ApiClient(client=self.client)
+
+    def close(self):
+        """Close the client and stop the fake server."""
+        self.client.close()
+        if self.server is not None:
+            self.server.stop()
+
+    def __enter__(self) -> 'Environment':
+        """Return the environment, which is closed when the block exits."""
+        return self
+
+    def __exit__(self, *exc):
+        """Close the environment."""
+        self.close()
+
+    def scale(self, full: int, quick: int) -> int:
+        """Pick the size of a benchmark."""
+        return quick if self.quick else full
+
+
+def benchmark(fn: Callable[[Environment], dict]) -> Callable[[Environment], dict]:
+    """Register a benchmark under the name of its function."""
+    BENCHMARKS[fn.__name__] = fn
+    return fn
+
+
+def timings(fn: Callable[[], object], repeat: int) -> dict:
+    """
+    Time repeated calls of a function.
+
+    Parameters
+    ----------
+    fn : Callable[[], object]
+        The function
+    repeat : int
+        The number of calls
+
+    Returns
+    -------
+    dict
+        The `min`, `mean` and `median` seconds of a call
+
+    """
+    seconds = []
+    for _ in range(repeat):
+        started = perf_counter()
+        fn()
+        seconds.append(perf_counter() - started)
+    return {'min': min(seconds), 'mean': mean(seconds), 'median': median(seconds)}
+
+
+def bytes_per_object(create: Callable[[int], list], count: int) -> float:
+    """
+    Measure the memory held by objects.
+
+    Parameters
+    ----------
+    create : Callable[[int], list]
+        Creates a list of `count` objects
+    count : int
+        The number of objects
+
+    Returns
+    -------
+    float
+        The bytes allocated per object that are still held after creating them
+
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        objects = create(count)
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert len(objects) == count
+    return (after - before) / count
+
+
+def import_module_fresh(module: str) -> dict:
+    """
+    Import a module in a new interpreter.
+
+    Parameters
+    ----------
+    module : str
+        The name of the module
+
+    Returns
+    -------
+    dict
+        The `seconds` the import took and the :data:`LAZY_DEPENDENCIES` it imported as `lazy_dependencies`
+
+    """
+    code = ('import json, sys, time; started = time.perf_counter(); import {module}; '
+            'print(json.dumps([time.perf_counter() - started, [m for m in {lazy!r} if m in sys.modules]]))')
+    output = subprocess.run([sys.executable, '-c', code.format(module=module, lazy=LAZY_DEPENDENCIES)], check=True,
+                            capture_output=True, text=True).stdout
+    seconds, lazy = json.loads(output)
+    return {'seconds': seconds, 'lazy_dependencies': lazy}
+
+
+def _instrument_data(env: Environment):
+    from lemon_markets.instrument import Instrument
+
+    results = env.api._request_paged('instruments/')
+    venues = {venue['mic']: venue for venue in env.api._request('venues/')['results']}
+    return Instrument, results, venues
+
+
+def _ohlc_bars(count: int) -> List[dict]:
+    start = datetime(2021, 1, 1, tzinfo=timezone.utc)
+    return [{'isin': 'DE0000000001', 'mic': 'XMUN', 'o': 100.0 + i % 7, 'h': 101.0 + i % 7, 'l': 99.0 + i % 7,
+             'c': 100.5 + i % 7, 't': (start + timedelta(minutes=i)).isoformat()} for i in range(count)]
+
+
+@benchmark
+def import_time(env: Environment) -> dict:
+    """Seconds to import the modules of the SDK in a fresh interpreter, and the lazy dependencies it imported."""
+    results = {}
+    for module in IMPORTED_MODULES:
+        seconds = []
+        for _ in range(env.scale(5, 2)):
+            imported = import_module_fresh(module)
+            seconds.append(imported['seconds'])
+        results[module] = {'seconds': min(seconds), 'lazy_dependencies_imported': imported['lazy_dependencies']}
+    return results
+
+
+@benchmark
+def request_overhead(env: Environment) -> dict:
+    """Seconds per GET request made by the SDK, compared to the same request with the bare session."""
+    url = env.api._endpoint + 'venues/'
+    headers = env.client._auth_header()
+    repeat = env.scale(500, 50)
+    bare = timings(lambda: env.client._session.get(url, headers=headers).json(), repeat)
+    sdk = timings(lambda: env.api._request('venues/'), repeat)
+    return {'bare': bare, 'sdk': sdk, 'overhead_seconds': sdk['median'] - bare['median']}
+
+
+@benchmark
+def paged_listing(env: Environment) -> dict:
+    """Throughput of listing all instruments, as raw pages and as :class:`Instrument` objects."""
+    from lemon_markets.instrument import Instruments
+
+    results = {}
+    for concurrency in (1, env.client._page_concurrency):
+        started = perf_counter()
+        count = len(env.api._request_paged('instruments/', concurrency=concurrency))
+        seconds = perf_counter() - started
+        results[f'pages_concurrency_{concurrency}'] = {'results': count, 'seconds': seconds,
+                                                       'results_per_second': count / seconds}
+    started = perf_counter()
+    count = len(Instruments(env.account).list_instruments())
+    seconds = perf_counter() - started
+    results['list_instruments'] = {'results': count, 'seconds': seconds, 'results_per_second': count / seconds}
+    return results
+
+
+@benchmark
+def instrument_from_response(env: Environment) -> dict:
+    """Seconds to build an :class:`Instrument` from response data with known venues."""
+    Instrument, results, venues = _instrument_data(env)
+
+    def build():
+        for data in results:
+            Instrument._from_response(env.account, data, venues)
+
+    seconds = timings(build, env.scale(5, 2))
+    return {'instruments': len(results), 'seconds_per_instrument': seconds['min'] / len(results)}
+
+
+@benchmark
+def instrument_search(env: Environment) -> dict:
+    """Seconds to build a :class:`SearchIndex` of all instruments and to answer typical autocomplete queries."""
+    from lemon_markets.helpers.search_index import SearchIndex
+
+    _, results, _ = _instrument_data(env)
+    index = SearchIndex()
+    started = perf_counter()
+    index.update(results)
+    build = perf_counter() - started
+    sample = results[len(results) // 2]
+    queries = {'isin': sample['isin'], 'isin_prefix': sample['isin'][:8], 'wkn': sample['wkn'],
+               'name_prefix': sample['name'][:4], 'name': sample['name'], 'typo': sample['title'][1:]}
+    index.search(queries['typo'])
+    repeat = env.scale(200, 20)
+    return {'instruments': len(index), 'build_seconds': build,
+            'query_seconds': {name: timings(lambda: index.search(query, limit=10), repeat)['median']
+                              for name, query in queries.items()}}
+
+
+@benchmark
+def instrument_dataframe(env: Environment) -> dict:
+    """Seconds to build a DataFrame of all instruments from response data, directly and via :class:`Instrument`."""
+    import pandas
+
+    from lemon_markets.helpers.instrument_table import instruments_dataframe
+
+    Instrument, results, venues = _instrument_data(env)
+
+    def from_instruments():
+        instruments = [Instrument._from_response(env.account, data, venues) for data in results]
+        return pandas.DataFrame([{'isin': instrument.isin, 'wkn': instrument.wkn, 'name': instrument.name,
+                                  'title': instrument.title, 'symbol': instrument.symbol,
+                                  'type': instrument.type.value, 'mic': venue.mic, 'currency': venue.currency,
+                                  'tradable': venue.tradable}
+                                 for instrument in instruments for venue in instrument.trading_venues])
+
+    repeat = env.scale(5, 1)
+    direct = timings(lambda: instruments_dataframe(results), repeat)['min']
+    through_instruments = timings(from_instruments, repeat)['min']
+    return {'instruments': len(results), 'seconds': direct, 'through_instruments_seconds': through_instruments,
+            'speedup': through_instruments / direct}
+
+
+@benchmark
+def ohlc_dataframe(env: Environment) -> dict:
+    """Seconds to build the DataFrame returned by :meth:`OHLC.get_data` from response data."""
+    from lemon_markets.market_data import _ohlc_results
+
+    results = {}
+    for count in env.scale((10000, 100000, 1000000), (10000,)):
+        bars = _ohlc_bars(count)
+        seconds = timings(lambda: _ohlc_results(bars, None, True), env.scale(3, 1))['min']
+        results[str(count)] = {'seconds': seconds, 'bars_per_second': count / seconds}
+    return results
+
+
+@benchmark
+def fetch_orders(env: Environment) -> dict:
+    """Seconds of :meth:`Orders.fetch_orders` filling an empty order store and updating a full one."""
+    from lemon_markets.order import Orders
+    from lemon_markets.space import Spaces
+
+    orders = Orders(env.account, Spaces(env.account).list_spaces()[0])
+    results = {}
+    for run in ('empty_store', 'full_store'):
+        started = perf_counter()
+        orders.fetch_orders()
+        seconds = perf_counter() - started
+        count = sum(len(by_uuid) for by_uuid in orders.orders.values())
+        results[run] = {'orders': count, 'seconds': seconds, 'orders_per_second': count / seconds}
+    return results
+
+
+@benchmark
+def memory_per_object(env: Environment) -> dict:
+    """Bytes held per :class:`Instrument` (with venues), entry of an :class:`InstrumentList`, order and position."""
+    from lemon_markets.instrument import InstrumentList
+    from lemon_markets.order import Order
+    from lemon_markets.portfolio import Position
+
+    Instrument, results, venues = _instrument_data(env)
+    instrument = Instrument._from_response(env.account, results[0], venues)
+    order_data = {'quantity': 1, 'valid_until': 1700000000, 'side': 'buy', 'stop_price': None, 'limit_price': None,
+                  'uuid': '00000000-0000-4000-8000-000000000000', 'status': 'inactive', 'trading_venue': None}
+    position_data = {'quantity': 1, 'average_price': '1.0', 'latest_total_value': '1.0'}
+    count = min(len(results), env.scale(2000, 200))
+    return {
+        'instrument': bytes_per_object(
+            lambda n: [Instrument._from_response(env.account, data, venues) for data in results[:n]], count),
+        'instrument_compact': bytes_per_object(lambda n: InstrumentList(env.account, results[:n], venues), count),
+        'order': bytes_per_object(lambda n: [Order._from_response(instrument, dict(order_data)) for _ in range(n)],
+                                  count),
+        'position': bytes_per_object(
+            lambda n: [Position._from_response(instrument, position_data) for _ in range(n)], count),
+    }
+
+
+def run(names: Iterable[str] = None, cassette: str = None, quick: bool = False, latency: float = 0) -> dict:
+    """
+    Run benchmarks.
+
+    Parameters
+    ----------
+    names : Iterable[str], optional
+        The benchmarks to run, by default all in :data:`BENCHMARKS`
+    cassette : str, optional
+        A cassette to replay instead of starting a :class:`FakeServer`, by default `None`
+    quick : bool, optional
+        Whether to run smaller benchmarks, by default `False`
+    latency : float, optional
+        The simulated latency of every response in seconds, by default `0`
+
+    Returns
+    -------
+    dict
+        The results of every benchmark and details of the environment, serializable as json
+
+    Raises
+    ------
+    KeyError
+        A benchmark does not exist.
+
+    """
+    names = list(BENCHMARKS) if names is None else list(names)
+    for name in names:
+        if name not in BENCHMARKS:
+            raise KeyError(f'Unknown benchmark {name!r}, expected one of {", ".join(BENCHMARKS)}.')
+
+    with Environment(cassette, quick, latency) as env:
+        report = {
+            'sdk_version': __version__,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'started_at': datetime.now(timezone.utc).isoformat(),
+            'source': env.source,
+            'quick': quick,
+            'latency': latency,
+            'benchmarks': {},
+        }
+        for name in names:
+            report['benchmarks'][name] = BENCHMARKS[name](env)
+    # make sure the report is serializable before returning it
+    json.dumps(report)
+    return report
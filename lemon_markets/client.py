@@ -1,6 +1,24 @@
-from .config import _PAPER_TRADING_REST_URL, _TRADING_REST_URL
-from .helpers.api_client import _ApiClient
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
+from threading import BoundedSemaphore, Lock
+from typing import Any, Callable, Optional, Tuple, Union
+
+from .config import _PAPER_TRADING_REST_URL, _TRADING_REST_URL
+from .helpers.batch import Batch
+from .helpers.cache import ResponseCache
+from .helpers.cassette import Cassette
+from .helpers.circuit_breaker import CircuitBreaker
+from .helpers.decoding import get_decoder
+from .helpers.hedging import HedgePolicy
+from .helpers.instrument_registry import InstrumentRegistry
+from .helpers.metrics import MetricsRegistry
+from .helpers.rate_limit import RateLimiter
+from .helpers.retry import RetryPolicy
+from .helpers.session import create_async_session, create_session
+from .helpers.single_flight import AsyncSingleFlight, SingleFlight
+from .helpers.tracing import Tracer
+from .helpers.venue_lookup import VenueLookup
 
 
 class TradingType(Enum):
@@ -18,6 +36,61 @@ class Client:
         A valid authentication key.
     trading_type : TradingType, default: TradingType.PAPER
         The type of trading to use.
+    pool_connections : int, default: 10
+        The number of hosts (trading, paper-trading, data) to keep a connection pool for.
+    pool_maxsize : int, default: 10
+        The maximum number of keep-alive connections per host. Raise this if many threads share the client.
+    pool_block : bool, default: False
+        Whether to wait for a free pooled connection instead of opening an extra one when the pool is exhausted.
+    keep_alive : bool, default: True
+        Whether to reuse connections between requests.
+    http2 : bool, default: False
+        Whether to use HTTP/2, so concurrent requests share one connection per host instead of opening one each.
+        Requires `pip install lemon_markets[http2]`.
+    compression : bool, default: True
+        Whether to ask for gzip compressed responses, and brotli or zstd compressed ones if
+        `pip install lemon_markets[compression]` installed their decoders.
+    timeout : float | Tuple[float, float], default: (3.05, 30)
+        The timeout for requests in seconds. Either one value or a `(connect, read)` tuple.
+    page_concurrency : int, default: 4
+        The maximum number of pages of one listing (e.g. :meth:`Instruments.list_instruments`)
+        requested at the same time. `1` follows the pages one by one.
+    max_concurrency : int, default: 100
+        The maximum number of requests the asyncio resources (e.g. :class:`AsyncOrders`) of this client
+        have in flight at the same time.
+    rate_limiter : RateLimiter, optional
+        Limits the request rate of this client and retries throttled requests.
+        Without one, throttled requests raise immediately.
+    retry : RetryPolicy, optional
+        Retries requests that failed because of connection errors, timeouts or server errors.
+        Without one, failed requests raise immediately.
+    hedge : HedgePolicy, optional
+        Sends a duplicate of GET requests that take longer than usual and uses the first response.
+        Without one, requests are sent once per attempt.
+    circuit_breaker : CircuitBreaker, optional
+        Makes requests raise :class:`CircuitOpenError` right away while the API keeps failing,
+        instead of waiting for timeouts and retries. Without one, every request is sent.
+    cache : ResponseCache, optional
+        Caches the responses of GET requests to reference data endpoints, e.g. a :class:`MemoryCache`.
+    instrument_registry : InstrumentRegistry, optional
+        Keeps the instruments of orders and positions in memory, so each isin is only requested once,
+        by default a new registry.
+    coalesce : bool, default: True
+        Whether identical GET requests made at the same time (e.g. by several threads, or tasks of one
+        event loop) share one request.
+    json_decoder : str | Callable[[bytes], Any], optional
+        The json library (`orjson`, `ujson` or `json`) or function decoding responses.
+        By default the fastest installed library.
+    metrics : MetricsRegistry, optional
+        Collects latency and throughput metrics of the requests, by default a new registry.
+        Pass the same registry to several clients to aggregate their metrics.
+    tracer : Tracer, optional
+        Traces the calls made with this client (e.g. :meth:`Orders.fetch_orders`) and the requests they made.
+        Without one, nothing is traced.
+    cassette : Cassette, optional
+        Records the requests made with this client to a file, or replays them from it without network access.
+    base_url : str, optional
+        The url of the API, by default the one of `trading_type`. E.g. the url of a local :class:`FakeServer`.
 
     Attributes
     ----------
@@ -30,14 +103,157 @@ class Client:
     _TRADING_REST_URL: str
 
     def __init__(self, token: str,
-                 trading_type: TradingType = TRADING_TYPE_PAPER):
+                 trading_type: TradingType = TradingType.PAPER,
+                 pool_connections: int = 10,
+                 pool_maxsize: int = 10,
+                 pool_block: bool = False,
+                 keep_alive: bool = True,
+                 http2: bool = False,
+                 compression: bool = True,
+                 timeout: Union[float, Tuple[float, float]] = (3.05, 30),
+                 page_concurrency: int = 4,
+                 max_concurrency: int = 100,
+                 rate_limiter: RateLimiter = None,
+                 retry: RetryPolicy = None,
+                 hedge: HedgePolicy = None,
+                 circuit_breaker: CircuitBreaker = None,
+                 cache: ResponseCache = None,
+                 instrument_registry: InstrumentRegistry = None,
+                 coalesce: bool = True,
+                 json_decoder: Union[str, Callable[[bytes], Any]] = None,
+                 metrics: MetricsRegistry = None,
+                 tracer: Tracer = None,
+                 cassette: Cassette = None,
+                 base_url: str = None):
         self._token = token
 
-        if trading_type == 'paper':
+        trading_type = TradingType(trading_type)
+        if trading_type == TradingType.PAPER:
             self._TRADING_REST_URL = _PAPER_TRADING_REST_URL
-        elif trading_type == 'money':
+        elif trading_type == TradingType.MONEY:
             self._TRADING_REST_URL = _TRADING_REST_URL
+        if base_url is not None:
+            self._TRADING_REST_URL = base_url
+
+        # one pool for every object created from this client, so connections are kept alive between requests
+        self._session = create_session(pool_connections, pool_maxsize, pool_block, keep_alive, http2, compression)
+        if cassette is not None:
+            cassette.mount(self._session)
+        self._timeout = timeout
+        self._page_concurrency = page_concurrency
+        self._rate_limiter = rate_limiter
+        self._retry = retry
+        self._hedge = hedge
+        self._circuit_breaker = circuit_breaker
+        # hedged requests wait for the faster of two threads, started on first use
+        self._hedge_executor = None
+        self._hedge_lock = Lock()
+        # the free threads, so requests are not hedged while all of them are busy
+        self._hedge_slots = BoundedSemaphore(2 * pool_maxsize)
+        self._cache = cache
+        self._instrument_registry = instrument_registry if instrument_registry is not None else InstrumentRegistry()
+        self._single_flight = SingleFlight() if coalesce else None
+        self._coalesce = coalesce
+        self._loads = get_decoder(json_decoder)
+        self._metrics = metrics if metrics is not None else MetricsRegistry()
+        self._tracer = tracer
+        # every instrument listed with this client resolves its venues from one `venues/` request
+        self._venues = VenueLookup()
+
+        # the asyncio session is bound to an event loop, so it is only created when first awaited
+        self._pool_maxsize = pool_maxsize
+        self._keep_alive = keep_alive
+        self._http2 = http2
+        self._compression = compression
+        self._max_concurrency = max_concurrency
+        # the asyncio session, semaphore and single-flight group of every running event loop
+        self._async_resources = {}
+        self._async_lock = Lock()
+
+    def _get_hedge_executor(self) -> ThreadPoolExecutor:
+        """Return the threads sending the hedged requests of this client, starting them on first use."""
+        with self._hedge_lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(max_workers=2 * self._pool_maxsize,
+                                                          thread_name_prefix='lemon_markets_hedge')
+            return self._hedge_executor
+
+    def _get_async_resources(self) -> Tuple[Any, asyncio.Semaphore, Optional[AsyncSingleFlight]]:
+        """Return the asyncio session, semaphore and single-flight group for the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._async_lock:
+            resources = self._async_resources.get(loop)
+            if resources is None:
+                # all of them are bound to the loop they were first used in, e.g. by every `asyncio.run`
+                for closed in [other for other in self._async_resources if other.is_closed()]:
+                    del self._async_resources[closed]
+                resources = self._async_resources[loop] = (
+                    create_async_session(self._pool_maxsize, self._keep_alive, self._timeout, self._http2,
+                                         self._compression),
+                    asyncio.Semaphore(self._max_concurrency),
+                    AsyncSingleFlight() if self._coalesce else None)
+            return resources
+
+    def _get_async_session(self):
+        """Return the asyncio session of this client for the running event loop, creating it on first use."""
+        return self._get_async_resources()[0]
+
+    def _get_async_semaphore(self) -> asyncio.Semaphore:
+        """Return the semaphore bounding the in-flight asyncio requests of this client in the running event loop."""
+        return self._get_async_resources()[1]
 
+    def _get_async_single_flight(self) -> Optional[AsyncSingleFlight]:
+        """Return the group coalescing identical asyncio requests in the running event loop, `None` if disabled."""
+        return self._get_async_resources()[2]
+
+    def batch(self, concurrency: int = None) -> Batch:
+        """
+        Run many calls made with this client at the same time.
+
+        Parameters
+        ----------
+        concurrency : int, optional
+            The maximum number of calls running at the same time, by default `pool_maxsize`,
+            so every call gets a pooled connection
+
+        Returns
+        -------
+        Batch
+            The batch to submit the calls to, e.g. `batch.submit(orders.update_order, order)`
+
+        """
+        return Batch(concurrency or self._pool_maxsize)
+
+    def close(self):
+        """Close all pooled connections of this client."""
+        self._session.close()
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
+            self._hedge_executor = None
+
+    async def aclose(self):
+        """Close all pooled connections of this client, including the asyncio ones of the running event loop."""
+        self.close()
+        with self._async_lock:
+            resources = self._async_resources.pop(asyncio.get_running_loop(), None)
+        if resources is not None:
+            await resources[0].aclose()
+
+    def __enter__(self):
+        """Return the client, which is closed when the block exits."""
+        return self
+
+    def __exit__(self, *args):
+        """Close the client."""
+        self.close()
+
+    async def __aenter__(self):
+        """Return the client, which is closed when the block exits."""
+        return self
+
+    async def __aexit__(self, *args):
+        """Close the client and the async session of the running event loop."""
+        await self.aclose()
 
     @property
     def access_token(self) -> str:
@@ -54,6 +270,20 @@ class Client:
 
         return self._token
 
+    @property
+    def metrics(self) -> MetricsRegistry:
+        """
+        Latency and throughput metrics of the requests made with this client.
+
+        Returns
+        -------
+        MetricsRegistry
+            The metrics registry. Use :meth:`MetricsRegistry.snapshot` for a summary
+            or :meth:`MetricsRegistry.to_prometheus` to export it.
+
+        """
+        return self._metrics
+
     def _auth_header(self, props: dict = None) -> dict:
         """
         Return a dict with the authorization header and the data passed to `props`
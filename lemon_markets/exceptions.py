@@ -1,2 +1,26 @@
 """Exceptions raised by the SDK."""
 # TODO an exception for a wrong/expired token
+
+
+class CassetteError(Exception):
+    """A request was not recorded in the cassette it is replayed from."""
+
+
+class CircuitOpenError(Exception):
+    """
+    A request was not sent because the API host failed too often recently.
+
+    Parameters
+    ----------
+    host : str
+        The host of the request
+    retry_after : float
+        The seconds until the host is tried again
+
+    """
+
+    def __init__(self, host: str, retry_after: float):
+        """Create the error for `host`, retried after `retry_after` seconds."""
+        super().__init__(f'The circuit of {host} is open after repeated failures, retrying in {retry_after:.1f}s.')
+        self.host = host
+        self.retry_after = retry_after
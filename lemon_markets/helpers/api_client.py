@@ -1,39 +1,139 @@
 # undocumented on rtd
 
-import json
-from typing import List
-from lemon_markets.helpers.url import full_url
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
+from time import perf_counter, sleep
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests.exceptions
 
 from lemon_markets.client import Client
-from requests import request
+from lemon_markets.exceptions import CircuitOpenError
+from lemon_markets.helpers.cache import ResponseCache
+from lemon_markets.helpers.hedging import call_hedged
+from lemon_markets.helpers.metrics import endpoint_template
+from lemon_markets.helpers.request_flow import DONE, RESEND, RequestFlow
+from lemon_markets.helpers.retry import IDEMPOTENCY_HEADER
+from lemon_markets.helpers.tracing import Span, submit_in_context
+from lemon_markets.helpers.url import full_url
+
+_TRANSIENT_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+# failures of a reconcile lookup that leave open whether the failed attempt was executed
+_RECONCILE_ERRORS = _TRANSIENT_ERRORS + (requests.exceptions.HTTPError, CircuitOpenError)
 
 
 class _ApiClient:
-    def __init__(self, client: Client, endpoint: str = None):
+    def __init__(self, client: Client = None, endpoint: str = None, account=None):
+        # resources built from an account share the connection pool of its client
+        if account is not None:
+            self._account = account
+            client = account._client
         self._client = client
         self._endpoint = endpoint or self._client._TRADING_REST_URL
 
-    # TODO not tested
-    def _request_paged(self, endpoint, params=None) -> List[dict]:
-            # TODO docstring
-        # Keep requesting until there are no more pages
-        next = None
-        results = []
+    def _venue_data(self) -> Dict[str, dict]:
+        """Return a copy of the venue data keyed by mic shared by the client, to add the venues missing in it to."""
+        return dict(self._client._venues.get(self._request_paged))
 
+    def _request_paged(self, endpoint, params=None, concurrency: int = None) -> List[dict]:
+        """
+        Request all pages of a paged endpoint.
 
-        while True:
-            if next:
-                data = self._request(next, url_prefix=False)
-            else:
+        If the first page reports the number of pages, the remaining pages are
+        requested concurrently. Otherwise the `next` links are followed one by one.
+
+        Parameters
+        ----------
+        endpoint : str
+            Either relative to the endpoint or absolute.
+        params : dict, optional
+            Query parameters to send with the first request, by default `None`
+        concurrency : int, optional
+            The maximum number of pages requested at the same time, by default the
+            `page_concurrency` of the client
+
+        Returns
+        -------
+        List[dict]
+            The results of all pages, in the order of the pages.
+
+        """
+        concurrency = concurrency or self._client._page_concurrency
+        data = self._request(endpoint, params=params, page=1)
+        pages = data.get('pages') or 1
+        if concurrency < 2 or pages < 2:
+            return list(self._iter_paged(endpoint, params=params, prefetch=False, data=data))
+
+        results = list(data['results'])
+        with ThreadPoolExecutor(max_workers=min(concurrency, pages - 1)) as executor:
+            pending = [submit_in_context(executor, self._request, endpoint,
+                                         params={**(params or {}), 'page': page}, page=page)
+                       for page in range(2, pages + 1)]
+            try:
+                for page in pending:
+                    results += page.result()['results']
+            finally:
+                for page in pending:
+                    page.cancel()
+        self._client.metrics.count('pages', 'GET', endpoint, pages)
+        return results
+
+    def _iter_paged(self, endpoint, params=None, prefetch: bool = True, data: dict = None) -> Iterator[dict]:
+        """
+        Lazily iterate over the results of a paged endpoint.
+
+        Pages are only requested once the iteration reaches the page before them, so
+        stopping early skips the remaining pages. With `prefetch`, the page after the
+        one being consumed is requested in the background, so it may already have been
+        requested when the iteration stops; it is cancelled if it was not sent yet.
+
+        Parameters
+        ----------
+        endpoint : str
+            Either relative to the endpoint or absolute.
+        params : dict, optional
+            Query parameters to send with the first request, by default `None`
+        prefetch : bool, optional
+            Request the next page in the background while the current one is consumed, by default `True`.
+            Without it, no page after the one the iteration stopped in is requested.
+        data : dict, optional
+            The already requested first page, by default `None`
+
+        Yields
+        ------
+        dict
+            The results, in the order of the pages.
+
+        """
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        pending = None
+        try:
+            url = None
+            if data is None:
                 data = self._request(endpoint, params=params)
-            results += data['results']
-            if data['next'] in [None, next]:
-                break
-            else:
+            while True:
+                self._client.metrics.count('pages', 'GET', endpoint)
+                # Keep requesting until there are no more pages
                 next = data['next']
-        return results
+                if next in [None, url]:
+                    next = None
+                pending = submit_in_context(executor, self._request, next) if next and executor else None
+                yield from data['results']
+                if not next:
+                    return
+                url = next
+                data = pending.result() if pending else self._request(next)
+                pending = None
+        finally:
+            if pending is not None:
+                pending.cancel()
+            if executor:
+                executor.shutdown(wait=False)
 
-    def _request(self, endpoint, method='GET', data=None, params=None, headers=None) -> dict:
+    def _request(self, endpoint, method='GET', data=None, params=None, headers=None,
+                 idempotency_key: str = None, reconcile: Callable[[], Optional[dict]] = None,
+                 page: int = None, response_headers: dict = None) -> Optional[dict]:
         """
         Make a request to the API.
 
@@ -49,19 +149,142 @@ class _ApiClient:
             Query parameters to send with the request, by default `None`
         headers : dict, optional
             Headers to send with the request, by default `None`
+        idempotency_key : str, optional
+            A unique key identifying this request across retries, by default `None`.
+            Allows the client's retry policy to retry POST and PUT requests if it trusts idempotency keys.
+        reconcile : Callable[[], Optional[dict]], optional
+            Called before a POST or PUT request is retried, by default `None`.
+            Returns the result of an earlier attempt if it was executed despite
+            the error, which is then returned instead of retrying.
+        page : int, optional
+            The number of the page requested by a paged listing, recorded when tracing, by default `None`
+        response_headers : dict, optional
+            Filled with the headers of the response, by default `None`.
+            The request is neither coalesced with identical ones nor answered by the response cache then.
 
         Returns
         -------
         dict
-            The json response from the API.
+            The json response from the API, `None` if a conditional request (e.g. with
+            an `If-None-Match` header) was answered with `304 Not Modified`.
 
         """
         url = full_url(self._endpoint, endpoint)
-        headers = self._client._authorize(headers)
+        headers = self._client._auth_header(headers)
+        if idempotency_key:
+            headers[IDEMPOTENCY_HEADER] = idempotency_key
+        relative = url[len(self._endpoint):] if url.startswith(self._endpoint) else urlsplit(url).path
+
+        tracer = self._client._tracer
+        template = endpoint_template(relative)
+        trace = tracer.span(f'{method.upper()} {template}', 'request', method=method.upper(), endpoint=template,
+                            url=url, params=params, page=page) if tracer else nullcontext()
+        with trace as span:
+            def send():
+                return self._send(method, url, relative, data, params, headers, reconcile, span, response_headers)
+
+            flights = self._client._single_flight
+            if flights and method.upper() == 'GET' and response_headers is None:
+                return flights.do(ResponseCache.key(url, params, headers), send)
+            return send()
+
+    def _send(self, method: str, url: str, endpoint: str, data: dict, params: dict, headers: dict,
+              reconcile: Callable[[], Optional[dict]] = None, span: Span = None,
+              response_headers: dict = None) -> Optional[dict]:
+        """Send a prepared request through the cache, rate limiter and retry policy of the client."""
+        flow = RequestFlow(self._client, method, url, endpoint, params, headers, reconcile is not None, span,
+                           response_headers)
+        cached = flow.lookup()
+        if cached is not None:
+            return cached
+
+        while True:
+            flow.before_attempt()
+            try:
+                wait = flow.limit()
+                if wait:
+                    sleep(wait)
+                started = perf_counter()
+                res, content = self._fetch(method, url, endpoint, data, params, headers, span)
+            except _TRANSIENT_ERRORS as e:
+                if not flow.on_error(e):
+                    raise
+            except Exception:
+                # e.g. a broken or undecodable body
+                flow.on_failure()
+                raise
+            except BaseException:
+                flow.on_abort()
+                raise
+            else:
+                action = flow.on_response(res, perf_counter() - started, res.elapsed.total_seconds(),
+                                          _body_size(res.request.body), len(content), _wire_size(res))
+                if action == RESEND:
+                    continue
+                if action == DONE:
+                    break
+
+            sleep(flow.backoff())
+            if flow.reconciles:
+                # looked up after the backoff, so the result of an attempt processed meanwhile is found too
+                try:
+                    reconciled = reconcile()
+                except _RECONCILE_ERRORS:
+                    # whether the failed attempt was executed is unknown, so it is not sent again
+                    flow.reconcile_failed()
+                    break
+                if reconciled is not None:
+                    return flow.reconciled(reconciled)
+            flow.on_retry()
+
+        return flow.result(res.raise_for_status, data)
+
+    def _fetch(self, method: str, url: str, endpoint: str, data: dict, params: dict, headers: dict,
+               span: Span = None) -> Tuple[requests.Response, bytes]:
+        """Send one attempt of a request, hedged if the hedge policy of the client applies to it."""
+        def fetch():
+            res = self._client._session.request(method.upper(), url, data=data, params=params, headers=headers,
+                                                timeout=self._client._timeout, stream=True)
+            # decompresses the body while it arrives, leaving the compressed size readable from res.raw
+            return res, res.content
+
+        hedge = self._client._hedge
+        delay = hedge.delay(self._client.metrics, method, endpoint) if hedge else None
+        if delay is None:
+            return fetch()
+
+        def on_hedge():
+            self._client.metrics.count('hedges', method, endpoint)
+            if self._client._rate_limiter:
+                # the duplicate counts against the rate limit, but doesn't wait for it
+                self._client._rate_limiter.acquire()
+            if span is not None:
+                span.attributes['hedged'] = True
+
+        def on_abandoned(call: Future):
+            # the request was sent, so its outcome still counts for the circuit breaker and metrics
+            failed = call.exception() is not None
+            if self._client._circuit_breaker:
+                self._client._circuit_breaker.on_response(urlsplit(url).netloc,
+                                                          None if failed else call.result()[0].status_code)
+            self._client.metrics.count('hedges_abandoned', method, endpoint)
+            if failed:
+                self._client.metrics.count('errors', method, endpoint)
+
+        response, won = call_hedged(self._client._get_hedge_executor(), fetch, delay, on_hedge, on_abandoned,
+                                    self._client._hedge_slots)
+        if won:
+            self._client.metrics.count('hedge_wins', method, endpoint)
+            if span is not None:
+                span.attributes['hedge_won'] = True
+        return response
+
+
+def _wire_size(res: requests.Response) -> Optional[int]:
+    # the bytes read from the connection, unknown for adapters without a raw stream (e.g. replayed cassettes)
+    tell = getattr(res.raw, 'tell', None)
+    return tell() if tell is not None else None
 
-        res = request(method.upper(), url, data=data, params=params, headers=headers)
-        res.raise_for_status()
 
-        if method != 'DELETE':
-            data = json.loads(res.content)
-        return data
+def _body_size(body) -> int:
+    return len(body) if body else 0
@@ -0,0 +1,289 @@
+# undocumented on rtd
+
+import asyncio
+from contextlib import nullcontext
+from time import perf_counter
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests.exceptions
+
+from lemon_markets.client import Client
+from lemon_markets.exceptions import CircuitOpenError
+from lemon_markets.helpers.cache import ResponseCache
+from lemon_markets.helpers.hedging import acall_hedged
+from lemon_markets.helpers.metrics import endpoint_template
+from lemon_markets.helpers.request_flow import DONE, RESEND, RequestFlow
+from lemon_markets.helpers.retry import IDEMPOTENCY_HEADER
+from lemon_markets.helpers.tracing import Span
+from lemon_markets.helpers.url import full_url
+
+
+class _AsyncApiClient:
+    """asyncio counterpart of :class:`_ApiClient`, sharing the client's credentials and concurrency limit."""
+
+    def __init__(self, client: Client = None, endpoint: str = None, account=None):
+        if account is not None:
+            self._account = account
+            client = account._client
+        self._client = client
+        self._endpoint = endpoint or self._client._TRADING_REST_URL
+
+    async def _venue_data(self) -> Dict[str, dict]:
+        """Return a copy of the venue data keyed by mic shared by the client, to add the venues missing in it to."""
+        return dict(await self._client._venues.aget(self._request_paged))
+
+    async def _request_paged(self, endpoint, params=None, concurrency: int = None) -> List[dict]:
+        """
+        Request all pages of a paged endpoint.
+
+        If the first page reports the number of pages, the remaining pages are
+        requested concurrently. Otherwise the `next` links are followed one by one.
+        If a page fails, the requests of the others are cancelled.
+
+        Parameters
+        ----------
+        endpoint : str
+            Either relative to the endpoint or absolute.
+        params : dict, optional
+            Query parameters to send with the first request, by default `None`
+        concurrency : int, optional
+            The maximum number of pages requested at the same time, by default the
+            `page_concurrency` of the client
+
+        Returns
+        -------
+        List[dict]
+            The results of all pages, in the order of the pages.
+
+        """
+        concurrency = concurrency or self._client._page_concurrency
+        data = await self._request(endpoint, params=params, page=1)
+        pages = data.get('pages') or 1
+        if concurrency < 2 or pages < 2:
+            return [res async for res in self._iter_paged(endpoint, params=params, prefetch=False, data=data)]
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def request_page(page):
+            async with semaphore:
+                return await self._request(endpoint, params={**(params or {}), 'page': page}, page=page)
+
+        results = list(data['results'])
+        pending = [asyncio.ensure_future(request_page(page)) for page in range(2, pages + 1)]
+        try:
+            for page in await asyncio.gather(*pending):
+                results += page['results']
+        except BaseException:
+            # a failed page leaves the others running, holding connections and rate limit tokens
+            for page in pending:
+                page.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            raise
+        self._client.metrics.count('pages', 'GET', endpoint, pages)
+        return results
+
+    async def _iter_paged(self, endpoint, params=None, prefetch: bool = True,
+                          data: dict = None) -> AsyncIterator[dict]:
+        """
+        Lazily iterate over the results of a paged endpoint.
+
+        Parameters
+        ----------
+        endpoint : str
+            Either relative to the endpoint or absolute.
+        params : dict, optional
+            Query parameters to send with the first request, by default `None`
+        prefetch : bool, optional
+            Request the next page in a background task while the current one is consumed, by default `True`
+        data : dict, optional
+            The already requested first page, by default `None`
+
+        Yields
+        ------
+        dict
+            The results, in the order of the pages.
+
+        """
+        pending = None
+        try:
+            url = None
+            if data is None:
+                data = await self._request(endpoint, params=params)
+            while True:
+                self._client.metrics.count('pages', 'GET', endpoint)
+                next = data['next']
+                if next in [None, url]:
+                    next = None
+                pending = asyncio.ensure_future(self._request(next)) if next and prefetch else None
+                for res in data['results']:
+                    yield res
+                if not next:
+                    return
+                url = next
+                data = await pending if pending else await self._request(next)
+                pending = None
+        finally:
+            if pending:
+                pending.cancel()
+
+    async def _request(self, endpoint, method='GET', data=None, params=None, headers=None,
+                       idempotency_key: str = None, reconcile: Callable[[], Awaitable[Optional[dict]]] = None,
+                       page: int = None) -> Optional[dict]:
+        """
+        Make a request to the API without blocking the event loop.
+
+        Waits for a free slot if the client already has `max_concurrency` requests in flight.
+        Cancelling the awaiting task aborts the request.
+
+        Parameters
+        ----------
+        endpoint : str
+            Either relative to the endpoint or absolute.
+        method : str, optional
+            HTTP method to use, by default `GET`
+        data : dict, optional
+            Data to send with the request (POST and PUT), by default `None`
+        params : dict, optional
+            Query parameters to send with the request, by default `None`
+        headers : dict, optional
+            Headers to send with the request, by default `None`
+        idempotency_key : str, optional
+            A unique key identifying this request across retries, by default `None`.
+            Allows the client's retry policy to retry POST and PUT requests if it trusts idempotency keys.
+        reconcile : Callable[[], Awaitable[Optional[dict]]], optional
+            Awaited before a POST or PUT request is retried, by default `None`.
+            Returns the result of an earlier attempt if it was executed despite
+            the error, which is then returned instead of retrying.
+        page : int, optional
+            The number of the page requested by a paged listing, recorded when tracing, by default `None`
+
+        Returns
+        -------
+        dict
+            The json response from the API, `None` if a conditional request (e.g. with
+            an `If-None-Match` header) was answered with `304 Not Modified`.
+
+        Raises
+        ------
+        requests.HTTPError
+            The API answered with an error status, like :meth:`_ApiClient._request` raises it.
+
+        """
+        url = full_url(self._endpoint, endpoint)
+        headers = self._client._auth_header(headers)
+        if idempotency_key:
+            headers[IDEMPOTENCY_HEADER] = idempotency_key
+        if params:
+            params = {key: value for key, value in params.items() if value is not None}
+        relative = url[len(self._endpoint):] if url.startswith(self._endpoint) else urlsplit(url).path
+
+        tracer = self._client._tracer
+        template = endpoint_template(relative)
+        trace = tracer.span(f'{method.upper()} {template}', 'request', method=method.upper(), endpoint=template,
+                            url=url, params=params, page=page) if tracer else nullcontext()
+        with trace as span:
+            def send():
+                return self._send(method, url, relative, data, params, headers, reconcile, span)
+
+            flights = self._client._get_async_single_flight()
+            if flights and method.upper() == 'GET':
+                return await flights.do(ResponseCache.key(url, params, headers), send)
+            return await send()
+
+    async def _send(self, method: str, url: str, endpoint: str, data: dict, params: dict, headers: dict,
+                    reconcile: Callable[[], Awaitable[Optional[dict]]] = None,
+                    span: Span = None) -> Optional[dict]:
+        """Send a prepared request through the cache, rate limiter and retry policy of the client."""
+        from httpx import TransportError
+
+        flow = RequestFlow(self._client, method, url, endpoint, params, headers, reconcile is not None, span)
+        cached = flow.lookup()
+        if cached is not None:
+            return cached
+
+        session = self._client._get_async_session()
+        while True:
+            flow.before_attempt()
+            try:
+                wait = flow.limit()
+                if wait:
+                    await asyncio.sleep(wait)
+                started = perf_counter()
+                res = await self._fetch(session, method, url, endpoint, data, params, headers, span)
+            except TransportError as e:
+                if not flow.on_error(e):
+                    raise
+            except asyncio.CancelledError:
+                # an Exception before Python 3.8, so it is handled first
+                flow.on_abort()
+                raise
+            except Exception:
+                # e.g. a broken or undecodable body
+                flow.on_failure()
+                raise
+            except BaseException:
+                flow.on_abort()
+                raise
+            else:
+                action = flow.on_response(res, perf_counter() - started, None, _body_size(res.request.content),
+                                          len(res.content), res.num_bytes_downloaded)
+                if action == RESEND:
+                    continue
+                if action == DONE:
+                    break
+
+            await asyncio.sleep(flow.backoff())
+            if flow.reconciles:
+                # looked up after the backoff, so the result of an attempt processed meanwhile is found too
+                try:
+                    reconciled = await reconcile()
+                except (TransportError, requests.exceptions.HTTPError, CircuitOpenError):
+                    # whether the failed attempt was executed is unknown, so it is not sent again
+                    flow.reconcile_failed()
+                    break
+                if reconciled is not None:
+                    return flow.reconciled(reconciled)
+            flow.on_retry()
+
+        return flow.result(lambda: _raise_for_status(res), data)
+
+    async def _fetch(self, session, method: str, url: str, endpoint: str, data: dict, params: dict, headers: dict,
+                     span: Span = None):
+        """Send one attempt of a request, hedged if the hedge policy of the client applies to it."""
+        def fetch():
+            return session.request(method.upper(), url, data=data, params=params, headers=headers)
+
+        semaphore = self._client._get_async_semaphore()
+        hedge = self._client._hedge
+        delay = hedge.delay(self._client.metrics, method, endpoint) if hedge else None
+        if delay is None:
+            async with semaphore:
+                return await fetch()
+
+        def on_hedge():
+            self._client.metrics.count('hedges', method, endpoint)
+            if self._client._rate_limiter:
+                # the duplicate counts against the rate limit, but doesn't wait for it
+                self._client._rate_limiter.acquire()
+            if span is not None:
+                span.attributes['hedged'] = True
+
+        res, won = await acall_hedged(fetch, delay, on_hedge, semaphore)
+        if won:
+            self._client.metrics.count('hedge_wins', method, endpoint)
+            if span is not None:
+                span.attributes['hedge_won'] = True
+        return res
+
+
+def _raise_for_status(res):
+    """Raise the :class:`requests.HTTPError` the sync client raises, so both are handled alike."""
+    if res.is_error:
+        kind = 'Client' if res.status_code < 500 else 'Server'
+        raise requests.exceptions.HTTPError(f'{res.status_code} {kind} Error: {res.reason_phrase} for url: {res.url}',
+                                            response=res)
+
+
+def _body_size(body) -> int:
+    return len(body) if body else 0
@@ -0,0 +1,203 @@
+"""Concurrent execution of many SDK calls."""
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor, TimeoutError, wait
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Iterable, List
+
+from lemon_markets.helpers.tracing import submit_in_context
+
+
+@dataclass
+class BatchResult:
+    """
+    The outcome of one operation of a batch.
+
+    Attributes
+    ----------
+    index : int
+        The position the operation was submitted at
+    value : Any
+        The return value, `None` if the operation failed
+    error : BaseException
+        The exception raised by the operation, `None` if it succeeded
+
+    """
+
+    index: int
+    value: Any = None
+    error: BaseException = None
+
+    @property
+    def ok(self) -> bool:
+        """
+        Whether the operation succeeded.
+
+        Returns
+        -------
+        bool
+            `True` if it raised no exception
+
+        """
+        return self.error is None
+
+    def get(self) -> Any:
+        """
+        Get the return value of the operation.
+
+        Returns
+        -------
+        Any
+            The return value
+
+        Raises
+        ------
+        BaseException
+            The exception raised by the operation.
+
+        """
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class Batch:
+    """
+    Runs many SDK calls (e.g. instrument lookups, OHLC fetches, order updates) at the same time.
+
+    Calls start as soon as they are submitted, at most `concurrency` at once. Leaving the `with`
+    block waits for all of them. An exception of one call doesn't affect the others, it is
+    returned with its result.
+
+    Parameters
+    ----------
+    concurrency : int, optional
+        The maximum number of calls running at the same time, by default `10`
+
+    Raises
+    ------
+    ValueError
+        The concurrency is less than `1`.
+
+    Examples
+    --------
+    >>> with client.batch(concurrency=16) as batch:
+    ...     for isin in isins:
+    ...         batch.submit(instruments.list_instruments, search=isin)
+    >>> found = [result.value for result in batch.results() if result.ok]
+
+    """
+
+    def __init__(self, concurrency: int = 10):
+        """Create a batch running up to `concurrency` calls at once."""
+        if concurrency < 1:
+            raise ValueError('The concurrency of a batch has to be at least 1.')
+        self.concurrency = concurrency
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='lemon_markets_batch')
+        self._futures: List[Future] = []
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        """Get the number of submitted calls."""
+        return len(self._futures)
+
+    def __enter__(self) -> 'Batch':
+        """Return the batch, which is closed when the block exits."""
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        """Wait for the calls and close the batch."""
+        # an error in the with block cancels the calls that haven't started yet
+        self.close(cancel=exc_type is not None)
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Start a call.
+
+        Parameters
+        ----------
+        fn : Callable
+            The function to call, e.g. a method of a resource like :meth:`Orders.update_order`
+        args
+            The positional arguments of the call
+        kwargs
+            The keyword arguments of the call
+
+        Returns
+        -------
+        concurrent.futures.Future
+            The future of the call
+
+        """
+        with self._lock:
+            future = submit_in_context(self._executor, fn, *args, **kwargs)
+            self._futures.append(future)
+        return future
+
+    def map(self, fn: Callable, *iterables: Iterable) -> List[Future]:
+        """
+        Start a call for every item, like :func:`map`.
+
+        Parameters
+        ----------
+        fn : Callable
+            The function to call
+        iterables : Iterable
+            The positional arguments of the calls
+
+        Returns
+        -------
+        List[concurrent.futures.Future]
+            The futures of the calls
+
+        """
+        return [self.submit(fn, *args) for args in zip(*iterables)]
+
+    def results(self, timeout: float = None) -> List[BatchResult]:
+        """
+        Wait for all calls.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            The maximum seconds to wait, by default `None` (no limit)
+
+        Returns
+        -------
+        List[BatchResult]
+            The results in the order the calls were submitted in
+
+        Raises
+        ------
+        concurrent.futures.TimeoutError
+            Not all calls finished within the timeout.
+
+        """
+        with self._lock:
+            futures = list(self._futures)
+        _, pending = wait(futures, timeout)
+        if pending:
+            raise TimeoutError(f'{len(pending)} of {len(futures)} calls did not finish within {timeout} seconds.')
+        results = []
+        for index, future in enumerate(futures):
+            if future.cancelled():
+                results.append(BatchResult(index, error=CancelledError()))
+            elif future.exception() is not None:
+                results.append(BatchResult(index, error=future.exception()))
+            else:
+                results.append(BatchResult(index, value=future.result()))
+        return results
+
+    def close(self, cancel: bool = False):
+        """
+        Wait for the calls and stop the threads of the batch.
+
+        Parameters
+        ----------
+        cancel : bool, optional
+            Whether to cancel the calls that haven't started yet, by default `False`
+
+        """
+        if cancel:
+            for future in self._futures:
+                future.cancel()
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,363 @@
+"""Caches for responses of GET requests to the API."""
+import sqlite3
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from fnmatch import fnmatch
+from hashlib import sha1
+from itertools import count
+from threading import Lock
+from time import time
+from typing import Dict, Mapping, Optional, Tuple
+from urllib.parse import urlencode
+
+# seconds responses of the matching endpoints are served from the cache. Venues are left out, as
+# their opening state is used for trading, and instruments, as InstrumentStore syncs them with ETags.
+DEFAULT_TTLS = {
+    'ohlc/d1*': 3600,
+    'ohlc/h1*': 300,
+    'ohlc/m1*': 30,
+}
+
+
+@dataclass
+class CacheEntry:
+    """
+    A cached response.
+
+    Attributes
+    ----------
+    body : bytes
+        The response body
+    expires : float
+        The unix timestamp the entry has to be revalidated after
+    etag : str
+        The `ETag` header of the response
+    last_modified : str
+        The `Last-Modified` header of the response
+
+    """
+
+    body: bytes
+    expires: float
+    etag: str = None
+    last_modified: str = None
+
+    @property
+    def fresh(self) -> bool:
+        """
+        Whether the entry can be used without asking the API.
+
+        Returns
+        -------
+        bool
+            `True` if the entry has not expired yet
+
+        """
+        return time() < self.expires
+
+    def validators(self) -> dict:
+        """
+        Get the headers to revalidate the entry with.
+
+        Returns
+        -------
+        dict
+            The conditional request headers
+
+        """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache(ABC):
+    """
+    Base class of response caches, backends implement :meth:`get`, :meth:`set` and :meth:`clear`.
+
+    Responses are cached for the ttl of the first pattern in `ttls` matching their
+    endpoint (e.g. `venues/` or `ohlc/D1/`, case-insensitive). Expired entries carrying an
+    `ETag` or `Last-Modified` header are revalidated with a conditional request and kept
+    if the API answers `304 Not Modified`.
+
+    Parameters
+    ----------
+    ttls : Dict[str, float], optional
+        Endpoint patterns (as in :mod:`fnmatch`) mapped to the seconds their responses are cached,
+        by default :data:`DEFAULT_TTLS`
+    default_ttl : float, optional
+        The ttl of endpoints matching no pattern, by default `0` (not cached)
+
+    """
+
+    def __init__(self, ttls: Dict[str, float] = None, default_ttl: float = 0):
+        """Create a cache with the given ttls."""
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.default_ttl = default_ttl
+
+    def ttl(self, endpoint: str) -> float:
+        """
+        Get the ttl of an endpoint.
+
+        Parameters
+        ----------
+        endpoint : str
+            The endpoint relative to the API url
+
+        Returns
+        -------
+        float
+            The seconds responses of the endpoint are cached
+
+        """
+        endpoint = endpoint.lstrip('/').lower()
+        for pattern, ttl in self.ttls.items():
+            if fnmatch(endpoint, pattern.lower()):
+                return ttl
+        return self.default_ttl
+
+    @staticmethod
+    def key(url: str, params: dict = None, headers: dict = None) -> str:
+        """
+        Get the cache key of a request.
+
+        Parameters
+        ----------
+        url : str
+            The url of the request
+        params : dict, optional
+            The query parameters of the request
+        headers : dict, optional
+            The headers of the request. Only the authorization is part of the key.
+
+        Returns
+        -------
+        str
+            The cache key
+
+        """
+        if params:
+            url += '?' + urlencode(sorted((k, v) for k, v in params.items() if v is not None), doseq=True)
+        auth = (headers or {}).get('Authorization', '')
+        return sha1(f'{auth} {url}'.encode()).hexdigest()
+
+    def lookup(self, endpoint: str, url: str, params: dict = None,
+               headers: dict = None) -> Tuple[Optional[str], Optional[CacheEntry]]:
+        """
+        Look up the cached response of a GET request.
+
+        Parameters
+        ----------
+        endpoint : str
+            The endpoint relative to the API url
+        url : str
+            The url of the request
+        params : dict, optional
+            The query parameters of the request
+        headers : dict, optional
+            The headers of the request
+
+        Returns
+        -------
+        Tuple[Optional[str], Optional[CacheEntry]]
+            The cache key, `None` if the endpoint is not cached, and the entry if one exists
+
+        """
+        if not self.ttl(endpoint):
+            return None, None
+        key = self.key(url, params, headers)
+        return key, self.get(key)
+
+    def update(self, key: str, endpoint: str, status: int, headers: Mapping[str, str], body: bytes,
+               entry: CacheEntry = None) -> Optional[CacheEntry]:
+        """
+        Store the response of a GET request.
+
+        Parameters
+        ----------
+        key : str
+            The cache key from :meth:`lookup`
+        endpoint : str
+            The endpoint relative to the API url
+        status : int
+            The response status code
+        headers : Mapping[str, str]
+            The response headers
+        body : bytes
+            The response body
+        entry : CacheEntry, optional
+            The entry that was revalidated by the request
+
+        Returns
+        -------
+        Optional[CacheEntry]
+            The entry holding the response body, `None` if the response is not cacheable
+
+        """
+        if 'no-store' in headers.get('Cache-Control', ''):
+            return None
+        expires = time() + self.ttl(endpoint)
+        if status == 304 and entry is not None:
+            entry = CacheEntry(entry.body, expires, headers.get('ETag', entry.etag),
+                               headers.get('Last-Modified', entry.last_modified))
+        elif 200 <= status < 300:
+            entry = CacheEntry(body, expires, headers.get('ETag'), headers.get('Last-Modified'))
+        else:
+            return None
+        self.set(key, entry)
+        return entry
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """
+        Get an entry.
+
+        Parameters
+        ----------
+        key : str
+            The cache key
+
+        Returns
+        -------
+        Optional[CacheEntry]
+            The entry, `None` if it is not cached
+
+        """
+
+    @abstractmethod
+    def set(self, key: str, entry: CacheEntry):
+        """
+        Store an entry.
+
+        Parameters
+        ----------
+        key : str
+            The cache key
+        entry : CacheEntry
+            The entry
+
+        """
+
+    @abstractmethod
+    def clear(self):
+        """Remove all entries."""
+
+
+class MemoryCache(ResponseCache):
+    """
+    Response cache in memory, evicting the least recently used entries.
+
+    Parameters
+    ----------
+    max_entries : int, optional
+        The maximum number of entries, by default `1024`
+    max_bytes : int, optional
+        The maximum size of all cached bodies, by default 64 MiB
+    ttls : Dict[str, float], optional
+        See :class:`ResponseCache`
+    default_ttl : float, optional
+        See :class:`ResponseCache`
+
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024,
+                 ttls: Dict[str, float] = None, default_ttl: float = 0):
+        """Create an empty cache."""
+        super().__init__(ttls, default_ttl)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Look up an entry, marking it as recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry):
+        """Store an entry, evicting the least recently used ones beyond the limits."""
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old.body)
+            if len(entry.body) > self.max_bytes:
+                return
+            self._entries[key] = entry
+            self._size += len(entry.body)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.body)
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+class SQLiteCache(ResponseCache):
+    """
+    Response cache in a SQLite database, evicting the least recently used entries.
+
+    Survives restarts and can be shared by several processes.
+
+    Parameters
+    ----------
+    path : str
+        The path of the database file
+    max_entries : int, optional
+        The maximum number of entries, by default `100000`
+    ttls : Dict[str, float], optional
+        See :class:`ResponseCache`
+    default_ttl : float, optional
+        See :class:`ResponseCache`
+
+    """
+
+    def __init__(self, path: str, max_entries: int = 100000,
+                 ttls: Dict[str, float] = None, default_ttl: float = 0):
+        """Open the database at `path`, creating the table if needed."""
+        super().__init__(ttls, default_ttl)
+        self.max_entries = max_entries
+        self._lock = Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, body BLOB, expires REAL, '
+                         'etag TEXT, last_modified TEXT, used INTEGER)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS responses_used ON responses (used)')
+        # an increasing counter orders the uses reliably, unlike timestamps
+        self._uses = count((self._db.execute('SELECT MAX(used) FROM responses').fetchone()[0] or 0) + 1)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Look up an entry, marking it as recently used."""
+        with self._lock:
+            row = self._db.execute('SELECT body, expires, etag, last_modified FROM responses WHERE key = ?',
+                                   (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute('UPDATE responses SET used = ? WHERE key = ?', (next(self._uses), key))
+        return CacheEntry(*row)
+
+    def set(self, key: str, entry: CacheEntry):
+        """Store an entry, evicting the least recently used ones beyond `max_entries`."""
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)',
+                             (key, entry.body, entry.expires, entry.etag, entry.last_modified, next(self._uses)))
+            self._db.execute('DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY used DESC '
+                             'LIMIT -1 OFFSET ?)', (self.max_entries,))
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._db.execute('DELETE FROM responses')
+
+    def close(self):
+        """Close the database."""
+        self._db.close()
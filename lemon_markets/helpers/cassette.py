@@ -0,0 +1,265 @@
+"""Recording of requests to disk and replaying them without network access."""
+import base64
+import gzip
+import json
+from collections import defaultdict, deque
+from datetime import timedelta
+from http.client import responses
+from threading import Lock
+from time import sleep
+from typing import Dict, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from requests import PreparedRequest, Response, Session
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from lemon_markets.exceptions import CassetteError
+
+# the response headers the SDK reads, everything else is left out of the cassette
+RECORDED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control', 'Retry-After')
+
+Key = Tuple[str, str, str]
+
+
+class Cassette:
+    """
+    A file of recorded requests and responses.
+
+    Mount it on a client with `Client(..., cassette=Cassette(path, 'record'))` to record the requests
+    made with the client, and with `Cassette(path)` to replay them later without network access.
+    The file has one json object per line (gzip compressed if the path ends with `.gz`). Request
+    headers, and with them the token, are never recorded.
+
+    Requests are matched by method, url (with sorted query parameters) and body. Responses of
+    repeated requests are replayed in the recorded order, the last one is repeated when they
+    run out.
+
+    Parameters
+    ----------
+    path : str
+        The path of the cassette file
+    mode : str, optional
+        `record` to append the requests made to the file, `replay` to answer them from it,
+        by default `replay`
+    latency : float | str, optional
+        The simulated latency of replayed responses: a number of seconds, or `recorded` for the
+        latency they were recorded with, by default `None` (no delay)
+
+    Raises
+    ------
+    ValueError
+        The mode is neither `record` nor `replay`.
+
+    """
+
+    def __init__(self, path: str, mode: str = 'replay', latency: Union[float, str] = None):
+        """Create a cassette, loading its interactions in replay mode."""
+        if mode not in ('record', 'replay'):
+            raise ValueError(f'Unknown cassette mode {mode!r}, expected "record" or "replay".')
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self._lock = Lock()
+        self._interactions: Dict[Key, deque] = defaultdict(deque)
+        if mode == 'replay':
+            self.load()
+
+    @staticmethod
+    def key(method: str, url: str, body: Union[bytes, str] = None) -> Key:
+        """
+        Get the key requests are matched by.
+
+        Parameters
+        ----------
+        method : str
+            The http method of the request
+        url : str
+            The url of the request, including the query
+        body : bytes | str, optional
+            The request body
+
+        Returns
+        -------
+        Tuple[str, str, str]
+            The method, the url with sorted query parameters and the body
+
+        """
+        parts = urlsplit(url)
+        query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+        if isinstance(body, bytes):
+            body = body.decode('utf-8', 'replace')
+        return method.upper(), urlunsplit(parts._replace(query=query)), body or ''
+
+    def _open(self, mode: str):
+        if self.path.endswith('.gz'):
+            return gzip.open(self.path, mode + 't', encoding='utf-8')
+        return open(self.path, mode, encoding='utf-8')
+
+    def load(self):
+        """
+        Read the recorded interactions from the file.
+
+        Raises
+        ------
+        FileNotFoundError
+            The cassette file does not exist.
+
+        """
+        interactions = defaultdict(deque)
+        with self._open('r') as f:
+            for line in f:
+                if line.strip():
+                    interaction = json.loads(line)
+                    interactions[self.key(*interaction['request'])].append(interaction)
+        with self._lock:
+            self._interactions = interactions
+
+    def record(self, request: PreparedRequest, response: Response):
+        """
+        Append a request and its response to the file.
+
+        Parameters
+        ----------
+        request : requests.PreparedRequest
+            The sent request
+        response : requests.Response
+            The received response, with its body already read
+
+        """
+        method, url, body = self.key(request.method, request.url, request.body)
+        content = response.content or b''
+        try:
+            recorded_body = {'text': content.decode('utf-8')}
+        except UnicodeDecodeError:
+            recorded_body = {'base64': base64.b64encode(content).decode('ascii')}
+        interaction = {
+            'request': [method, url, body or None],
+            'status': response.status_code,
+            'headers': {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers},
+            'body': recorded_body,
+            'elapsed': round(response.elapsed.total_seconds(), 6),
+        }
+        line = json.dumps(interaction, separators=(',', ':')) + '\n'
+        with self._lock:
+            with self._open('a') as f:
+                f.write(line)
+
+    def play(self, request: PreparedRequest) -> Optional[dict]:
+        """
+        Get the recorded interaction of a request.
+
+        Parameters
+        ----------
+        request : requests.PreparedRequest
+            The request
+
+        Returns
+        -------
+        Optional[dict]
+            The next recorded interaction, `None` if the request was not recorded
+
+        """
+        with self._lock:
+            interactions = self._interactions.get(self.key(request.method, request.url, request.body))
+            if not interactions:
+                return None
+            return interactions.popleft() if len(interactions) > 1 else interactions[0]
+
+    def mount(self, session: Session):
+        """
+        Route the requests of a session through the cassette.
+
+        Parameters
+        ----------
+        session : requests.Session
+            The session, e.g. the one of a :class:`Client`
+
+        """
+        if self.mode == 'record':
+            adapter = RecordingAdapter(self, session.get_adapter('https://'))
+        else:
+            adapter = ReplayAdapter(self)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+
+
+class RecordingAdapter(BaseAdapter):
+    """
+    Sends requests with another adapter and records them to a cassette.
+
+    Parameters
+    ----------
+    cassette : Cassette
+        The cassette to record to
+    adapter : requests.adapters.BaseAdapter, optional
+        The adapter sending the requests, by default a new :class:`requests.adapters.HTTPAdapter`
+
+    """
+
+    def __init__(self, cassette: Cassette, adapter: BaseAdapter = None):
+        """Create an adapter recording to `cassette`."""
+        super().__init__()
+        self.cassette = cassette
+        self.adapter = adapter if adapter is not None else HTTPAdapter()
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        """Send a request and record it with its response."""
+        response = self.adapter.send(request, **kwargs)
+        # reading the body releases the connection, which a streamed response would otherwise hold
+        response.content
+        self.cassette.record(request, response)
+        return response
+
+    def close(self):
+        """Close the adapter sending the requests."""
+        self.adapter.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    Answers requests with the responses recorded in a cassette.
+
+    Parameters
+    ----------
+    cassette : Cassette
+        The cassette to replay
+
+    Raises
+    ------
+    CassetteError
+        A request was not recorded in the cassette.
+
+    """
+
+    def __init__(self, cassette: Cassette):
+        """Create an adapter replaying `cassette`."""
+        super().__init__()
+        self.cassette = cassette
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        """Answer a request with the next response recorded for it."""
+        interaction = self.cassette.play(request)
+        if interaction is None:
+            raise CassetteError(f'{request.method} {request.url} was not recorded in {self.cassette.path}.')
+
+        latency = self.cassette.latency
+        elapsed = interaction['elapsed'] if latency == 'recorded' else latency or 0
+        if elapsed:
+            sleep(elapsed)
+
+        body = interaction['body']
+        response = Response()
+        response.status_code = interaction['status']
+        response.reason = responses.get(response.status_code)
+        response.headers = CaseInsensitiveDict(interaction['headers'])
+        response._content = body['text'].encode('utf-8') if 'text' in body else base64.b64decode(body['base64'])
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.elapsed = timedelta(seconds=elapsed)
+        return response
+
+    def close(self):
+        """Do nothing, there are no connections to close."""
@@ -0,0 +1,161 @@
+"""Failing fast while the API is degraded."""
+from threading import Lock
+from time import monotonic
+from typing import Dict, Iterable
+
+from lemon_markets.exceptions import CircuitOpenError
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class _Circuit:
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trials = 0
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a host that keeps failing.
+
+    Every host has its own circuit. After `failure_threshold` consecutive requests failed
+    with a connection error, a timeout or one of the `statuses`, the circuit opens and
+    requests to the host raise :class:`CircuitOpenError` right away instead of waiting
+    for their timeout and retries. After `reset_timeout` seconds the circuit is half
+    open: `half_open_requests` requests are sent to probe the host. It closes again if
+    they succeed, and opens again if one of them fails.
+
+    Parameters
+    ----------
+    failure_threshold : int, optional
+        The number of consecutive failures opening the circuit, by default `5`
+    reset_timeout : float, optional
+        The seconds the circuit stays open before probing the host, by default `10`
+    half_open_requests : int, optional
+        The number of requests probing the host at the same time, by default `1`
+    statuses : Iterable[int], optional
+        The response status codes counting as failures, by default `500`, `502`, `503` and `504`
+
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 10, half_open_requests: int = 1,
+                 statuses: Iterable[int] = (500, 502, 503, 504)):
+        """Create a breaker with all circuits closed."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_requests = half_open_requests
+        self.statuses = frozenset(statuses)
+        self._lock = Lock()
+        self._circuits: Dict[str, _Circuit] = {}
+
+    def state(self, host: str) -> str:
+        """
+        Get the state of the circuit of a host.
+
+        Parameters
+        ----------
+        host : str
+            The host, e.g. `paper-trading.lemon.markets`
+
+        Returns
+        -------
+        str
+            `closed`, `open` or `half_open`
+
+        """
+        with self._lock:
+            circuit = self._circuits.get(host)
+            if circuit is None:
+                return CLOSED
+            if circuit.state == OPEN and monotonic() - circuit.opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return circuit.state
+
+    def before_request(self, host: str):
+        """
+        Check whether a request may be sent to a host.
+
+        Parameters
+        ----------
+        host : str
+            The host of the request
+
+        Raises
+        ------
+        CircuitOpenError
+            The circuit of the host is open, or the allowed requests are already probing it.
+
+        """
+        with self._lock:
+            circuit = self._circuits.setdefault(host, _Circuit())
+            if circuit.state == CLOSED:
+                return
+            remaining = self.reset_timeout - (monotonic() - circuit.opened_at)
+            if circuit.state == OPEN and remaining <= 0:
+                circuit.state = HALF_OPEN
+                circuit.trials = 0
+            if circuit.state == HALF_OPEN and circuit.trials < self.half_open_requests:
+                circuit.trials += 1
+                return
+        raise CircuitOpenError(host, max(remaining, 0))
+
+    def on_response(self, host: str, status: int = None):
+        """
+        Record the outcome of a request.
+
+        Parameters
+        ----------
+        host : str
+            The host of the request
+        status : int, optional
+            The response status code, `None` if the request failed without a response
+
+        """
+        failed = status is None or status in self.statuses
+        with self._lock:
+            circuit = self._circuits.setdefault(host, _Circuit())
+            if not failed:
+                circuit.state = CLOSED
+                circuit.failures = 0
+                return
+            circuit.failures += 1
+            if circuit.state == HALF_OPEN or circuit.failures >= self.failure_threshold:
+                circuit.state = OPEN
+                circuit.opened_at = monotonic()
+
+    def release(self, host: str):
+        """
+        Record a request that ended without an outcome, e.g. because it was cancelled.
+
+        A request probing a half open circuit gives back its slot, so another request can probe the host.
+
+        Parameters
+        ----------
+        host : str
+            The host of the request
+
+        """
+        with self._lock:
+            circuit = self._circuits.get(host)
+            if circuit is not None and circuit.state == HALF_OPEN and circuit.trials > 0:
+                circuit.trials -= 1
+
+    def reset(self, host: str = None):
+        """
+        Close circuits.
+
+        Parameters
+        ----------
+        host : str, optional
+            The host to close the circuit of, by default `None` (all)
+
+        """
+        with self._lock:
+            if host is None:
+                self._circuits.clear()
+            else:
+                self._circuits.pop(host, None)
@@ -0,0 +1,61 @@
+"""Decoding of json responses."""
+import json
+from typing import Any, Callable, Union
+
+Decoder = Callable[[bytes], Any]
+
+
+def _orjson() -> Decoder:
+    import orjson
+    return orjson.loads
+
+
+def _ujson() -> Decoder:
+    import ujson
+    return ujson.loads
+
+
+def _json() -> Decoder:
+    return json.loads
+
+
+_DECODERS = {'orjson': _orjson, 'ujson': _ujson, 'json': _json}
+
+
+def get_decoder(decoder: Union[str, Decoder] = None) -> Decoder:
+    """
+    Get a function decoding json response bodies.
+
+    The decoders read the body bytes directly, without decoding them to a string first
+    (`orjson` also parses without copying them).
+
+    Parameters
+    ----------
+    decoder : Union[str, Callable[[bytes], Any]], optional
+        Either the name of a json library (`orjson`, `ujson` or `json`) or a function
+        taking the body bytes. By default the fastest installed library.
+
+    Returns
+    -------
+    Callable[[bytes], Any]
+        The decoding function
+
+    Raises
+    ------
+    ValueError
+        The name is not a known json library.
+    ImportError
+        The named json library is not installed.
+
+    """
+    if callable(decoder):
+        return decoder
+    if decoder is not None:
+        if decoder not in _DECODERS:
+            raise ValueError(f'Unknown json decoder: {decoder}')
+        return _DECODERS[decoder]()
+    for load in _DECODERS.values():
+        try:
+            return load()
+        except ImportError:
+            continue
@@ -0,0 +1,620 @@
+"""A local stand-in for the lemon.markets API, for offline tests and load tests of the SDK."""
+import gzip
+import json
+import re
+import uuid
+from datetime import datetime, timedelta, timezone
+from hashlib import sha1
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from math import ceil
+from random import Random
+from threading import Lock, Thread
+from time import monotonic, sleep, time
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+VENUES = [
+    {'name': 'Börse München - Gettex', 'title': 'Gettex', 'mic': 'XMUN'},
+    {'name': 'Börse Berlin', 'title': 'Tradegate', 'mic': 'XBER'},
+]
+INSTRUMENT_TYPES = ('stock', 'bond', 'fund', 'warrant')
+ORDER_STATUSES = ('inactive', 'activated', 'in_progress', 'executed', 'deleted', 'expired')
+OHLC_STEPS = {'m1': timedelta(minutes=1), 'h1': timedelta(hours=1), 'd1': timedelta(days=1)}
+
+
+class FakeServerError(Exception):
+    """An error response of the fake server."""
+
+    def __init__(self, status: int, message: str):
+        """Create an error response with the http status `status`."""
+        super().__init__(message)
+        self.status = status
+
+
+class FakeServer:
+    """
+    An in-process http server implementing the endpoints used by the SDK with generated data.
+
+    Point a client at it with `Client(token, base_url=server.url)`. Listings are paged like the
+    API (`page`, `pages`, `total`, `next`, `previous`, `limit`), responses carry an `ETag`
+    and answer `If-None-Match` with `304 Not Modified`. Requests can be delayed (all of them or
+    the next ones on demand), throttled with `429 Too Many Requests` and failed at random or on demand.
+
+    Parameters
+    ----------
+    host : str, optional
+        The address to listen on, by default `127.0.0.1`
+    port : int, optional
+        The port to listen on, by default `0` (a free port)
+    token : str, optional
+        The token requests have to be authorized with, by default `None` (any)
+    latency : float, optional
+        The seconds every response is delayed by, by default `0`
+    page_size : int, optional
+        The default number of results per page, by default `100`
+    rate_limit : float, optional
+        The requests per second answered before responding `429`, by default `None` (unlimited)
+    error_rate : float, optional
+        The share of requests answered with `error_status`, by default `0`
+    error_status : int, optional
+        The status of injected errors, by default `503`
+    compression : bool, optional
+        Whether to gzip responses of at least 1 KiB for clients accepting it, by default `True`
+    instruments : int, optional
+        The number of generated instruments, by default `1000`
+    spaces : int, optional
+        The number of generated spaces, by default `2`
+    orders : int, optional
+        The number of generated orders per space, by default `100`
+    positions : int, optional
+        The number of generated positions per space, by default `20`
+    seed : int, optional
+        The seed of the generated data, by default `0`
+
+    Attributes
+    ----------
+    requests : int
+        The number of requests received
+    instruments : List[dict]
+        The instruments, as returned by `instruments/`
+    venues : List[dict]
+        The trading venues, as returned by `venues/`
+    spaces : Dict[str, dict]
+        The spaces by id
+    orders : Dict[str, Dict[str, dict]]
+        The orders of every space by uuid
+    positions : Dict[str, List[dict]]
+        The positions of every space
+
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, token: str = None, latency: float = 0,
+                 page_size: int = 100, rate_limit: float = None, error_rate: float = 0, error_status: int = 503,
+                 compression: bool = True, instruments: int = 1000, spaces: int = 2, orders: int = 100,
+                 positions: int = 20, seed: int = 0):
+        """Create the server with generated data, it accepts connections once started."""
+        self.token = token
+        self.latency = latency
+        self.page_size = page_size
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.compression = compression
+        self.requests = 0
+        self._random = Random(seed)
+        self._lock = Lock()
+        self._failures: List[int] = []
+        self._stalls: List[float] = []
+        self._allowance = rate_limit or 0
+        self._checked = monotonic()
+        self._idempotency_keys: Dict[str, str] = {}
+
+        self.venues = [_venue(venue) for venue in VENUES]
+        self.instruments = [self._instrument(i) for i in range(instruments)]
+        self._instruments_by_isin = {instrument['isin']: instrument for instrument in self.instruments}
+        self.spaces: Dict[str, dict] = {}
+        self.orders: Dict[str, Dict[str, dict]] = {}
+        self.positions: Dict[str, List[dict]] = {}
+        for i in range(spaces):
+            space = self._space(f'Space {i}', 'auto' if i % 2 else 'manual', 10000, None)
+            self.orders[space['id']] = {}
+            for _ in range(orders):
+                order = self._order(self._random.choice(self.instruments)['isin'],
+                                    time() + 86400, self._random.choice(('buy', 'sell')), self._random.randint(1, 100),
+                                    status=self._random.choice(ORDER_STATUSES),
+                                    created_at=time() - self._random.uniform(0, 30 * 86400))
+                self.orders[space['id']][order['uuid']] = order
+            self.positions[space['id']] = [self._position(instrument)
+                                           for instrument in self._random.sample(self.instruments,
+                                                                                 min(positions, instruments))]
+
+        self._routes: List[Tuple[str, re.Pattern, Callable]] = [
+            ('GET', re.compile(r'account/?'), self._get_account),
+            ('GET', re.compile(r'state/?'), self._get_state),
+            ('GET', re.compile(r'spaces/?'), self._list_spaces),
+            ('POST', re.compile(r'spaces/?'), self._create_space),
+            ('GET', re.compile(r'spaces/(?P<space>[^/]+)/?'), self._get_space),
+            ('PUT', re.compile(r'spaces/(?P<space>[^/]+)/?'), self._update_space),
+            ('DELETE', re.compile(r'spaces/(?P<space>[^/]+)/?'), self._delete_space),
+            ('GET', re.compile(r'spaces/(?P<space>[^/]+)/orders/?'), self._list_orders),
+            ('POST', re.compile(r'spaces/(?P<space>[^/]+)/orders/?'), self._create_order),
+            ('GET', re.compile(r'spaces/(?P<space>[^/]+)/orders/(?P<order>[^/]+)/?'), self._get_order),
+            ('DELETE', re.compile(r'spaces/(?P<space>[^/]+)/orders/(?P<order>[^/]+)/?'), self._delete_order),
+            ('PUT', re.compile(r'spaces/(?P<space>[^/]+)/orders/(?P<order>[^/]+)/activate/?'), self._activate_order),
+            ('GET', re.compile(r'spaces/(?P<space>[^/]+)/portfolio/?'), self._list_positions),
+            ('GET', re.compile(r'instruments/?'), self._list_instruments),
+            ('GET', re.compile(r'venues/?'), self._list_venues),
+            ('GET', re.compile(r'ohlc/(?P<x1>m1|h1|d1)/?', re.I), self._list_ohlc),
+        ]
+
+        self._server = _Server((host, port), _handler(self))
+        self._thread: Optional[Thread] = None
+
+    @property
+    def url(self) -> str:
+        """
+        The url of the API served, to be passed as `base_url` to a :class:`Client`.
+
+        Returns
+        -------
+        str
+            The url, ending in `/v1/`
+
+        """
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/v1/'
+
+    def start(self) -> 'FakeServer':
+        """
+        Serve requests in a background thread.
+
+        Returns
+        -------
+        FakeServer
+            The server
+
+        """
+        if self._thread is None:
+            self._thread = Thread(target=self._server.serve_forever, name='FakeServer', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving requests and close the socket."""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> 'FakeServer':
+        """Start the server."""
+        return self.start()
+
+    def __exit__(self, *exc):
+        """Stop the server."""
+        self.stop()
+
+    def fail_next(self, count: int = 1, status: int = 503):
+        """
+        Answer the next requests with an error.
+
+        Parameters
+        ----------
+        count : int, optional
+            The number of requests to fail, by default `1`
+        status : int, optional
+            The response status, by default `503`
+
+        """
+        with self._lock:
+            self._failures += [status] * count
+
+    def stall_next(self, count: int = 1, seconds: float = 1):
+        """
+        Delay the responses to the next requests.
+
+        Parameters
+        ----------
+        count : int, optional
+            The number of requests to delay, by default `1`
+        seconds : float, optional
+            The seconds to delay each of them by, in addition to `latency`, by default `1`
+
+        """
+        with self._lock:
+            self._stalls += [seconds] * count
+
+    def handle(self, method: str, target: str, headers: Dict[str, str],
+               body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        Answer a request.
+
+        Parameters
+        ----------
+        method : str
+            The http method
+        target : str
+            The path and query of the request
+        headers : Dict[str, str]
+            The request headers
+        body : bytes
+            The request body, json or form encoded
+
+        Returns
+        -------
+        Tuple[int, Dict[str, str], bytes]
+            The status, headers and body of the response
+
+        """
+        with self._lock:
+            self.requests += 1
+            failure = self._failures.pop(0) if self._failures else None
+            if failure is None and self.error_rate and self._random.random() < self.error_rate:
+                failure = self.error_status
+            throttled = self._throttled()
+            stall = self._stalls.pop(0) if self._stalls else 0
+        if self.latency or stall:
+            sleep(self.latency + stall)
+
+        if throttled:
+            return _json_response(429, {'detail': 'Too many requests'},
+                                  {'Retry-After': str(max(1, ceil(1 / self.rate_limit)))})
+        if failure is not None:
+            return _json_response(failure, {'detail': 'Injected error'})
+        if self.token is not None and headers.get('Authorization') != f'Bearer {self.token}':
+            return _json_response(401, {'detail': 'Invalid token'})
+
+        parts = urlsplit(target)
+        path = parts.path.split('/v1/', 1)[-1].lstrip('/')
+        query = dict(parse_qsl(parts.query))
+        try:
+            data = _parse_body(body, headers.get('Content-Type', ''))
+            handler, groups, allowed = self._route(method, path)
+            if handler is None:
+                raise FakeServerError(405 if allowed else 404, 'Method not allowed' if allowed else 'Not found')
+            result = handler(query=query, data=data, headers=headers, path=path, **groups)
+        except FakeServerError as e:
+            return _json_response(e.status, {'detail': str(e)})
+        if result is None:
+            return 204, {}, b''
+
+        status, response_headers, content = _json_response(200, result)
+        # the timestamp of a listing changes with every response, unlike its results
+        unchanged = {key: value for key, value in result.items() if key != 'time'}
+        etag = '"' + sha1(json.dumps(unchanged, sort_keys=True).encode()).hexdigest() + '"'
+        if method == 'GET' and headers.get('If-None-Match') == etag:
+            return 304, {'ETag': etag}, b''
+        response_headers['ETag'] = etag
+        return status, response_headers, content
+
+    def _route(self, method: str, path: str) -> Tuple[Optional[Callable], dict, bool]:
+        allowed = False
+        for route_method, pattern, handler in self._routes:
+            match = pattern.fullmatch(path)
+            if match is None:
+                continue
+            if route_method == method:
+                return handler, match.groupdict(), True
+            allowed = True
+        return None, {}, allowed
+
+    def _throttled(self) -> bool:
+        if not self.rate_limit:
+            return False
+        now = monotonic()
+        self._allowance = min(self.rate_limit, self._allowance + (now - self._checked) * self.rate_limit)
+        self._checked = now
+        if self._allowance < 1:
+            return True
+        self._allowance -= 1
+        return False
+
+    def _page(self, results: list, query: dict, path: str) -> dict:
+        limit = int(query.get('limit', self.page_size))
+        page = int(query.get('page', 1))
+        pages = max(1, ceil(len(results) / limit))
+
+        def link(page):
+            return f'{self.url}{path}?{urlencode({**query, "page": page})}'
+
+        return {
+            'time': _isoformat(time()),
+            'results': results[(page - 1) * limit:page * limit],
+            'previous': link(page - 1) if page > 1 else None,
+            'next': link(page + 1) if page < pages else None,
+            'total': len(results),
+            'page': page,
+            'pages': pages,
+        }
+
+    def _uuid(self) -> str:
+        return str(uuid.UUID(int=self._random.getrandbits(128), version=4))
+
+    def _instrument(self, i: int) -> dict:
+        type_ = INSTRUMENT_TYPES[i % len(INSTRUMENT_TYPES)]
+        venues = self.venues[:1 + i % len(self.venues)]
+        return {
+            'isin': f'DE{i:09d}{i % 10}',
+            'wkn': f'{i:06d}'[-6:],
+            'name': f'INSTRUMENT {i}',
+            'title': f'Instrument {i} {type_.title()}',
+            'symbol': f'I{i}',
+            'type': type_,
+            'venues': [{'name': venue['name'], 'title': venue['title'], 'mic': venue['mic'],
+                        'is_open': True, 'tradable': True, 'currency': 'EUR'} for venue in venues],
+        }
+
+    def _space(self, name: str, type_: str, risk_limit: float, description: Optional[str]) -> dict:
+        space = {
+            'id': self._uuid(),
+            'name': name,
+            'description': description,
+            'type': type_,
+            'linked': None,
+            'risk_limit': str(risk_limit),
+            'buying_power': str(risk_limit),
+            'earnings': '0.0000',
+            'backfire': '0.0000',
+            'created_at': _isoformat(time()),
+        }
+        self.spaces[space['id']] = space
+        return space
+
+    def _order(self, isin: str, valid_until: float, side: str, quantity: int, stop_price: float = None,
+               limit_price: float = None, status: str = 'inactive', created_at: float = None) -> dict:
+        instrument = self._find_instrument(isin)
+        executed = status == 'executed'
+        return {
+            'uuid': self._uuid(),
+            'instrument': {'isin': isin, 'title': instrument['title']},
+            'valid_until': valid_until,
+            'side': side,
+            'quantity': quantity,
+            'stop_price': stop_price,
+            'limit_price': limit_price,
+            'status': status,
+            'trading_venue': {'mic': self.venues[0]['mic'], 'title': self.venues[0]['title']},
+            'type': instrument['type'],
+            'average_price': str(round(self._random.uniform(1, 500), 4)) if executed else '0.0000',
+            'created_at': created_at or time(),
+            'processed_at': created_at if executed else None,
+            'processed_quantity': quantity if executed else 0,
+        }
+
+    def _position(self, instrument: dict) -> dict:
+        quantity = self._random.randint(1, 100)
+        price = round(self._random.uniform(1, 500), 4)
+        return {
+            'instrument': {'isin': instrument['isin'], 'title': instrument['title']},
+            'quantity': quantity,
+            'average_price': str(price),
+            'latest_total_value': str(round(quantity * price * self._random.uniform(0.8, 1.2), 4)),
+        }
+
+    def _find_instrument(self, isin: str) -> dict:
+        if isin not in self._instruments_by_isin:
+            raise FakeServerError(400, f'Unknown isin {isin}')
+        return self._instruments_by_isin[isin]
+
+    def _find_space(self, space: str) -> dict:
+        if space not in self.spaces:
+            raise FakeServerError(404, f'Unknown space {space}')
+        return self.spaces[space]
+
+    def _find_order(self, space: str, order: str) -> dict:
+        self._find_space(space)
+        if order not in self.orders[space]:
+            raise FakeServerError(404, f'Unknown order {order}')
+        return self.orders[space][order]
+
+    def _get_account(self, **_) -> dict:
+        return {'results': {
+            'created_at': '2021-06-01T12:00:00.000+00:00', 'account_id': 'acc_fake', 'firstname': 'Fake',
+            'lastname': 'Server', 'email': 'fake@example.com', 'phone': None, 'address': None,
+            'billing_address': None, 'billing_email': None, 'billing_name': None, 'billing_vat': None,
+            'mode': 'paper', 'deposit_id': None, 'client_id': None, 'account_number': None,
+            'iban_brokerage': None, 'iban_origin': None, 'bank_name_origin': None, 'balance': '100000.0000',
+            'cash_to_invest': '100000.0000', 'cash_to_withdraw': '0.0000', 'trading_plan': 'free',
+            'data_plan': 'free', 'tax_allowance': '801.0000', 'tax_allowance_start': '2021-01-01',
+            'tax_allowance_end': '2021-12-31',
+        }}
+
+    def _get_state(self, **_) -> dict:
+        return {'state': {'balance': '100000.0000'}}
+
+    def _list_spaces(self, query: dict, path: str, **_) -> dict:
+        with self._lock:
+            spaces = [space for space in self.spaces.values() if query.get('type') in (None, space['type'])]
+        return self._page(spaces, query, path)
+
+    def _create_space(self, data: dict, **_) -> dict:
+        with self._lock:
+            return {'results': self._space(data.get('name'), data.get('type', 'manual'),
+                                           data.get('risk_limit', 0), data.get('description'))}
+
+    def _get_space(self, space: str, **_) -> dict:
+        with self._lock:
+            return {'results': self._find_space(space)}
+
+    def _update_space(self, space: str, data: dict, **_) -> dict:
+        with self._lock:
+            found = self._find_space(space)
+            found.update({key: value for key, value in data.items() if key in found and key != 'id'})
+            return {'results': found}
+
+    def _delete_space(self, space: str, **_) -> None:
+        with self._lock:
+            self._find_space(space)
+            del self.spaces[space]
+            self.orders.pop(space, None)
+            self.positions.pop(space, None)
+
+    def _list_orders(self, space: str, query: dict, path: str, **_) -> dict:
+        with self._lock:
+            self._find_space(space)
+            orders = [order for order in self.orders[space].values() if _order_matches(order, query)]
+        return self._page(sorted(orders, key=lambda order: order['created_at'], reverse=True), query, path)
+
+    def _create_order(self, space: str, data: dict, headers: Dict[str, str], **_) -> dict:
+        key = headers.get('Idempotency-Key')
+        with self._lock:
+            self._find_space(space)
+            if key is not None and key in self._idempotency_keys:
+                return self.orders[space][self._idempotency_keys[key]]
+            try:
+                order = self._order(data['isin'], float(data['valid_until']), data['side'], int(data['quantity']),
+                                    _optional_float(data.get('stop_price')), _optional_float(data.get('limit_price')))
+            except (KeyError, ValueError) as e:
+                raise FakeServerError(400, f'Invalid order: {e}')
+            self.orders[space][order['uuid']] = order
+            if key is not None:
+                self._idempotency_keys[key] = order['uuid']
+            return order
+
+    def _get_order(self, space: str, order: str, **_) -> dict:
+        with self._lock:
+            return self._find_order(space, order)
+
+    def _activate_order(self, space: str, order: str, **_) -> dict:
+        with self._lock:
+            found = self._find_order(space, order)
+            if found['status'] == 'inactive':
+                found['status'] = 'activated'
+            return found
+
+    def _delete_order(self, space: str, order: str, **_) -> None:
+        with self._lock:
+            self._find_order(space, order)['status'] = 'deleted'
+
+    def _list_positions(self, space: str, query: dict, path: str, **_) -> dict:
+        with self._lock:
+            self._find_space(space)
+            positions = list(self.positions[space])
+        return self._page(positions, query, path)
+
+    def _list_instruments(self, query: dict, path: str, **_) -> dict:
+        search = query.get('search', '').lower()
+        tradable = query.get('tradable')
+        instruments = [
+            instrument for instrument in self.instruments
+            if (not search or any(search in instrument[key].lower()
+                                  for key in ('isin', 'wkn', 'symbol', 'name', 'title')))
+            and query.get('type') in (None, instrument['type'])
+            and query.get('currency') in (None, *(venue['currency'] for venue in instrument['venues']))
+            and query.get('mic') in (None, *(venue['mic'] for venue in instrument['venues']))
+            and (tradable is None
+                 or (tradable.lower() == 'true') == any(venue['tradable'] for venue in instrument['venues']))
+        ]
+        return self._page(instruments, query, path)
+
+    def _list_venues(self, query: dict, path: str, **_) -> dict:
+        venues = [venue for venue in self.venues if query.get('mic') in (None, venue['mic'])]
+        return self._page(venues, query, path)
+
+    def _list_ohlc(self, x1: str, query: dict, path: str, **_) -> dict:
+        instrument = self._find_instrument(query.get('isin'))
+        step = OHLC_STEPS[x1.lower()]
+        end = _parse_time(query.get('to')) or datetime(2021, 6, 1, tzinfo=timezone.utc)
+        start = _parse_time(query.get('from')) or end - step * (self.page_size - 1)
+        count = min(int((end - start) / step) + 1, 100000) if end >= start else 0
+        # prices follow a random walk seeded by the isin, so repeated requests get the same bars
+        random = Random(instrument['isin'])
+        price = random.uniform(10, 500)
+        bars = []
+        for i in range(count):
+            open_ = price
+            price = max(0.01, price * random.uniform(0.98, 1.02))
+            bars.append({
+                'isin': instrument['isin'],
+                'mic': query.get('mic', self.venues[0]['mic']),
+                'o': round(open_, 4),
+                'h': round(max(open_, price) * random.uniform(1, 1.01), 4),
+                'l': round(min(open_, price) * random.uniform(0.99, 1), 4),
+                'c': round(price, 4),
+                't': _isoformat((start + step * i).timestamp()),
+            })
+        if query.get('sorting') == 'desc':
+            bars.reverse()
+        return self._page(bars, query, path)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # load tests open many connections at once
+    request_queue_size = 1024
+
+
+def _handler(server: FakeServer) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # headers and body are written separately, which would wait for delayed acks otherwise
+        disable_nagle_algorithm = True
+
+        def _answer(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            status, headers, content = server.handle(self.command, self.path, dict(self.headers), body)
+            if server.compression and len(content) >= 1024 and 'gzip' in self.headers.get('Accept-Encoding', ''):
+                content = gzip.compress(content, 5)
+                headers['Content-Encoding'] = 'gzip'
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        do_GET = do_POST = do_PUT = do_DELETE = _answer
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def _venue(venue: dict) -> dict:
+    today = datetime.now(timezone.utc).date()
+    opening_days = [str(today + timedelta(days=i)) for i in range(30) if (today + timedelta(days=i)).weekday() < 5]
+    return {**venue, 'currency': 'EUR', 'is_open': True, 'opening_days': opening_days,
+            'opening_hours': {'start': '08:00', 'end': '22:00', 'timezone': 'Europe/Berlin'}}
+
+
+def _json_response(status: int, data: dict, headers: Dict[str, str] = None) -> Tuple[int, Dict[str, str], bytes]:
+    return status, {'Content-Type': 'application/json', **(headers or {})}, json.dumps(data).encode()
+
+
+def _parse_body(body: bytes, content_type: str) -> dict:
+    if not body:
+        return {}
+    if 'json' in content_type:
+        try:
+            return json.loads(body)
+        except ValueError:
+            raise FakeServerError(400, 'Invalid json body')
+    return dict(parse_qsl(body.decode()))
+
+
+def _order_matches(order: dict, query: dict) -> bool:
+    return (query.get('side') in (None, order['side'])
+            and query.get('type') in (None, order['type'])
+            and query.get('status') in (None, order['status'])
+            and ('created_at_from' not in query or order['created_at'] >= float(query['created_at_from']))
+            and ('created_at_until' not in query or order['created_at'] <= float(query['created_at_until'])))
+
+
+def _optional_float(value) -> Optional[float]:
+    return None if value in (None, '') else float(value)
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromtimestamp(float(value), timezone.utc)
+    except ValueError:
+        parsed = datetime.fromisoformat(value)
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _isoformat(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat(timespec='milliseconds')
@@ -0,0 +1,234 @@
+"""Hedged requests, cutting the tail latency of idempotent reads."""
+import asyncio
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from threading import Event, Semaphore
+from typing import Any, Awaitable, Callable, Iterable, Optional, Tuple
+
+from lemon_markets.helpers.metrics import MetricsRegistry, endpoint_template
+from lemon_markets.helpers.tracing import submit_in_context
+
+
+class HedgePolicy:
+    """
+    Decides when a duplicate of a slow GET request is sent.
+
+    If no response arrived after the usual duration of a request, estimated as the
+    `quantile` of the durations recorded by the :class:`MetricsRegistry` of the client,
+    the request is sent a second time and the first response of either is used. This
+    way a single stalled connection or backend doesn't hold up e.g. an order loop
+    polling the status of its orders. Only GET requests are hedged, as they are safe
+    to send twice, and at most one duplicate is sent per attempt.
+
+    Parameters
+    ----------
+    quantile : float, optional
+        The quantile of the recorded durations after which a duplicate is sent, by default `0.95`
+    min_delay : float, optional
+        The minimum seconds to wait before sending a duplicate, by default `0.01`
+    max_delay : float, optional
+        The maximum seconds to wait before sending a duplicate, by default `1`
+    min_samples : int, optional
+        The number of durations recorded for an endpoint before its requests are hedged, by default `20`
+    endpoints : Iterable[str], optional
+        The endpoint templates to hedge, e.g. `spaces/{id}/orders/{id}/`, by default `None` (all)
+
+    Examples
+    --------
+    Hedge the requests polling the state of orders and spaces:
+
+    >>> client = Client(token, hedge=HedgePolicy(endpoints=['spaces/{id}/orders/{id}/', 'spaces/{id}/']))
+
+    """
+
+    def __init__(self, quantile: float = 0.95, min_delay: float = 0.01, max_delay: float = 1,
+                 min_samples: int = 20, endpoints: Iterable[str] = None):
+        """Create a policy without latency samples."""
+        self.quantile = quantile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self.endpoints = frozenset(endpoints) if endpoints is not None else None
+
+    def delay(self, metrics: MetricsRegistry, method: str, endpoint: str) -> Optional[float]:
+        """
+        Get the time after which a duplicate of a request is sent.
+
+        Parameters
+        ----------
+        metrics : MetricsRegistry
+            The metrics of the client sending the request
+        method : str
+            The http method of the request
+        endpoint : str
+            The endpoint relative to the API url
+
+        Returns
+        -------
+        float
+            The seconds to wait for a response before sending a duplicate,
+            `None` if the request is not hedged.
+
+        """
+        if method.upper() != 'GET':
+            return None
+        template = endpoint_template(endpoint)
+        if self.endpoints is not None and template not in self.endpoints:
+            return None
+        labels = {'method': 'GET', 'endpoint': template}
+        if metrics.observations(**labels) < self.min_samples:
+            return None
+        return min(self.max_delay, max(self.min_delay, metrics.quantile(self.quantile, **labels)))
+
+
+def call_hedged(executor: Executor, fn: Callable[[], Any], delay: float, on_hedge: Callable[[], None] = None,
+                on_abandoned: Callable[[Future], None] = None, slots: Semaphore = None) -> Tuple[Any, bool]:
+    """
+    Call a function, and call it again if it didn't return within `delay` seconds.
+
+    The delay starts once the first call runs, not while it is queued in the executor. If
+    `slots` has no free worker, the first call runs in the calling thread and no second call
+    is made; the second call is skipped too if no worker is free once the delay is over.
+    The call that didn't win can't be interrupted, it finishes in the background and is
+    passed to `on_abandoned` then.
+
+    Parameters
+    ----------
+    executor : Executor
+        Runs the calls
+    fn : Callable[[], Any]
+        The function
+    delay : float
+        The seconds to wait before the second call
+    on_hedge : Callable[[], None], optional
+        Called before the second call is started, by default `None`
+    on_abandoned : Callable[[Future], None], optional
+        Called with the call whose result is not used once it finished, by default `None`
+    slots : Semaphore, optional
+        The free workers of the executor, by default `None` (unbounded)
+
+    Returns
+    -------
+    Tuple[Any, bool]
+        The result of the first call returning without an exception, and whether it was the second one
+
+    Raises
+    ------
+    Exception
+        Both calls raised, the exception of the first one is raised.
+
+    """
+    started = Event()
+
+    def first_call():
+        started.set()
+        return fn()
+
+    first = _submit(executor, slots, first_call)
+    if first is None:
+        return fn(), False
+    started.wait()
+    done, _ = wait([first], delay)
+    if done:
+        return first.result(), False
+
+    def second_call():
+        if on_hedge is not None:
+            on_hedge()
+        return fn()
+
+    second = _submit(executor, slots, second_call)
+    if second is None:
+        return first.result(), False
+    pending = {first, second}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for call in done:
+            if call.exception() is None:
+                if on_abandoned is not None:
+                    (second if call is first else first).add_done_callback(on_abandoned)
+                return call.result(), call is second
+    if on_abandoned is not None:
+        second.add_done_callback(on_abandoned)
+    return first.result(), False
+
+
+def _submit(executor: Executor, slots: Optional[Semaphore], fn: Callable[[], Any]) -> Optional[Future]:
+    """Run a function in the executor if a worker is free, `None` otherwise."""
+    if slots is None:
+        return submit_in_context(executor, fn)
+    if not slots.acquire(blocking=False):
+        return None
+
+    def call():
+        try:
+            return fn()
+        finally:
+            slots.release()
+
+    return submit_in_context(executor, call)
+
+
+async def acall_hedged(fn: Callable[[], Awaitable[Any]], delay: float, on_hedge: Callable[[], None] = None,
+                       slots: asyncio.Semaphore = None) -> Tuple[Any, bool]:
+    """
+    Await a coroutine function, and await it again if it didn't return within `delay` seconds.
+
+    Every call holds one of `slots` while it runs. The delay starts once the first call
+    holds one, and the second call is skipped if none is free then. The call that didn't
+    win is cancelled.
+
+    Parameters
+    ----------
+    fn : Callable[[], Awaitable[Any]]
+        The coroutine function
+    delay : float
+        The seconds to wait before the second call
+    on_hedge : Callable[[], None], optional
+        Called before the second call is started, by default `None`
+    slots : asyncio.Semaphore, optional
+        Limits the calls running at the same time, by default `None` (unbounded)
+
+    Returns
+    -------
+    Tuple[Any, bool]
+        The result of the first call returning without an exception, and whether it was the second one
+
+    Raises
+    ------
+    Exception
+        Both calls raised, the exception of the first one is raised.
+
+    """
+    if slots is not None:
+        await slots.acquire()
+    first = _start(fn, slots)
+    pending = {first}
+    try:
+        done, pending = await asyncio.wait(pending, timeout=delay)
+        if done:
+            return first.result(), False
+        if slots is not None and slots.locked():
+            return await first, False
+        if on_hedge is not None:
+            on_hedge()
+        if slots is not None:
+            await slots.acquire()
+        second = _start(fn, slots)
+        pending = {first, second}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for call in done:
+                if call.exception() is None:
+                    return call.result(), call is second
+        return first.result(), False
+    finally:
+        for call in pending:
+            call.cancel()
+
+
+def _start(fn: Callable[[], Awaitable[Any]], slots: Optional[asyncio.Semaphore]) -> 'asyncio.Future':
+    """Start a call holding an acquired slot, which it releases when it is done, even if cancelled before it ran."""
+    task = asyncio.ensure_future(fn())
+    if slots is not None:
+        task.add_done_callback(lambda _: slots.release())
+    return task
@@ -0,0 +1,185 @@
+"""The instruments looked up by a client, keyed by isin."""
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import monotonic
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from lemon_markets.helpers.tracing import submit_in_context
+
+
+class InstrumentRegistry:
+    """
+    Keeps the instruments looked up with a client in memory, so each isin is only requested once.
+
+    :meth:`Orders.fetch_orders` and :meth:`Portfolio.update_positions` resolve the instruments
+    of their orders and positions here. Isins missing in the registry are requested together,
+    concurrently, and lookups of the same isin by several threads share one request if the
+    client coalesces requests. Instruments are requested again after `ttl` seconds, and the
+    least recently used ones are dropped once the registry holds `max_size` of them. The
+    registry is safe to use from several threads.
+
+    Parameters
+    ----------
+    ttl : float, optional
+        The seconds an instrument is used for, by default `3600`
+    max_size : int, optional
+        The maximum number of instruments, by default `10000`
+
+    Attributes
+    ----------
+    hits : int
+        The number of isins found in the registry
+    misses : int
+        The number of isins that had to be requested
+
+    """
+
+    def __init__(self, ttl: float = 3600, max_size: int = 10000):
+        """Create an empty registry."""
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+        self._entries: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+
+    def __len__(self) -> int:
+        """Get the number of instruments, including expired ones not evicted yet."""
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, isin: str) -> bool:
+        """Check whether an instrument is in the registry and not expired."""
+        return self.get(isin) is not None
+
+    def get(self, isin: str) -> Optional[Any]:
+        """
+        Get an instrument if it is in the registry and not expired.
+
+        Parameters
+        ----------
+        isin : str
+            The isin of the instrument
+
+        Returns
+        -------
+        Optional[Instrument]
+            The instrument, `None` if it has to be requested
+
+        """
+        with self._lock:
+            entry = self._entries.get(isin)
+            if entry is None:
+                return None
+            if entry[0] <= monotonic():
+                del self._entries[isin]
+                return None
+            self._entries.move_to_end(isin)
+            return entry[1]
+
+    def put(self, isin: str, instrument: Any):
+        """
+        Add an instrument, evicting the least recently used one if the registry is full.
+
+        Parameters
+        ----------
+        isin : str
+            The isin of the instrument
+        instrument : Instrument
+            The instrument
+
+        """
+        with self._lock:
+            self._entries[isin] = (monotonic() + self.ttl, instrument)
+            self._entries.move_to_end(isin)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, isin: str = None):
+        """
+        Remove instruments, so they are requested again on next use.
+
+        Parameters
+        ----------
+        isin : str, optional
+            The isin of the instrument to remove, by default `None` (all)
+
+        """
+        with self._lock:
+            if isin is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(isin, None)
+
+    def _lookup(self, isins: Iterable[str]) -> Tuple[Dict[str, Any], list]:
+        found = {}
+        missing = []
+        for isin in dict.fromkeys(isins):
+            instrument = self.get(isin)
+            if instrument is None:
+                missing.append(isin)
+            else:
+                found[isin] = instrument
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(missing)
+        return found, missing
+
+    def resolve(self, isins: Iterable[str], fetch: Callable[[str], Any], concurrency: int = 10) -> Dict[str, Any]:
+        """
+        Get instruments by isin, requesting the missing ones concurrently.
+
+        Parameters
+        ----------
+        isins : Iterable[str]
+            The isins, may contain duplicates
+        fetch : Callable[[str], Instrument]
+            Requests the instrument of an isin
+        concurrency : int, optional
+            The maximum number of instruments requested at the same time, by default `10`
+
+        Returns
+        -------
+        Dict[str, Instrument]
+            The instruments keyed by isin
+
+        """
+        found, missing = self._lookup(isins)
+        if len(missing) == 1 or concurrency < 2:
+            fetched = [fetch(isin) for isin in missing]
+        elif missing:
+            with ThreadPoolExecutor(max_workers=min(concurrency, len(missing))) as executor:
+                fetched = [future.result() for future in [submit_in_context(executor, fetch, isin)
+                                                          for isin in missing]]
+        else:
+            fetched = []
+        for isin, instrument in zip(missing, fetched):
+            self.put(isin, instrument)
+            found[isin] = instrument
+        return found
+
+    async def aresolve(self, isins: Iterable[str], fetch: Callable[[str], Awaitable[Any]]) -> Dict[str, Any]:
+        """
+        Get instruments by isin with asyncio, requesting the missing ones concurrently.
+
+        Parameters
+        ----------
+        isins : Iterable[str]
+            The isins, may contain duplicates
+        fetch : Callable[[str], Awaitable[Instrument]]
+            Requests the instrument of an isin
+
+        Returns
+        -------
+        Dict[str, Instrument]
+            The instruments keyed by isin
+
+        """
+        found, missing = self._lookup(isins)
+        fetched = await asyncio.gather(*(fetch(isin) for isin in missing))
+        for isin, instrument in zip(missing, fetched):
+            self.put(isin, instrument)
+            found[isin] = instrument
+        return found
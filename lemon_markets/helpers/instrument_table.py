@@ -0,0 +1,118 @@
+"""Tables of instruments for pandas and Arrow, built directly from response data."""
+from itertools import repeat
+from typing import TYPE_CHECKING, Dict, Iterable, List
+
+if TYPE_CHECKING:
+    # pandas and pyarrow take long to import, so they are only imported when a table is built
+    from pandas import DataFrame
+    from pyarrow import Table
+
+COLUMNS = ('isin', 'wkn', 'name', 'title', 'symbol', 'type', 'mic', 'currency', 'tradable')
+TYPES = ('stock', 'bond', 'fund', 'warrant')
+
+
+def instrument_columns(results: Iterable[dict]) -> Dict[str, List]:
+    """
+    Flatten instrument data into columns, one row per instrument and venue.
+
+    Instruments without venues get one row with `None` as mic, currency and tradable.
+
+    Parameters
+    ----------
+    results : Iterable[dict]
+        The instrument data as returned by `instruments/`
+
+    Returns
+    -------
+    Dict[str, List]
+        The values of every column in :data:`COLUMNS`
+
+    Raises
+    ------
+    ValueError
+        Raised if an instrument type is not known
+
+    """
+    columns = {column: [] for column in COLUMNS}
+    instrument_fields = [(field, columns[field].extend) for field in COLUMNS[:6]]
+    add_mic, add_currency, add_tradable = (columns[column].append for column in COLUMNS[6:])
+    no_venues = ({'mic': None, 'currency': None, 'tradable': None},)
+    for data in results:
+        venues = data['venues'] or no_venues
+        for field, extend in instrument_fields:
+            extend(repeat(data[field], len(venues)))
+        for venue in venues:
+            add_mic(venue['mic'])
+            add_currency(venue['currency'])
+            add_tradable(venue['tradable'])
+    unknown = set(columns['type']).difference(TYPES)
+    if unknown:
+        raise ValueError(f'Unexpected instrument type: {unknown.pop()}')
+    return columns
+
+
+def instruments_dataframe(results: Iterable[dict]) -> 'DataFrame':
+    """
+    Build a pandas DataFrame of instruments, one row per instrument and venue.
+
+    The type, mic and currency are categorical and tradable is a nullable boolean,
+    see :func:`instrument_columns` for the rows.
+
+    Parameters
+    ----------
+    results : Iterable[dict]
+        The instrument data as returned by `instruments/`
+
+    Returns
+    -------
+    pandas.DataFrame
+        The instruments with the columns in :data:`COLUMNS`
+
+    """
+    import pandas
+
+    columns = instrument_columns(results)
+    return pandas.DataFrame({
+        **{column: columns[column] for column in COLUMNS[:5]},
+        'type': pandas.Categorical(columns['type'], categories=TYPES),
+        'mic': pandas.Categorical(columns['mic']),
+        'currency': pandas.Categorical(columns['currency']),
+        'tradable': pandas.array(columns['tradable'], dtype='boolean'),
+    }, columns=list(COLUMNS))
+
+
+def instruments_arrow(results: Iterable[dict]) -> 'Table':
+    """
+    Build an Arrow table of instruments, one row per instrument and venue.
+
+    The type, mic and currency are dictionary encoded, see :func:`instrument_columns` for the rows.
+
+    Parameters
+    ----------
+    results : Iterable[dict]
+        The instrument data as returned by `instruments/`
+
+    Returns
+    -------
+    pyarrow.Table
+        The instruments with the columns in :data:`COLUMNS`
+
+    Raises
+    ------
+    ImportError
+        pyarrow is not installed.
+
+    """
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError('Arrow tables require pyarrow. Install it with `pip install lemon_markets[arrow]`.')
+
+    columns = instrument_columns(results)
+    dictionary = pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+    return pyarrow.table({
+        **{column: pyarrow.array(columns[column], pyarrow.string()) for column in COLUMNS[:5]},
+        **{column: pyarrow.array(columns[column], pyarrow.string()).cast(dictionary)
+           for column in ('type', 'mic', 'currency')},
+        'tradable': pyarrow.array(columns['tradable'], pyarrow.bool_()),
+    })
@@ -0,0 +1,324 @@
+"""Latency and throughput metrics of the requests made by the SDK."""
+import re
+from collections import defaultdict
+from threading import Lock
+from typing import Dict, Iterable, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+COUNTERS = {
+    'requests': 'Responses received, by status code.',
+    'errors': 'Requests that failed without a response.',
+    'retries': 'Requests sent again by the retry policy.',
+    'throttled': 'Responses with status 429 handled by the rate limiter.',
+    'request_bytes': 'Bytes of request bodies sent.',
+    'response_bytes': 'Bytes of response bodies received, after decompression.',
+    'response_wire_bytes': 'Bytes of response bodies received on the wire, before decompression.',
+    'pages': 'Pages received by paged listings.',
+    'cache_hits': 'Requests answered by the response cache.',
+    'cache_revalidations': 'Stale cache entries confirmed by the API.',
+    'cache_misses': 'Cacheable requests not found in the response cache.',
+    'hedges': 'Duplicate requests sent because the first one was slower than usual.',
+    'hedge_wins': 'Duplicate requests answered before the request they duplicated.',
+    'hedges_abandoned': 'Requests of a hedged pair whose response was not used, counted once they finished.',
+    'circuit_open': 'Requests rejected without being sent because the circuit of the host was open.',
+}
+HISTOGRAMS = {
+    'request_duration_seconds': 'Time from sending a request until its body was received.',
+    'request_ttfb_seconds': 'Time from sending a request until its headers were received.',
+}
+
+_ID_SEGMENT = re.compile(r'^([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|[a-z]{2,4}_\w+|\d+)$', re.I)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def endpoint_template(endpoint: str) -> str:
+    """
+    Get the endpoint of a request with ids replaced by `{id}`, e.g. `spaces/{id}/orders/`.
+
+    Parameters
+    ----------
+    endpoint : str
+        The endpoint relative to the API url, optionally with a query
+
+    Returns
+    -------
+    str
+        The endpoint template
+
+    """
+    path = endpoint.split('?', 1)[0].lstrip('/')
+    return '/'.join('{id}' if _ID_SEGMENT.match(segment) else segment for segment in path.split('/'))
+
+
+class MetricsRegistry:
+    """
+    Collects metrics of the requests of one or more clients.
+
+    Every metric is labelled with the http method and :func:`endpoint_template` of the request.
+    Counters are listed in :data:`COUNTERS`, histograms in :data:`HISTOGRAMS`.
+
+    Parameters
+    ----------
+    buckets : Iterable[float], optional
+        The upper bounds of the histogram buckets in seconds, by default :data:`DEFAULT_BUCKETS`
+
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        """Create an empty registry."""
+        self.buckets = tuple(sorted(buckets))
+        self._lock = Lock()
+        self._counters: Dict[Tuple[str, Labels], float] = defaultdict(float)
+        self._histograms: Dict[Tuple[str, Labels], list] = {}
+
+    def inc(self, name: str, value: float = 1, **labels: str):
+        """
+        Increase a counter.
+
+        Parameters
+        ----------
+        name : str
+            The name of the counter
+        value : float, optional
+            The amount to increase by, by default `1`
+        labels : str
+            The labels of the counter
+
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] += value
+
+    def observe(self, name: str, value: float, **labels: str):
+        """
+        Add a value to a histogram.
+
+        Parameters
+        ----------
+        name : str
+            The name of the histogram
+        value : float
+            The observed value
+        labels : str
+            The labels of the histogram
+
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                # a count per bucket, the count of values above all buckets, the sum
+                histogram = self._histograms[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    break
+            else:
+                i = len(self.buckets)
+            histogram[i] += 1
+            histogram[-1] += value
+
+    def record_response(self, method: str, endpoint: str, status: int, seconds: float, ttfb: float = None,
+                        request_bytes: int = 0, response_bytes: int = 0, wire_bytes: int = None):
+        """
+        Record a received response.
+
+        Parameters
+        ----------
+        method : str
+            The http method of the request
+        endpoint : str
+            The endpoint relative to the API url
+        status : int
+            The response status code
+        seconds : float
+            The time until the body was received
+        ttfb : float, optional
+            The time until the headers were received, if known
+        request_bytes : int, optional
+            The size of the request body
+        response_bytes : int, optional
+            The size of the response body
+        wire_bytes : int, optional
+            The size of the response body before decompression, by default `response_bytes`
+
+        """
+        labels = {'method': method.upper(), 'endpoint': endpoint_template(endpoint)}
+        self.inc('requests', status=str(status), **labels)
+        self.observe('request_duration_seconds', seconds, **labels)
+        if ttfb is not None:
+            self.observe('request_ttfb_seconds', ttfb, **labels)
+        if request_bytes:
+            self.inc('request_bytes', request_bytes, **labels)
+        if response_bytes:
+            self.inc('response_bytes', response_bytes, **labels)
+        wire_bytes = response_bytes if wire_bytes is None else wire_bytes
+        if wire_bytes:
+            self.inc('response_wire_bytes', wire_bytes, **labels)
+
+    def count(self, name: str, method: str, endpoint: str, value: float = 1):
+        """
+        Increase a counter of a request.
+
+        Parameters
+        ----------
+        name : str
+            The name of the counter, one of :data:`COUNTERS`
+        method : str
+            The http method of the request
+        endpoint : str
+            The endpoint relative to the API url
+        value : float, optional
+            The amount to increase by, by default `1`
+
+        """
+        self.inc(name, value, method=method.upper(), endpoint=endpoint_template(endpoint))
+
+    def quantile(self, q: float, name: str = 'request_duration_seconds', **labels: str) -> float:
+        """
+        Estimate a quantile of a histogram.
+
+        Parameters
+        ----------
+        q : float
+            The quantile, between `0` and `1`
+        name : str, optional
+            The name of the histogram, by default `request_duration_seconds`
+        labels : str
+            The labels of the histogram
+
+        Returns
+        -------
+        float
+            The upper bound of the bucket containing the quantile, `None` if nothing was observed.
+            Infinite if it is above all buckets.
+
+        """
+        with self._lock:
+            histogram = self._histograms.get((name, tuple(sorted(labels.items()))))
+            if histogram is None:
+                return None
+            counts = histogram[:-1]
+        rank = q * sum(counts)
+        seen = 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            seen += count
+            if seen >= rank and count:
+                return bound
+        return float('inf')
+
+    def observations(self, name: str = 'request_duration_seconds', **labels: str) -> int:
+        """
+        Count the values added to a histogram.
+
+        Parameters
+        ----------
+        name : str, optional
+            The name of the histogram, by default `request_duration_seconds`
+        labels : str
+            The labels of the histogram
+
+        Returns
+        -------
+        int
+            The number of observed values
+
+        """
+        with self._lock:
+            histogram = self._histograms.get((name, tuple(sorted(labels.items()))))
+            return sum(histogram[:-1]) if histogram is not None else 0
+
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        Summarize the metrics per request.
+
+        Returns
+        -------
+        Dict[str, dict]
+            For every method and endpoint (e.g. `GET venues/`) the number of `requests` and
+            of each counter, the `mean_seconds` and `p50_seconds`/`p95_seconds`/`p99_seconds`
+            estimates of the duration, the `compression_ratio` of the response bodies and,
+            for cached endpoints, the `cache_hit_ratio`.
+
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            durations = {labels: list(values) for (name, labels), values in self._histograms.items()
+                         if name == 'request_duration_seconds'}
+        summary = defaultdict(lambda: defaultdict(float))
+        for (name, labels), value in counters.items():
+            labels = dict(labels)
+            summary[f'{labels["method"]} {labels["endpoint"]}'][name] += value
+        for labels, histogram in durations.items():
+            entry = summary['{method} {endpoint}'.format(**dict(labels))]
+            count = sum(histogram[:-1])
+            entry['mean_seconds'] = histogram[-1] / count if count else 0.0
+            for q in (50, 95, 99):
+                entry[f'p{q}_seconds'] = self.quantile(q / 100, **dict(labels))
+        for entry in summary.values():
+            if entry.get('response_wire_bytes'):
+                entry['compression_ratio'] = entry.get('response_bytes', 0) / entry['response_wire_bytes']
+            hits = entry.get('cache_hits', 0) + entry.get('cache_revalidations', 0)
+            lookups = hits + entry.get('cache_misses', 0)
+            if lookups:
+                entry['cache_hit_ratio'] = hits / lookups
+        return {request: dict(entry) for request, entry in summary.items()}
+
+    def to_prometheus(self, prefix: str = 'lemon_markets_') -> str:
+        """
+        Export the metrics in the Prometheus text format.
+
+        Parameters
+        ----------
+        prefix : str, optional
+            The prefix of the metric names, by default `lemon_markets_`
+
+        Returns
+        -------
+        str
+            The metrics in the Prometheus text exposition format
+
+        """
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((key, list(values)) for key, values in self._histograms.items())
+        lines = []
+        for name, help in COUNTERS.items():
+            samples = [(labels, value) for (n, labels), value in counters if n == name]
+            if not samples:
+                continue
+            lines += [f'# HELP {prefix}{name}_total {help}', f'# TYPE {prefix}{name}_total counter']
+            lines += [f'{prefix}{name}_total{_format_labels(labels)} {_format_value(value)}'
+                      for labels, value in samples]
+        for name, help in HISTOGRAMS.items():
+            samples = [(labels, values) for (n, labels), values in histograms if n == name]
+            if not samples:
+                continue
+            lines += [f'# HELP {prefix}{name} {help}', f'# TYPE {prefix}{name} histogram']
+            for labels, values in samples:
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float('inf'),), values[:-1]):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else _format_value(bound)
+                    lines.append(f'{prefix}{name}_bucket{_format_labels(labels + (("le", le),))} {cumulative}')
+                lines.append(f'{prefix}{name}_sum{_format_labels(labels)} {_format_value(values[-1])}')
+                lines.append(f'{prefix}{name}_count{_format_labels(labels)} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        """Remove all collected metrics."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + '}'
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
@@ -0,0 +1,135 @@
+"""Client-side rate limiting of requests to the API."""
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from random import uniform
+from threading import Lock
+from time import monotonic
+
+
+class RateLimiter:
+    """
+    Token bucket limiting the request rate of a client.
+
+    The rate adapts to throttling by the API: every `429 Too Many Requests` response
+    halves it and pauses all requests for the time given in the `Retry-After` header
+    (or a jittered exponential backoff without one). Every successful request raises
+    it again, up to `rate`. Pass the same limiter to several clients using the same token
+    to share the limit between them.
+
+    Parameters
+    ----------
+    rate : float, optional
+        The maximum number of requests per second, by default `20`
+    burst : int, optional
+        The number of requests that may be sent at once after a quiet period, by default `rate`
+    min_rate : float, optional
+        The rate is never lowered below this, by default `1`
+    max_retries : int, optional
+        How often a throttled request is retried before the error is raised, by default `5`
+    backoff_factor : float, optional
+        The base of the exponential backoff in seconds, by default `0.5`
+    max_backoff : float, optional
+        The maximum backoff in seconds, by default `30`
+
+    """
+
+    def __init__(self, rate: float = 20, burst: int = None, min_rate: float = 1, max_retries: int = 5,
+                 backoff_factor: float = 0.5, max_backoff: float = 30):
+        """Create a limiter allowing `burst` requests at once."""
+        self.max_rate = rate
+        self.burst = burst or max(1, int(rate))
+        self.min_rate = min(min_rate, rate)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+
+        self._rate = rate
+        self._tokens = self.burst
+        self._updated = monotonic()
+        self._paused_until = 0
+        self._throttled = 0
+        self._lock = Lock()
+
+    @property
+    def rate(self) -> float:
+        """
+        The current rate.
+
+        Returns
+        -------
+        float
+            The current number of requests allowed per second
+
+        """
+        return self._rate
+
+    def acquire(self) -> float:
+        """
+        Take a token for a request.
+
+        Returns
+        -------
+        float
+            The number of seconds to wait before sending the request
+
+        """
+        with self._lock:
+            now = monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self._rate if self._tokens < 0 else 0
+            return max(wait, self._paused_until - now)
+
+    def on_success(self):
+        """Raise the rate after a request that was not throttled."""
+        with self._lock:
+            self._throttled = 0
+            self._rate = min(self.max_rate, self._rate + self.max_rate / 20)
+
+    def on_throttle(self, retry_after: float = None):
+        """
+        Lower the rate and pause all requests after a throttled request.
+
+        Parameters
+        ----------
+        retry_after : float, optional
+            The seconds to pause as requested by the API, by default a jittered exponential backoff
+
+        """
+        with self._lock:
+            if retry_after is None:
+                retry_after = uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** self._throttled))
+            self._throttled += 1
+            self._rate = max(self.min_rate, self._rate / 2)
+            self._paused_until = max(self._paused_until, monotonic() + retry_after)
+
+
+def parse_retry_after(value: str = None) -> float:
+    """
+    Parse the value of a `Retry-After` header.
+
+    Parameters
+    ----------
+    value : str, optional
+        Either a number of seconds or a http date
+
+    Returns
+    -------
+    float
+        The seconds to wait, or `None` if the value is missing or invalid
+
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
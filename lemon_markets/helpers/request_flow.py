@@ -0,0 +1,321 @@
+"""The decisions around sending a request, shared by the sync and asyncio clients."""
+from typing import TYPE_CHECKING, Any, Callable, Optional
+from urllib.parse import urlsplit
+
+from lemon_markets.exceptions import CircuitOpenError
+from lemon_markets.helpers.rate_limit import parse_retry_after
+from lemon_markets.helpers.retry import IDEMPOTENT_METHODS
+from lemon_markets.helpers.tracing import Span
+
+if TYPE_CHECKING:
+    from lemon_markets.client import Client
+
+# what to do after a response, see :meth:`RequestFlow.on_response`
+DONE = 'done'
+RETRY = 'retry'
+RESEND = 'resend'
+
+
+class RequestFlow:
+    """
+    Serves a request from the response cache and decides when its attempts are retried.
+
+    Accounts every attempt in the circuit breaker, rate limiter and metrics of the client, so
+    the sync and asyncio clients only send the attempts, wait and reconcile. Create one flow
+    per request, :meth:`lookup` the cache, then call :meth:`before_attempt` and :meth:`limit`
+    before every attempt and :meth:`on_response` or one of the error hooks after it, and wait
+    for :meth:`backoff` before a retry. :meth:`result` finishes the request.
+
+    Parameters
+    ----------
+    client : Client
+        The client sending the request
+    method : str
+        The http method of the request
+    url : str
+        The url of the request
+    endpoint : str
+        The endpoint relative to the API url
+    params : dict
+        The query parameters of the request
+    headers : dict
+        The headers of the request, extended by the validators of a stale cache entry
+    reconcile : bool, optional
+        Whether the result of a failed attempt can be looked up, by default `False`
+    span : Span, optional
+        The span tracing the request, by default `None`
+    response_headers : dict, optional
+        Filled with the headers of the response, by default `None`.
+        The response cache is bypassed then, as the caller validates the response itself.
+
+    Attributes
+    ----------
+    attempt : int
+        The number of retries made so far
+    response
+        The response of the last attempt, `None` if it failed without one
+    error : Exception
+        The error of the last attempt, `None` if it received a response
+
+    """
+
+    def __init__(self, client: 'Client', method: str, url: str, endpoint: str, params: dict, headers: dict,
+                 reconcile: bool = False, span: Span = None, response_headers: dict = None):
+        """Prepare the request, nothing is sent or looked up yet."""
+        self.method = method
+        self.endpoint = endpoint
+        self.attempt = 0
+        self.response = None
+        self.error = None
+        self._client = client
+        self._url = url
+        self._params = params
+        self._headers = headers
+        self._span = span
+        self._response_headers = response_headers
+        self._metrics = client.metrics
+        self._limiter = client._rate_limiter
+        self._policy = client._retry
+        self._guarded = bool(self._policy and self._policy.guarded(headers, reconcile))
+        self._reconcile = reconcile and method.upper() not in IDEMPOTENT_METHODS
+        self._breaker = client._circuit_breaker
+        self._host = urlsplit(url).netloc
+        self._throttled = 0
+        self._cache = client._cache if method.upper() == 'GET' and response_headers is None else None
+        self._cache_key = self._cached = None
+
+    def lookup(self) -> Optional[Any]:
+        """
+        Look up the response in the cache of the client.
+
+        Adds the validators of a stale entry to the request headers, so it is revalidated.
+
+        Returns
+        -------
+        Optional[Any]
+            The decoded body of a fresh cached response, `None` if the request has to be sent
+
+        """
+        if not self._cache:
+            return None
+        self._cache_key, self._cached = self._cache.lookup(self.endpoint, self._url, self._params, self._headers)
+        if self._cached is None:
+            return None
+        if self._cached.fresh:
+            self._metrics.count('cache_hits', self.method, self.endpoint)
+            if self._span is not None:
+                self._span.attributes['cache'] = 'hit'
+            return self._client._loads(self._cached.body)
+        self._headers.update(self._cached.validators())
+        return None
+
+    def before_attempt(self):
+        """
+        Check the circuit of the host before an attempt is sent.
+
+        Raises
+        ------
+        CircuitOpenError
+            The circuit of the host is open.
+
+        """
+        if self._breaker:
+            try:
+                self._breaker.before_request(self._host)
+            except CircuitOpenError:
+                self._metrics.count('circuit_open', self.method, self.endpoint)
+                raise
+
+    def limit(self) -> float:
+        """
+        Take a token of the rate limiter for an attempt.
+
+        Returns
+        -------
+        float
+            The seconds to wait before sending the attempt
+
+        """
+        return self._limiter.acquire() if self._limiter else 0
+
+    def on_error(self, error: Exception) -> bool:
+        """
+        Account an attempt that failed without a response, e.g. a connection error or timeout.
+
+        Parameters
+        ----------
+        error : Exception
+            The error of the attempt
+
+        Returns
+        -------
+        bool
+            `True` if the request is retried, else the caller raises the error
+
+        """
+        if self._breaker:
+            self._breaker.on_response(self._host)
+        self._metrics.count('errors', self.method, self.endpoint)
+        self.response = None
+        self.error = error
+        return bool(self._policy and self._policy.can_retry(self.attempt, self.method, guarded=self._guarded))
+
+    def on_failure(self):
+        """Account an attempt that failed unexpectedly, e.g. with a broken or undecodable body."""
+        if self._breaker:
+            self._breaker.on_response(self._host)
+
+    def on_abort(self):
+        """Account an attempt that was cancelled or interrupted, giving back its half-open probe slot."""
+        if self._breaker:
+            self._breaker.release(self._host)
+
+    def on_response(self, response, seconds: float, ttfb: float = None, request_bytes: int = 0,
+                    response_bytes: int = 0, wire_bytes: int = None) -> str:
+        """
+        Account the response of an attempt and decide what to do next.
+
+        Parameters
+        ----------
+        response : requests.Response | httpx.Response
+            The response
+        seconds : float
+            The time until the body was received
+        ttfb : float, optional
+            The time until the headers were received, if known
+        request_bytes : int, optional
+            The size of the request body
+        response_bytes : int, optional
+            The size of the response body
+        wire_bytes : int, optional
+            The size of the response body before decompression
+
+        Returns
+        -------
+        str
+            :data:`DONE` if the response is final, :data:`RESEND` if the request was throttled and is
+            sent again right away, or :data:`RETRY` if it is retried after :meth:`backoff`
+
+        """
+        status = response.status_code
+        self.response = response
+        self.error = None
+        if self._breaker:
+            self._breaker.on_response(self._host, status)
+        self._metrics.record_response(self.method, self.endpoint, status, seconds, ttfb, request_bytes,
+                                      response_bytes, wire_bytes)
+        if self._limiter:
+            # throttled requests were not processed, so they are safe to repeat for every method
+            if status == 429 and self._throttled < self._limiter.max_retries:
+                self._metrics.count('throttled', self.method, self.endpoint)
+                self._limiter.on_throttle(parse_retry_after(response.headers.get('Retry-After')))
+                self._throttled += 1
+                return RESEND
+            if status != 429:
+                self._limiter.on_success()
+        if self._policy and self._policy.can_retry(self.attempt, self.method, status, self._guarded):
+            return RETRY
+        return DONE
+
+    def backoff(self) -> float:
+        """
+        Count a retry.
+
+        Returns
+        -------
+        float
+            The seconds to wait before the retry, as asked by a `Retry-After` header of a `429` response
+
+        """
+        self.attempt += 1
+        wait = self._policy.backoff(self.attempt)
+        if self.response is not None and self.response.status_code == 429:
+            wait = parse_retry_after(self.response.headers.get('Retry-After')) or wait
+        return wait
+
+    @property
+    def reconciles(self) -> bool:
+        """
+        Whether the result of the failed attempt is looked up before the retry.
+
+        Returns
+        -------
+        bool
+            `True` for POST and PUT requests that can be reconciled, unless they were throttled
+
+        """
+        return self._reconcile and (self.response is None or self.response.status_code != 429)
+
+    def reconcile_failed(self):
+        """
+        Give up after the lookup of the failed attempt failed, as it is unknown whether it was executed.
+
+        Raises
+        ------
+        Exception
+            The error of the failed attempt, if it received no response. Otherwise
+            :meth:`result` raises for its error status.
+
+        """
+        if self.error is not None:
+            raise self.error
+
+    def reconciled(self, result: dict) -> dict:
+        """
+        Finish the request with the result of a failed attempt that was executed after all.
+
+        Parameters
+        ----------
+        result : dict
+            The result found by the lookup
+
+        Returns
+        -------
+        dict
+            The result
+
+        """
+        if self._span is not None:
+            self._span.attributes.update(retries=self.attempt, reconciled=True)
+        return result
+
+    def on_retry(self):
+        """Count that the request is sent again after :meth:`backoff`."""
+        self._metrics.count('retries', self.method, self.endpoint)
+
+    def result(self, raise_for_status: Callable[[], None], data: dict = None) -> Optional[dict]:
+        """
+        Finish the request with the response of the last attempt, caching it if the endpoint is cached.
+
+        Parameters
+        ----------
+        raise_for_status : Callable[[], None]
+            Raises a :class:`requests.HTTPError` if the response has an error status
+        data : dict, optional
+            The data sent with the request, returned for `DELETE` requests
+
+        Returns
+        -------
+        Optional[dict]
+            The decoded body, `None` if a conditional request was answered with `304 Not Modified`
+
+        """
+        res = self.response
+        if self._span is not None:
+            self._span.attributes.update(status=res.status_code, retries=self.attempt)
+        if self._response_headers is not None:
+            self._response_headers.update(res.headers)
+        if self._cache_key:
+            self._metrics.count('cache_revalidations' if res.status_code == 304 and self._cached else 'cache_misses',
+                                self.method, self.endpoint)
+            entry = self._cache.update(self._cache_key, self.endpoint, res.status_code, res.headers, res.content,
+                                       self._cached)
+            if entry is not None:
+                return self._client._loads(entry.body)
+        raise_for_status()
+        if res.status_code == 304:
+            return None
+
+        if self.method != 'DELETE':
+            data = self._client._loads(res.content)
+        return data
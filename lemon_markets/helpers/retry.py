@@ -0,0 +1,109 @@
+"""Retrying of requests that failed because of transient errors."""
+from random import uniform
+from typing import Iterable
+
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'DELETE'])
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+
+
+class RetryPolicy:
+    """
+    Decides whether and when a failed request is sent again.
+
+    Requests are retried after connection errors, timeouts and the status codes in
+    `statuses`. Idempotent methods (`GET`, `DELETE`, ...) are always retried. `POST` and
+    `PUT` requests are only retried if the SDK can make sure the first attempt is not
+    executed twice: a lookup finds no result of the earlier attempt (e.g.
+    :meth:`Orders.create_order` looks for the order it tried to create before sending it
+    again), or, with `trust_idempotency_key`, the request carries an idempotency key.
+    A `429 Too Many Requests` response is retried for every method, as the request was
+    not processed.
+
+    Parameters
+    ----------
+    total : int, optional
+        The maximum number of retries of a request, by default `3`
+    backoff_factor : float, optional
+        The base of the jittered exponential backoff between attempts in seconds, by default `0.2`
+    max_backoff : float, optional
+        The maximum backoff in seconds, by default `10`
+    statuses : Iterable[int], optional
+        The response status codes to retry, by default `429`, `500`, `502`, `503` and `504`
+    trust_idempotency_key : bool, optional
+        Whether the API executes requests with the same `Idempotency-Key` header only once,
+        so `POST` and `PUT` requests carrying one are retried without a lookup, by default `False`
+
+    """
+
+    def __init__(self, total: int = 3, backoff_factor: float = 0.2, max_backoff: float = 10,
+                 statuses: Iterable[int] = (429, 500, 502, 503, 504), trust_idempotency_key: bool = False):
+        """Create a retry policy."""
+        self.total = total
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.statuses = frozenset(statuses)
+        self.trust_idempotency_key = trust_idempotency_key
+
+    def can_retry(self, attempt: int, method: str, status: int = None, guarded: bool = False) -> bool:
+        """
+        Check whether a failed attempt may be retried.
+
+        Parameters
+        ----------
+        attempt : int
+            The number of retries already made
+        method : str
+            The http method of the request
+        status : int, optional
+            The response status code, `None` if the request failed without a response
+        guarded : bool, optional
+            Whether the request can be reconciled, or carries an idempotency key that is trusted,
+            by default `False`
+
+        Returns
+        -------
+        bool
+            `True` if the request should be sent again
+
+        """
+        if attempt >= self.total:
+            return False
+        if status is not None and status not in self.statuses:
+            return False
+        return status == 429 or guarded or method.upper() in IDEMPOTENT_METHODS
+
+    def guarded(self, headers: dict, reconcile: bool) -> bool:
+        """
+        Check whether a request is safe to retry for every method.
+
+        Parameters
+        ----------
+        headers : dict
+            The request headers
+        reconcile : bool
+            Whether the result of a failed attempt can be looked up
+
+        Returns
+        -------
+        bool
+            `True` if the request can be reconciled, or carries an idempotency key and `trust_idempotency_key` is set
+
+        """
+        return reconcile or (self.trust_idempotency_key and IDEMPOTENCY_HEADER in headers)
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Get the time to wait before a retry.
+
+        Parameters
+        ----------
+        attempt : int
+            The number of the retry, starting at `1`
+
+        Returns
+        -------
+        float
+            The seconds to wait
+
+        """
+        return uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** attempt))
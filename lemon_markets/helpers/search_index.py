@@ -0,0 +1,228 @@
+"""Searching instruments in memory."""
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from heapq import nsmallest
+from threading import Lock
+from typing import Dict, Iterable, List, Set
+
+IDENTIFIER_FIELDS = ('isin', 'wkn', 'symbol')
+TEXT_FIELDS = ('name', 'title')
+
+_TOKEN = re.compile(r'\w+')
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split a text into the lowercase words it is searched by.
+
+    Parameters
+    ----------
+    text : str
+        The text, e.g. the name of an instrument
+
+    Returns
+    -------
+    List[str]
+        The words
+
+    """
+    return _TOKEN.findall(text.casefold()) if text else []
+
+
+def _deletions(token: str) -> Set[str]:
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+class SearchIndex:
+    """
+    An index of instruments by isin, wkn, symbol, name and title, e.g. for autocompletion.
+
+    A query matches an instrument if it is one of its identifiers, if every word of it
+    starts a word of the name or title (or an identifier), or, for words of at least
+    `fuzzy_min_length` characters, if a word is one typo (an added, missing, replaced or
+    swapped character) away from a word of the name or title. Results are ranked in this
+    order, then in the order the instruments were added.
+
+    Parameters
+    ----------
+    fuzzy_min_length : int, optional
+        The minimum length of the words matched with a typo, by default `4`
+
+    Examples
+    --------
+    >>> index = SearchIndex()
+    >>> index.update(instrument_data)
+    >>> index.search('appel', limit=5)
+    [{'isin': 'US0378331005', 'name': 'APPLE INC.', ...}]
+
+    """
+
+    def __init__(self, fuzzy_min_length: int = 4):
+        """Create an empty index."""
+        self.fuzzy_min_length = fuzzy_min_length
+        self._lock = Lock()
+        self._documents: List[dict] = []
+        self._positions: Dict[str, int] = {}
+        self._identifiers: Dict[str, Set[int]] = defaultdict(set)
+        self._words: Dict[str, Set[int]] = defaultdict(set)
+        # built on first use after a change
+        self._sorted_identifiers: List[str] = None
+        self._sorted_words: List[str] = None
+        self._typos: Dict[str, Set[str]] = None
+
+    def __len__(self) -> int:
+        """Get the number of indexed instruments."""
+        return len(self._positions)
+
+    def update(self, documents: Iterable[dict]):
+        """
+        Add instruments, replacing the ones with the same isin.
+
+        Parameters
+        ----------
+        documents : Iterable[dict]
+            The instrument data as returned by `instruments/`
+
+        """
+        with self._lock:
+            for document in documents:
+                # a replaced instrument keeps its place in the order of the results
+                position = self._positions.get(document['isin'])
+                if position is None:
+                    position = self._positions[document['isin']] = len(self._documents)
+                    self._documents.append(document)
+                else:
+                    self._unindex(position)
+                    self._documents[position] = document
+                for field in IDENTIFIER_FIELDS:
+                    if document.get(field):
+                        self._identifiers[document[field].upper()].add(position)
+                for field in TEXT_FIELDS:
+                    for word in tokenize(document.get(field)):
+                        self._words[word].add(position)
+            self._changed()
+
+    def remove(self, isin: str):
+        """
+        Remove an instrument.
+
+        Parameters
+        ----------
+        isin : str
+            The isin of the instrument
+
+        """
+        with self._lock:
+            self._remove(isin)
+            self._changed()
+
+    def _remove(self, isin: str):
+        position = self._positions.pop(isin, None)
+        if position is not None:
+            self._unindex(position)
+            self._documents[position] = None
+
+    def _unindex(self, position: int):
+        document = self._documents[position]
+        for field in IDENTIFIER_FIELDS:
+            if document.get(field):
+                self._discard(self._identifiers, document[field].upper(), position)
+        for field in TEXT_FIELDS:
+            for word in tokenize(document.get(field)):
+                self._discard(self._words, word, position)
+
+    @staticmethod
+    def _discard(postings: Dict[str, Set[int]], key: str, position: int):
+        found = postings.get(key)
+        if found is not None:
+            found.discard(position)
+            if not found:
+                del postings[key]
+
+    def _changed(self):
+        self._sorted_identifiers = self._sorted_words = self._typos = None
+
+    def search(self, query: str, limit: int = None, fuzzy: bool = True) -> List[dict]:
+        """
+        Search instruments.
+
+        Parameters
+        ----------
+        query : str
+            An isin, wkn or symbol, or words of the name or title, possibly incomplete
+        limit : int, optional
+            The maximum number of results, by default `None` (all)
+        fuzzy : bool, optional
+            Whether to match words with a typo, by default `True`
+
+        Returns
+        -------
+        List[dict]
+            The data of the matching instruments, best matches first
+
+        """
+        with self._lock:
+            if self._sorted_words is None:
+                self._sorted_identifiers = sorted(self._identifiers)
+                self._sorted_words = sorted(self._words)
+            tiers = [set(self._identifiers.get(query.strip().upper(), ()))]
+            terms = tokenize(query)
+            if len(terms) == 1:
+                tiers += self._match(terms[0], fuzzy)
+            elif terms:
+                matches = [self._match(term, fuzzy) for term in terms]
+                # every word has to match, the worst match of a word ranks the instrument
+                common = set.intersection(*(set().union(*match) for match in matches))
+                ranked = [set(), set(), set()]
+                for position in common:
+                    ranked[max(next(rank for rank, tier in enumerate(match) if position in tier)
+                               for match in matches)].add(position)
+                tiers += ranked
+            documents = self._documents
+
+        results = []
+        seen = set()
+        for tier in tiers:
+            positions = tier - seen
+            remaining = None if limit is None else limit - len(results)
+            results += sorted(positions) if remaining is None else nsmallest(remaining, positions)
+            if remaining is not None and len(results) >= limit:
+                break
+            seen |= tier
+        return [documents[position] for position in results]
+
+    def _match(self, term: str, fuzzy: bool) -> List[Set[int]]:
+        """Find the instruments with a word that is the term, starts with it or is a typo of it, in this order."""
+        exact = set()
+        prefix = set()
+        for words, postings, key in ((self._sorted_words, self._words, term),
+                                     (self._sorted_identifiers, self._identifiers, term.upper())):
+            for word in _starting_with(words, key):
+                (exact if word == key else prefix).update(postings[word])
+        typo = set()
+        if fuzzy and len(term) >= self.fuzzy_min_length:
+            for word in self._similar(term):
+                typo.update(self._words[word])
+        return [exact, prefix - exact, typo - exact - prefix]
+
+    def _similar(self, term: str) -> Set[str]:
+        """Find the words one typo away from the term, by the deletions they have in common."""
+        if self._typos is None:
+            self._typos = defaultdict(set)
+            for word in self._words:
+                if len(word) >= self.fuzzy_min_length - 1:
+                    self._typos[word].add(word)
+                    for deletion in _deletions(word):
+                        self._typos[deletion].add(word)
+        similar = set()
+        for key in _deletions(term) | {term}:
+            similar |= self._typos.get(key, set())
+        return similar
+
+
+def _starting_with(words: List[str], prefix: str) -> Iterable[str]:
+    i = bisect_left(words, prefix)
+    while i < len(words) and words[i].startswith(prefix):
+        yield words[i]
+        i += 1
@@ -0,0 +1,219 @@
+# undocumented on rtd
+"""Helpers for creating the pooled http sessions shared by a client."""
+
+import ssl
+from datetime import timedelta
+from http.client import responses
+from importlib.util import find_spec
+from os.path import isdir
+from threading import Lock
+from typing import Tuple, Union
+
+import requests.exceptions
+from requests import PreparedRequest, Response, Session
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import DEFAULT_CA_BUNDLE_PATH, select_proxy
+from urllib3.util import make_headers
+
+# gzip and deflate, and brotli and zstd if a decoder for them is installed
+ACCEPT_ENCODING = ', '.join(make_headers(accept_encoding=True)['accept-encoding'].split(','))
+
+_HTTP2_REQUIRED = 'HTTP/2 requires httpx and h2. Install them with `pip install lemon_markets[http2]`.'
+
+
+class HTTP2Adapter(BaseAdapter):
+    """
+    A requests adapter sending requests with HTTP/2, so concurrent requests to a host share one connection.
+
+    Like :class:`requests.adapters.HTTPAdapter`, it honors the `verify`, `cert` and `proxies`
+    of every request. Responses are always read completely, also with `stream=True`.
+
+    Parameters
+    ----------
+    pool_maxsize : int, optional
+        The maximum number of connections kept open, by default `10`
+    keep_alive : bool, optional
+        Whether to reuse connections between requests, by default `True`
+
+    Raises
+    ------
+    ImportError
+        httpx or h2 is not installed.
+
+    """
+
+    def __init__(self, pool_maxsize: int = 10, keep_alive: bool = True):
+        """Create the adapter with its own httpx client."""
+        super().__init__()
+        if find_spec('httpx') is None or find_spec('h2') is None:
+            raise ImportError(_HTTP2_REQUIRED)
+        import httpx
+
+        self._httpx = httpx
+        self._limits = httpx.Limits(max_connections=None,
+                                    max_keepalive_connections=pool_maxsize if keep_alive else 0)
+        # httpx takes the tls settings and proxy per client, so there is one for every combination used
+        self._clients = {}
+        self._lock = Lock()
+
+    def _client(self, verify: Union[bool, str], cert: Union[str, Tuple[str, str]], proxy: str):
+        """Return the httpx client for the tls settings and proxy of a request, creating it on first use."""
+        key = (verify, cert, proxy)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                # requests already applied the environment (e.g. `REQUESTS_CA_BUNDLE`, `HTTPS_PROXY`)
+                client = self._clients[key] = self._httpx.Client(
+                    http2=True, limits=self._limits, verify=_ssl_context(verify, cert), proxy=proxy, trust_env=False)
+            return client
+
+    def send(self, request: PreparedRequest, stream: bool = False, timeout=None, verify=True, cert=None,
+             proxies=None) -> Response:
+        """Send a request over HTTP/2, raising the errors of requests on failures."""
+        httpx = self._httpx
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            timeout = httpx.Timeout(read, connect=connect)
+        if isinstance(cert, list):
+            cert = tuple(cert)
+        client = self._client(verify, cert, select_proxy(request.url, proxies))
+        try:
+            res = client.request(request.method, request.url, headers=dict(request.headers),
+                                 content=request.body, timeout=timeout)
+        except httpx.ConnectTimeout as e:
+            raise requests.exceptions.ConnectTimeout(e, request=request)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.ReadTimeout(e, request=request)
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(e, request=request)
+
+        response = Response()
+        response.status_code = res.status_code
+        response.reason = res.reason_phrase or responses.get(res.status_code)
+        # the body is already decoded, so its encoding headers don't apply anymore
+        response.headers = CaseInsensitiveDict((name, value) for name, value in res.headers.items()
+                                               if name.lower() not in ('content-encoding', 'content-length'))
+        response._content = res.content
+        response.encoding = res.encoding
+        response.url = str(res.url)
+        response.request = request
+        response.connection = self
+        response.elapsed = res.elapsed if res.elapsed is not None else timedelta(0)
+        return response
+
+    def close(self):
+        """Close the connections of the httpx clients."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+
+def _ssl_context(verify: Union[bool, str], cert: Union[str, Tuple[str, str]] = None) -> Union[bool, ssl.SSLContext]:
+    """Build the tls settings of httpx from the `verify` and `cert` of a requests request."""
+    if not cert and isinstance(verify, bool):
+        return verify
+    if verify is False:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    elif verify is True:
+        context = ssl.create_default_context(cafile=DEFAULT_CA_BUNDLE_PATH)
+    elif isdir(verify):
+        context = ssl.create_default_context(capath=verify)
+    else:
+        context = ssl.create_default_context(cafile=verify)
+    if cert:
+        context.load_cert_chain(*((cert,) if isinstance(cert, str) else cert))
+    return context
+
+
+def create_session(pool_connections: int = 10, pool_maxsize: int = 10,
+                   pool_block: bool = False, keep_alive: bool = True, http2: bool = False,
+                   compression: bool = True) -> Session:
+    """
+    Create a session with a keep-alive connection pool.
+
+    Parameters
+    ----------
+    pool_connections : int, optional
+        The number of hosts to keep a connection pool for, by default `10`
+    pool_maxsize : int, optional
+        The maximum number of connections kept open per host, by default `10`
+    pool_block : bool, optional
+        Whether to wait for a free connection once `pool_maxsize` is reached
+        instead of opening a throwaway connection, by default `False`
+    keep_alive : bool, optional
+        Whether to reuse connections between requests, by default `True`
+    http2 : bool, optional
+        Whether to send https requests with HTTP/2, by default `False`
+    compression : bool, optional
+        Whether to ask for compressed responses (see :data:`ACCEPT_ENCODING`), by default `True`
+
+    Returns
+    -------
+    requests.Session
+        The configured session
+
+    Raises
+    ------
+    ImportError
+        HTTP/2 was requested, but httpx or h2 is not installed.
+
+    """
+    session = Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+    # HTTP/2 is negotiated during the TLS handshake, so plain http stays on HTTP/1.1
+    session.mount('https://', HTTP2Adapter(pool_maxsize, keep_alive) if http2 else adapter)
+    session.mount('http://', adapter)
+    if not keep_alive:
+        session.headers['Connection'] = 'close'
+    session.headers['Accept-Encoding'] = ACCEPT_ENCODING if compression else 'identity'
+    return session
+
+
+def create_async_session(pool_maxsize: int = 10, keep_alive: bool = True, timeout=None, http2: bool = False,
+                         compression: bool = True):
+    """
+    Create an asyncio http session with a keep-alive connection pool.
+
+    Parameters
+    ----------
+    pool_maxsize : int, optional
+        The maximum number of keep-alive connections, by default `10`
+    keep_alive : bool, optional
+        Whether to reuse connections between requests, by default `True`
+    timeout : float | Tuple[float, float], optional
+        The timeout in seconds, either one value or a `(connect, read)` tuple, by default `None`
+    http2 : bool, optional
+        Whether to send https requests with HTTP/2, by default `False`
+    compression : bool, optional
+        Whether to ask for compressed responses with the encodings httpx can decode, by default `True`
+
+    Returns
+    -------
+    httpx.AsyncClient
+        The configured session
+
+    Raises
+    ------
+    ImportError
+        httpx is not installed, or h2 if HTTP/2 was requested.
+
+    """
+    try:
+        import httpx
+    except ImportError:
+        raise ImportError('The asyncio client requires httpx. Install it with `pip install lemon_markets[async]`.')
+    if http2 and find_spec('h2') is None:
+        raise ImportError(_HTTP2_REQUIRED)
+
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        timeout = httpx.Timeout(read, connect=connect)
+    limits = httpx.Limits(max_connections=None,
+                          max_keepalive_connections=pool_maxsize if keep_alive else 0)
+    headers = None if compression else {'Accept-Encoding': 'identity'}
+    return httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2, headers=headers)
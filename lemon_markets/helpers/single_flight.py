@@ -0,0 +1,123 @@
+# undocumented on rtd
+"""Coalescing of identical concurrent requests."""
+import asyncio
+from copy import deepcopy
+from threading import Event, Lock
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class _Call:
+    def __init__(self):
+        self.done = Event()
+        self.waiting = 0
+        self.result = None
+        self.error = None
+
+
+class _AsyncCall:
+    def __init__(self):
+        self.task: asyncio.Future = None
+        self.waiting = 0
+
+
+class SingleFlight:
+    """Runs a function only once for all threads calling it with the same key at the same time."""
+
+    def __init__(self):
+        """Create a group without running calls."""
+        self._lock = Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Call `fn`, or wait for the result of the call already running for `key`.
+
+        Parameters
+        ----------
+        key : str
+            Identifies calls that can share their result
+        fn : Callable[[], Any]
+            The function to call
+
+        Returns
+        -------
+        Any
+            The result of `fn`. Every caller gets its own copy, so they can't affect each other.
+
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiting += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return deepcopy(call.result)
+
+        result = None
+        try:
+            result = fn()
+            return result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            # the waiting callers copy a snapshot taken before the result is returned, so it can't change meanwhile
+            if call.waiting and call.error is None:
+                try:
+                    call.result = deepcopy(result)
+                except BaseException as e:
+                    call.error = e
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """Runs a coroutine only once for all tasks awaiting it with the same key at the same time."""
+
+    def __init__(self):
+        """Create a group without running calls."""
+        self._calls: Dict[str, _AsyncCall] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await `fn()`, or the call already running for `key`.
+
+        Cancelling one of the awaiting tasks doesn't cancel the shared call.
+
+        Parameters
+        ----------
+        key : str
+            Identifies calls that can share their result
+        fn : Callable[[], Awaitable[Any]]
+            The coroutine function to call
+
+        Returns
+        -------
+        Any
+            The result of `fn`. Every caller gets its own copy, so they can't affect each other.
+
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = _AsyncCall()
+            call.task = asyncio.ensure_future(self._run(key, call, fn))
+            result, _ = await asyncio.shield(call.task)
+            return result
+        call.waiting += 1
+        _, snapshot = await asyncio.shield(call.task)
+        return deepcopy(snapshot)
+
+    async def _run(self, key: str, call: _AsyncCall, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, Any]:
+        """Await `fn()`, returning its result and a snapshot of it for the waiting callers."""
+        try:
+            result = await fn()
+        finally:
+            self._calls.pop(key, None)
+        return result, deepcopy(result) if call.waiting else None
@@ -1,11 +1,8 @@
 """Various helper functions for dealing with time."""
-from datetime import datetime
+from datetime import datetime, timezone
 from time import time
 from typing import Union
 
-from dateutil.parser import parse
-from pytz import timezone
-
 
 def timestamp_seconds_to_datetime(ts: Union[int, float]) -> datetime:
     """
@@ -116,9 +113,18 @@ def parse_datetime(datestring: str, tzfallback: str = 'UTC') -> datetime:
         The timezone-aware datetime parsed from the string.
 
     """
-    time = parse(datestring)
+    # dateutil and pytz take long to import, so they are only imported for what the standard library can't do
+    try:
+        time = datetime.fromisoformat(datestring)
+    except ValueError:
+        from dateutil.parser import parse
+        time = parse(datestring)
     if not time.tzinfo:
-        time = timezone(tzfallback).localize(time)
+        if tzfallback == 'UTC':
+            time = time.replace(tzinfo=timezone.utc)
+        else:
+            import pytz
+            time = pytz.timezone(tzfallback).localize(time)
     return time.astimezone()
 
 
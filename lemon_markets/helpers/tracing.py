@@ -0,0 +1,286 @@
+"""Tracing of SDK calls and the requests they make."""
+import asyncio
+from collections import deque
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from dataclasses import dataclass, field
+from functools import wraps
+from threading import Lock
+from time import perf_counter, time
+from typing import Callable, Iterable, Iterator, List, Optional
+from uuid import uuid4
+
+
+@dataclass
+class Span:
+    """
+    A traced SDK call (e.g. `Orders.fetch_orders`) or one of the requests it made.
+
+    Attributes
+    ----------
+    name : str
+        The name of the call, or the method and endpoint of the request
+    kind : str
+        Either `call` or `request`
+    trace_id : str
+        The id shared by all spans started from the same outermost call
+    span_id : str
+        The id of the span
+    parent_id : str
+        The id of the call that started this span, `None` for the outermost call
+    start : float
+        The unix timestamp the span started at
+    end : float
+        The unix timestamp the span ended at, `None` while it is running
+    duration : float
+        The duration in seconds, `None` while it is running
+    attributes : dict
+        Details of the span. Requests have `method`, `endpoint`, `url`, `params`, `status`, `retries`
+        and, when part of a paged listing, `page`. Cached responses have `cache` set to `hit`.
+    error : BaseException
+        The exception the span failed with
+
+    """
+
+    name: str
+    kind: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    start: float = None
+    end: float = None
+    duration: float = None
+    attributes: dict = field(default_factory=dict)
+    error: BaseException = None
+
+
+_current_span: ContextVar = ContextVar('lemon_markets_span', default=None)
+
+
+def current_span() -> Optional[Span]:
+    """
+    Get the innermost running span.
+
+    Returns
+    -------
+    Optional[Span]
+        The span, `None` outside of traced calls
+
+    """
+    return _current_span.get()
+
+
+class Tracer:
+    """
+    Creates spans for the calls and requests of a client and passes them to hooks and collectors.
+
+    Collectors (e.g. :class:`InMemoryCollector` or :class:`OpenTelemetryCollector`) have
+    `on_start(span)` and `on_end(span)` methods, called for every span. The hooks are lists
+    of functions taking a request span.
+
+    Parameters
+    ----------
+    collectors : Iterable, optional
+        The collectors to pass every span to
+
+    Attributes
+    ----------
+    before_send : List[Callable[[Span], None]]
+        Called before a request is sent
+    after_receive : List[Callable[[Span], None]]
+        Called after the response of a request was received
+    on_error : List[Callable[[Span], None]]
+        Called after a request failed
+
+    """
+
+    def __init__(self, collectors: Iterable = ()):
+        """Create a tracer passing its spans to `collectors`."""
+        self.collectors = list(collectors)
+        self.before_send: List[Callable[[Span], None]] = []
+        self.after_receive: List[Callable[[Span], None]] = []
+        self.on_error: List[Callable[[Span], None]] = []
+
+    @contextmanager
+    def span(self, name: str, kind: str = 'call', **attributes) -> Iterator[Span]:
+        """
+        Trace the code in the `with` block as a child of the running span.
+
+        Parameters
+        ----------
+        name : str
+            The name of the span
+        kind : str, optional
+            Either `call` or `request`, by default `call`
+        attributes
+            The attributes of the span
+
+        Yields
+        ------
+        Span
+            The span
+
+        """
+        parent = _current_span.get()
+        span = Span(name, kind, parent.trace_id if parent else uuid4().hex, uuid4().hex[:16],
+                    parent.span_id if parent else None, time(), attributes=attributes)
+        started = perf_counter()
+        token = _current_span.set(span)
+        try:
+            for collector in self.collectors:
+                collector.on_start(span)
+            if kind == 'request':
+                for hook in self.before_send:
+                    hook(span)
+            yield span
+        except BaseException as e:
+            span.error = e
+            self._end(span, started, self.on_error)
+            raise
+        else:
+            self._end(span, started, self.after_receive)
+        finally:
+            _current_span.reset(token)
+
+    def _end(self, span: Span, started: float, hooks: List[Callable[[Span], None]]):
+        span.duration = perf_counter() - started
+        span.end = span.start + span.duration
+        if span.kind == 'request':
+            for hook in hooks:
+                hook(span)
+        for collector in self.collectors:
+            collector.on_end(span)
+
+
+def traced(fn: Callable) -> Callable:
+    """Trace calls of a method of a resource class (or coroutine method) with the tracer of its client."""
+    name = fn.__qualname__
+
+    if asyncio.iscoroutinefunction(fn):
+        @wraps(fn)
+        async def async_wrapper(self, *args, **kwargs):
+            tracer = self._client._tracer
+            if tracer is None:
+                return await fn(self, *args, **kwargs)
+            with tracer.span(name):
+                return await fn(self, *args, **kwargs)
+        return async_wrapper
+
+    @wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        tracer = self._client._tracer
+        if tracer is None:
+            return fn(self, *args, **kwargs)
+        with tracer.span(name):
+            return fn(self, *args, **kwargs)
+    return wrapper
+
+
+def submit_in_context(executor: Executor, fn: Callable, *args, **kwargs) -> Future:
+    """Submit `fn` to an executor, keeping the running span as the parent of spans started by it."""
+    return executor.submit(copy_context().run, fn, *args, **kwargs)
+
+
+class InMemoryCollector:
+    """
+    Keeps the latest finished spans in memory.
+
+    Parameters
+    ----------
+    maxlen : int, optional
+        The maximum number of spans kept, by default `10000`
+
+    Attributes
+    ----------
+    spans : Deque[Span]
+        The finished spans, oldest first
+
+    """
+
+    def __init__(self, maxlen: int = 10000):
+        """Create an empty collector."""
+        self.spans = deque(maxlen=maxlen)
+        self._lock = Lock()
+
+    def on_start(self, span: Span):
+        """Ignore started spans, they are kept once they end."""
+
+    def on_end(self, span: Span):
+        """Keep a finished span."""
+        with self._lock:
+            self.spans.append(span)
+
+    def children(self, span: Span) -> List[Span]:
+        """
+        Get the spans started by a span.
+
+        Parameters
+        ----------
+        span : Span
+            The parent span
+
+        Returns
+        -------
+        List[Span]
+            The direct children of the span
+
+        """
+        with self._lock:
+            return [child for child in self.spans if child.parent_id == span.span_id]
+
+    def clear(self):
+        """Remove all spans."""
+        with self._lock:
+            self.spans.clear()
+
+
+class OpenTelemetryCollector:
+    """
+    Passes the spans on to OpenTelemetry.
+
+    The outermost spans become children of the OpenTelemetry span active when they start.
+
+    Parameters
+    ----------
+    tracer : opentelemetry.trace.Tracer, optional
+        The OpenTelemetry tracer, by default the one of the global tracer provider
+
+    Raises
+    ------
+    ImportError
+        opentelemetry-api is not installed.
+
+    """
+
+    def __init__(self, tracer=None):
+        """Create a collector starting its spans with `tracer`."""
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            raise ImportError('The OpenTelemetry collector requires opentelemetry-api. '
+                              'Install it with `pip install opentelemetry-api`.')
+        self._trace = trace
+        self._tracer = tracer or trace.get_tracer('lemon_markets')
+        self._spans = {}
+
+    def on_start(self, span: Span):
+        """Start the OpenTelemetry span of a span."""
+        parent = self._spans.get(span.parent_id)
+        context = self._trace.set_span_in_context(parent) if parent is not None else None
+        self._spans[span.span_id] = self._tracer.start_span(span.name, context=context,
+                                                            start_time=int(span.start * 1e9))
+
+    def on_end(self, span: Span):
+        """End the OpenTelemetry span of a span, copying its attributes and error."""
+        otel_span = self._spans.pop(span.span_id, None)
+        if otel_span is None:
+            return
+        for key, value in span.attributes.items():
+            if value is not None:
+                otel_span.set_attribute(f'lemon_markets.{key}',
+                                        value if isinstance(value, (str, bool, int, float)) else str(value))
+        if span.error is not None:
+            otel_span.record_exception(span.error)
+            otel_span.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+        otel_span.end(end_time=int(span.end * 1e9))
@@ -1,3 +1,6 @@
+from typing import List
+
+
 def full_url(base: str = None, *urls: List[str]) -> str:
     """Concat a bunch of urls.
 
@@ -29,6 +32,7 @@ def full_url(base: str = None, *urls: List[str]) -> str:
         if url.startswith('/'):
             url = url[1:]
         base += url
-        if not base.endswith('/'):
+        # a query ends the url
+        if '?' not in base and not base.endswith('/'):
             base += '/'
     return base
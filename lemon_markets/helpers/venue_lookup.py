@@ -0,0 +1,104 @@
+# undocumented on rtd
+"""The trading venue data shared by all objects created from a client."""
+from threading import Lock
+from time import monotonic
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+
+class VenueLookup:
+    """
+    The data of all trading venues keyed by mic, requested once with `venues/`.
+
+    Instruments list their venues by mic only. Resolving them from this lookup
+    instead of one `venues?mic=` request per venue keeps listing instruments down
+    to the requests for the instrument pages. The data is requested again after
+    `ttl` seconds, as the opening days of the venues change daily.
+
+    Parameters
+    ----------
+    ttl : float, optional
+        The seconds the venue data is used for, by default `3600`
+
+    """
+
+    def __init__(self, ttl: float = 3600):
+        """Create a lookup that is loaded with its first use."""
+        self.ttl = ttl
+        self._lock = Lock()
+        self._venues: Optional[Dict[str, dict]] = None
+        self._updated = 0.0
+
+    def _fresh(self) -> Optional[Dict[str, dict]]:
+        with self._lock:
+            if self._venues is not None and monotonic() - self._updated < self.ttl:
+                return self._venues
+            return None
+
+    def get(self, request_paged: Callable[[str], List[dict]]) -> Dict[str, dict]:
+        """
+        Get the data of all venues, requesting it if it is missing or expired.
+
+        Concurrent requests of `venues/` are coalesced by the client, so they are not
+        serialized here.
+
+        Parameters
+        ----------
+        request_paged : Callable[[str], List[dict]]
+            Requests all results of an endpoint, i.e. :meth:`_ApiClient._request_paged`
+
+        Returns
+        -------
+        Dict[str, dict]
+            The venue data keyed by mic
+
+        """
+        venues = self._fresh()
+        if venues is None:
+            venues = self.update(request_paged('venues/'))
+        return venues
+
+    async def aget(self, request_paged: Callable[[str], Awaitable[List[dict]]]) -> Dict[str, dict]:
+        """
+        Get the data of all venues with asyncio, requesting it if it is missing or expired.
+
+        Parameters
+        ----------
+        request_paged : Callable[[str], Awaitable[List[dict]]]
+            Requests all results of an endpoint, i.e. :meth:`_AsyncApiClient._request_paged`
+
+        Returns
+        -------
+        Dict[str, dict]
+            The venue data keyed by mic
+
+        """
+        venues = self._fresh()
+        if venues is None:
+            venues = self.update(await request_paged('venues/'))
+        return venues
+
+    def update(self, results: Iterable[dict]) -> Dict[str, dict]:
+        """
+        Replace the venue data with a response of `venues/`.
+
+        Parameters
+        ----------
+        results : Iterable[dict]
+            The results of all venues
+
+        Returns
+        -------
+        Dict[str, dict]
+            The venue data keyed by mic
+
+        """
+        venues = {venue['mic']: venue for venue in results}
+        with self._lock:
+            self._venues = venues
+            self._updated = monotonic()
+        return venues
+
+    def clear(self):
+        """Drop the venue data, so it is requested again on next use."""
+        with self._lock:
+            self._venues = None
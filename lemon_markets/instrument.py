@@ -1,13 +1,29 @@
 """Module for working with instruments."""
 
+import asyncio
+from array import array
+from collections.abc import Sequence
 from dataclasses import dataclass
 from enum import Enum
-from typing import List
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Iterable, Iterator, List, Tuple, Union
 
 from lemon_markets.account import Account
 from lemon_markets.helpers.api_client import _ApiClient
+from lemon_markets.helpers.async_api_client import _AsyncApiClient
+from lemon_markets.helpers.instrument_table import instruments_arrow, instruments_dataframe
+from lemon_markets.helpers.tracing import traced
 from lemon_markets.trading_venue import TradingVenue
 
+if TYPE_CHECKING:
+    from pandas import DataFrame
+    from pyarrow import Table
+
+    from lemon_markets.instrument_store import InstrumentStore
+
+_STORE_FILTERS = {'search', 'type', 'currency', 'tradable'}
+_COLUMNS = ('isin', 'wkn', 'name', 'title', 'symbol')
+
+
 class InstrumentType(Enum):
     """
     Class for different instrument types.
@@ -71,15 +87,30 @@ class Instrument:
     trading_venues: List[TradingVenue] = None
 
     @classmethod
-    def _from_response(cls, account: Account, data: dict):
+    def _from_response(cls, account: Account, data: dict, venue_data: dict = None):
+        """
+        Create an instrument from response data.
+
+        Parameters
+        ----------
+        account : Account
+            The account
+        data : dict
+            The instrument data
+        venue_data : dict, optional
+            The venue data keyed by mic, by default the venues shared by the client of the account.
+            Venues missing here are requested and added to it, so they are requested only once.
+
+        """
         try:
             type_ = InstrumentType(data['type'])
         except (ValueError, KeyError):
             raise ValueError(f'Unexpected instrument type: {data["type"]}')
+        if venue_data is None:
+            venue_data = _ApiClient(account=account)._venue_data()
         venues = []
-        api_client = _ApiClient(account)
         for res in data['venues']:
-            vdata = api_client._request(f'venues?mic={res["mic"]}')['results'][0]
+            vdata = _venue(account, venue_data, res['mic'])
             venues.append(TradingVenue._from_response(account, vdata, res['currency'], res['tradable']))
         return cls(
             isin=data['isin'],
@@ -92,6 +123,144 @@ class Instrument:
         )
 
 
+class InstrumentList(Sequence):
+    """
+    A compact, read-only list of instruments, e.g. of a listing of all instruments.
+
+    The fields of the instruments are kept in columns, and an :class:`Instrument` is only
+    created when it is accessed, by index or while iterating. The types are stored as small
+    integers, and instruments traded on the same venues with the same currencies share one
+    entry. The :class:`TradingVenue` objects of the created instruments are shared too, one
+    per venue, currency and tradability, so they should not be modified. Every access creates
+    a new :class:`Instrument`; keep it instead of accessing the list again if it is used often.
+
+    Parameters
+    ----------
+    account : Account
+        The account
+    results : Iterable[dict]
+        The instrument data as returned by `instruments/`
+    venue_data : dict, optional
+        The venue data keyed by mic, by default the venues shared by the client of the account.
+        Venues missing here are requested when an instrument traded on them is accessed, and added to it.
+
+    Raises
+    ------
+    ValueError
+        Raised if an instrument type is not known
+
+    Examples
+    --------
+    >>> instruments = Instruments(account).list_instruments(compact=True)
+    >>> len(instruments)
+    10000
+    >>> instruments[0]
+    Instrument(isin='US88160R1014', ...)
+    >>> instruments.column('isin')[:2]
+    ['US88160R1014', 'US0378331005']
+
+    """
+
+    __slots__ = ('_account', '_venue_data', '_columns', '_types', '_listings', '_listing_sets', '_venues')
+
+    _TYPES = tuple(InstrumentType)
+
+    def __init__(self, account: Account, results: Iterable[dict], venue_data: Dict[str, dict] = None):
+        """Pack the instrument data into columns."""
+        self._account = account
+        self._venue_data = venue_data
+        self._columns: Dict[str, List[str]] = {column: [] for column in _COLUMNS}
+        self._types = array('b')
+        self._listings = array('l')
+        self._listing_sets: List[Tuple[Tuple[str, str, bool], ...]] = []
+        self._venues: Dict[Tuple[str, str, bool], TradingVenue] = {}
+        type_codes = {type_.value: code for code, type_ in enumerate(self._TYPES)}
+        listing_codes = {}
+        appends = [self._columns[column].append for column in _COLUMNS]
+        for data in results:
+            try:
+                self._types.append(type_codes[data['type']])
+            except KeyError:
+                raise ValueError(f'Unexpected instrument type: {data.get("type")}')
+            for append, column in zip(appends, _COLUMNS):
+                append(data[column])
+            listing = tuple((venue['mic'], venue['currency'], venue['tradable']) for venue in data['venues'])
+            code = listing_codes.get(listing)
+            if code is None:
+                code = listing_codes[listing] = len(self._listing_sets)
+                self._listing_sets.append(listing)
+            self._listings.append(code)
+
+    def __len__(self) -> int:
+        """Get the number of instruments."""
+        return len(self._types)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Instrument, List[Instrument]]:
+        """Get the instrument at an index, or a list of them for a slice."""
+        if isinstance(index, slice):
+            return [self._instrument(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('instrument index out of range')
+        return self._instrument(index)
+
+    def __iter__(self) -> Iterator[Instrument]:
+        """Iterate over the instruments, creating each one when it is reached."""
+        for i in range(len(self)):
+            yield self._instrument(i)
+
+    def __repr__(self) -> str:
+        """Get the number of instruments, without listing them."""
+        return f'<InstrumentList of {len(self)} instruments>'
+
+    def column(self, field: str) -> list:
+        """
+        Get a field of all instruments without creating them.
+
+        Parameters
+        ----------
+        field : str
+            `isin`, `wkn`, `name`, `title`, `symbol` or `type`
+
+        Returns
+        -------
+        list
+            The values of the field, in the order of the instruments
+
+        Raises
+        ------
+        KeyError
+            The field is not one of the above.
+
+        """
+        if field == 'type':
+            return [self._TYPES[code] for code in self._types]
+        return list(self._columns[field])
+
+    def _instrument(self, i: int) -> Instrument:
+        columns = self._columns
+        return Instrument(
+            isin=columns['isin'][i],
+            wkn=columns['wkn'][i],
+            name=columns['name'][i],
+            title=columns['title'][i],
+            type=self._TYPES[self._types[i]],
+            symbol=columns['symbol'][i],
+            trading_venues=[self._venue(listing) for listing in self._listing_sets[self._listings[i]]]
+        )
+
+    def _venue(self, listing: Tuple[str, str, bool]) -> TradingVenue:
+        venue = self._venues.get(listing)
+        if venue is None:
+            if self._venue_data is None:
+                self._venue_data = _ApiClient(account=self._account)._venue_data()
+            mic, currency, tradable = listing
+            vdata = _venue(self._account, self._venue_data, mic)
+            venue = self._venues[listing] = TradingVenue._from_response(self._account, vdata, currency, tradable)
+        return venue
+
+
 class Instruments(_ApiClient):
     """
     Class for searching instruments.
@@ -100,13 +269,20 @@ class Instruments(_ApiClient):
     ----------
     account: Account
         The account object
+    store: InstrumentStore, optional
+        Answers searches (`list_instruments(search=...)`) from its local index instead of the API.
+        Other listings are still requested.
 
     """
 
-    def __init__(self, account: Account):
+    def __init__(self, account: Account, store: 'InstrumentStore' = None):
+        """Create the client, searching `store` if one is given."""
         super().__init__(account=account)
+        self._store = store
 
-    def list_instruments(self, *args, **kwargs) -> List[Instrument]:
+    @traced
+    def list_instruments(self, *args, compact: bool = False, as_df: bool = False, as_arrow: bool = False,
+                         **kwargs) -> Union[List[Instrument], InstrumentList, 'DataFrame', 'Table']:
         """
         List all instruments with matching criteria.
 
@@ -114,6 +290,7 @@ class Instruments(_ApiClient):
         ----
         Don't call this method with no parameters given. It will fetch all
         available stocks, bonds, calls, etc. and take a very long time to return.
+        If you do, pass `compact=True` to keep the memory used by the result small.
 
         Parameters
         ----------
@@ -125,13 +302,243 @@ class Instruments(_ApiClient):
             A specific currency
         type : str, optional
             A type (`stock`, `bond`, `fund` or `warrant`)
+        compact : bool, optional
+            Return an :class:`InstrumentList`, creating the instruments only when they
+            are accessed, by default `False`
+        as_df : bool, optional
+            Return a pandas DataFrame with one row per instrument and venue, built
+            without creating instruments, by default `False`.
+            See :func:`~lemon_markets.helpers.instrument_table.instruments_dataframe`.
+        as_arrow : bool, optional
+            Return an Arrow table like `as_df` does, by default `False`. Requires pyarrow.
 
         Returns
         -------
-        List[Instrument]
+        Union[List[Instrument], InstrumentList, pandas.DataFrame, pyarrow.Table]
             List of instruments matching your query
 
+        Raises
+        ------
+        ValueError
+            More than one of `compact`, `as_df` and `as_arrow` is set.
+
         """
         assert not args, 'Please supply the arguments with a keyword i.e. `tradable=True` instead of a positional `True`.'
+        _check_output(compact, as_df, as_arrow)
+        if _use_store(self._store, kwargs):
+            return self._store.list_instruments(compact=compact, as_df=as_df, as_arrow=as_arrow, **kwargs)
         result_pages = self._request_paged('instruments/', params=kwargs)
-        return [Instrument._from_response(self._account, res) for res in result_pages]
+        if as_df or as_arrow:
+            return _table(result_pages, as_arrow)
+        venue_data = self._venue_data()
+        if compact:
+            return InstrumentList(self._account, result_pages, venue_data)
+        return [Instrument._from_response(self._account, res, venue_data) for res in result_pages]
+
+    def get_instrument(self, isin: str) -> Instrument:
+        """
+        Get an instrument by its isin.
+
+        The instrument is kept in the :class:`InstrumentRegistry` of the client and only requested
+        again once it expired there.
+
+        Parameters
+        ----------
+        isin : str
+            The isin of the instrument
+
+        Returns
+        -------
+        Instrument
+            The instrument
+
+        Raises
+        ------
+        ValueError
+            No instrument has this isin.
+
+        """
+        return self.get_instruments([isin])[isin]
+
+    @traced
+    def get_instruments(self, isins: Iterable[str]) -> Dict[str, Instrument]:
+        """
+        Get instruments by their isins.
+
+        Instruments missing in the :class:`InstrumentRegistry` of the client are requested concurrently.
+
+        Parameters
+        ----------
+        isins : Iterable[str]
+            The isins, may contain duplicates
+
+        Returns
+        -------
+        Dict[str, Instrument]
+            The instruments keyed by isin
+
+        Raises
+        ------
+        ValueError
+            No instrument has one of the isins.
+
+        """
+        return self._client._instrument_registry.resolve(isins, self._search_isin, self._client._pool_maxsize)
+
+    def _search_isin(self, isin: str) -> Instrument:
+        return _matching_isin(isin, self.list_instruments(search=isin))
+
+    def iter_instruments(self, *args, **kwargs) -> Iterator[Instrument]:
+        """
+        Lazily iterate over all instruments with matching criteria.
+
+        Takes the same parameters as :meth:`list_instruments`. Instruments are yielded
+        as their page arrives while the next page is requested in the background.
+        Pages after the last consumed instrument are not requested.
+
+        Yields
+        ------
+        Instrument
+            The instruments matching your query
+
+        """
+        assert not args, 'Please supply the arguments with a keyword i.e. `tradable=True` instead of a positional `True`.'
+        venue_data = self._venue_data()
+        for res in self._iter_paged('instruments/', params=kwargs):
+            yield Instrument._from_response(self._account, res, venue_data)
+
+
+class AsyncInstruments(_AsyncApiClient):
+    """
+    Class for searching instruments with asyncio.
+
+    Parameters
+    ----------
+    account: Account
+        The account object
+    store: InstrumentStore, optional
+        Answers searches (`list_instruments(search=...)`) from its local index instead of the API.
+        Other listings are still requested.
+
+    """
+
+    def __init__(self, account: Account, store: 'InstrumentStore' = None):
+        """Create the client, searching `store` if one is given."""
+        super().__init__(account=account)
+        self._store = store
+
+    @traced
+    async def list_instruments(self, *args, compact: bool = False, as_df: bool = False, as_arrow: bool = False,
+                               **kwargs) -> Union[List[Instrument], InstrumentList, 'DataFrame', 'Table']:
+        """
+        List all instruments with matching criteria.
+
+        Takes the same parameters as :meth:`Instruments.list_instruments`.
+
+        Returns
+        -------
+        Union[List[Instrument], InstrumentList, pandas.DataFrame, pyarrow.Table]
+            List of instruments matching your query
+
+        """
+        assert not args, 'Please supply the arguments with a keyword i.e. `tradable=True` instead of a positional `True`.'
+        _check_output(compact, as_df, as_arrow)
+        if _use_store(self._store, kwargs):
+            return self._store.list_instruments(compact=compact, as_df=as_df, as_arrow=as_arrow, **kwargs)
+        if as_df or as_arrow:
+            return _table(await self._request_paged('instruments/', params=kwargs), as_arrow)
+        result_pages, venue_data = await asyncio.gather(self._request_paged('instruments/', params=kwargs),
+                                                        self._venue_data())
+        venue_data = await self._missing_venues(result_pages, venue_data)
+        if compact:
+            return InstrumentList(self._account, result_pages, venue_data)
+        return [Instrument._from_response(self._account, res, venue_data) for res in result_pages]
+
+    async def get_instrument(self, isin: str) -> Instrument:
+        """
+        Get an instrument by its isin.
+
+        Takes the same parameters as :meth:`Instruments.get_instrument`.
+
+        Returns
+        -------
+        Instrument
+            The instrument
+
+        """
+        return (await self.get_instruments([isin]))[isin]
+
+    @traced
+    async def get_instruments(self, isins: Iterable[str]) -> Dict[str, Instrument]:
+        """
+        Get instruments by their isins.
+
+        Takes the same parameters as :meth:`Instruments.get_instruments`.
+
+        Returns
+        -------
+        Dict[str, Instrument]
+            The instruments keyed by isin
+
+        """
+        return await self._client._instrument_registry.aresolve(isins, self._search_isin)
+
+    async def _search_isin(self, isin: str) -> Instrument:
+        return _matching_isin(isin, await self.list_instruments(search=isin))
+
+    async def iter_instruments(self, *args, **kwargs) -> AsyncIterator[Instrument]:
+        """
+        Lazily iterate over all instruments with matching criteria.
+
+        Takes the same parameters as :meth:`Instruments.list_instruments`. Instruments are yielded
+        as their page arrives while the next page is requested in a background task.
+
+        Yields
+        ------
+        Instrument
+            The instruments matching your query
+
+        """
+        assert not args, 'Please supply the arguments with a keyword i.e. `tradable=True` instead of a positional `True`.'
+        venue_data = await self._venue_data()
+        async for res in self._iter_paged('instruments/', params=kwargs):
+            venue_data = await self._missing_venues([res], venue_data)
+            yield Instrument._from_response(self._account, res, venue_data)
+
+    async def _missing_venues(self, results: List[dict], venue_data: Dict[str, dict]) -> Dict[str, dict]:
+        """Add the venues of the instruments that are missing in `venue_data`, requesting them concurrently."""
+        mics = list({venue['mic'] for res in results for venue in res['venues']} - venue_data.keys())
+        if not mics:
+            return venue_data
+        venue_pages = await asyncio.gather(*(self._request(f'venues?mic={mic}') for mic in mics))
+        return {**venue_data, **{mic: page['results'][0] for mic, page in zip(mics, venue_pages)}}
+
+
+def _check_output(compact: bool, as_df: bool, as_arrow: bool):
+    if compact + as_df + as_arrow > 1:
+        raise ValueError('Only one of `compact`, `as_df` and `as_arrow` can be set.')
+
+
+def _table(results: List[dict], as_arrow: bool) -> Union['DataFrame', 'Table']:
+    return instruments_arrow(results) if as_arrow else instruments_dataframe(results)
+
+
+def _use_store(store: 'InstrumentStore', params: dict) -> bool:
+    # the store filters searches like the API, other listings are requested
+    return store is not None and params.get('search') is not None and params.keys() <= _STORE_FILTERS
+
+
+def _matching_isin(isin: str, instruments: List[Instrument]) -> Instrument:
+    # a search can find other instruments mentioning the isin too, they must not be cached under it
+    for instrument in instruments:
+        if instrument.isin == isin:
+            return instrument
+    raise ValueError(f'No instrument with isin {isin} found.')
+
+
+def _venue(account: Account, venue_data: Dict[str, dict], mic: str) -> dict:
+    # a venue missing in the shared venue data is requested, and kept for the other instruments of the listing
+    vdata = venue_data.get(mic)
+    if vdata is None:
+        vdata = venue_data[mic] = _ApiClient(account=account)._request(f'venues?mic={mic}')['results'][0]
+    return vdata
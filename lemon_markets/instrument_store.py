@@ -0,0 +1,426 @@
+"""Module for keeping all instruments in a local database."""
+
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from threading import Lock
+from time import time
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from lemon_markets.account import Account
+from lemon_markets.helpers.api_client import _ApiClient
+from lemon_markets.helpers.search_index import SearchIndex
+from lemon_markets.helpers.tracing import submit_in_context, traced
+from lemon_markets.instrument import Instrument, InstrumentList, _check_output, _table
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
+    from pyarrow import Table
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS instruments (isin TEXT PRIMARY KEY, wkn TEXT, name TEXT, title TEXT, '
+    'symbol TEXT, type TEXT, page INTEGER, position INTEGER, data TEXT)',
+    'CREATE INDEX IF NOT EXISTS instruments_type ON instruments (type)',
+    'CREATE INDEX IF NOT EXISTS instruments_page ON instruments (page, position)',
+    'CREATE TABLE IF NOT EXISTS pages (page INTEGER PRIMARY KEY, etag TEXT)',
+    'CREATE TABLE IF NOT EXISTS venues (mic TEXT PRIMARY KEY, data TEXT)',
+    'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)',
+)
+
+
+@dataclass
+class SyncStats:
+    """
+    The changes made by a sync of an :class:`InstrumentStore`.
+
+    Attributes
+    ----------
+    pages : int
+        The number of pages of the instrument listing
+    unchanged_pages : int
+        The pages the API answered with `304 Not Modified`
+    added : int
+        The number of new instruments
+    updated : int
+        The number of changed instruments
+    removed : int
+        The number of instruments no longer listed
+    seconds : float
+        The duration of the sync
+
+    """
+
+    pages: int = 0
+    unchanged_pages: int = 0
+    added: int = 0
+    updated: int = 0
+    removed: int = 0
+    seconds: float = 0.0
+
+
+class InstrumentStore(_ApiClient):
+    """
+    All instruments in a SQLite database, so they are downloaded once instead of on every start.
+
+    :meth:`sync` downloads the instrument listing. Later syncs only download the pages
+    that changed, asking the API with the `ETag` of every page, and only write the
+    instruments that changed. Listing and looking up instruments reads the database,
+    in milliseconds and without network access. Searches are answered by a
+    :class:`SearchIndex` in memory, e.g. for autocompletion with :meth:`search`.
+
+    Parameters
+    ----------
+    account : Account
+        The account
+    path : str, optional
+        The path of the database file, by default `instruments.db`
+    max_age : float, optional
+        The seconds after a sync when reading the store syncs it again, by default `86400`.
+        `None` never syncs automatically.
+
+    Examples
+    --------
+    >>> store = InstrumentStore(account, 'instruments.db')
+    >>> store.sync()
+    SyncStats(pages=1312, unchanged_pages=1312, added=0, updated=0, removed=0, seconds=9.1)
+    >>> funds = store.list_instruments(type='fund', currency='EUR')
+    >>> store.search('appl', limit=5)
+
+    """
+
+    def __init__(self, account: Account, path: str = 'instruments.db', max_age: Optional[float] = 86400):
+        """Open the database at `path`, creating the tables if needed."""
+        super().__init__(account=account)
+        self.path = path
+        self.max_age = max_age
+        self._lock = Lock()
+        self._index: Optional[SearchIndex] = None
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        for statement in _SCHEMA:
+            self._db.execute(statement)
+
+    def __len__(self) -> int:
+        """Get the number of stored instruments, syncing first if the store is stale."""
+        self._sync_if_stale()
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM instruments').fetchone()[0]
+
+    def __enter__(self) -> 'InstrumentStore':
+        """Return the store, which is closed when the block exits."""
+        return self
+
+    def __exit__(self, *exc):
+        """Close the store."""
+        self.close()
+
+    def close(self):
+        """Close the database."""
+        self._db.close()
+
+    @property
+    def synced_at(self) -> Optional[float]:
+        """
+        The time of the last sync.
+
+        Returns
+        -------
+        float
+            The unix timestamp of the last sync, `None` if the store was never synced
+
+        """
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'synced_at'").fetchone()
+        return float(row[0]) if row else None
+
+    @property
+    def stale(self) -> bool:
+        """
+        Whether the store is synced automatically before it is read.
+
+        Returns
+        -------
+        bool
+            `True` if the store was never synced or the last sync is older than `max_age`
+
+        """
+        synced_at = self.synced_at
+        return synced_at is None or (self.max_age is not None and time() - synced_at > self.max_age)
+
+    @traced
+    def sync(self) -> SyncStats:
+        """
+        Download the instruments that changed since the last sync.
+
+        Returns
+        -------
+        SyncStats
+            The changes made
+
+        """
+        started = time()
+        with self._lock:
+            etags = dict(self._db.execute('SELECT page, etag FROM pages'))
+            stored = {isin: (page, position) for isin, page, position
+                      in self._db.execute('SELECT isin, page, position FROM instruments')}
+            known_pages = self._db.execute("SELECT value FROM meta WHERE key = 'pages'").fetchone()
+
+        first, first_etag = self._request_page(1, etags.get(1))
+        pages = first['pages'] if first else int(known_pages[0]) if known_pages else 1
+        responses = {1: (first, first_etag)}
+        if pages > 1:
+            concurrency = min(self._client._page_concurrency, pages - 1)
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                pending = {page: submit_in_context(executor, self._request_page, page, etags.get(page))
+                           for page in range(2, pages + 1)}
+                responses.update({page: future.result() for page, future in pending.items()})
+        # a changed listing reports its new number of pages on every page
+        pages = next((data['pages'] for data, _ in responses.values() if data and data.get('pages')), pages)
+
+        stats = SyncStats(pages=pages)
+        changed: Dict[str, Tuple[int, int, dict]] = {}
+        unchanged_pages = set()
+        for page, (data, _) in responses.items():
+            if data is None:
+                unchanged_pages.add(page)
+                continue
+            for position, instrument in enumerate(data['results']):
+                changed[instrument['isin']] = (page, position, instrument)
+        stats.unchanged_pages = len(unchanged_pages)
+        removed = [isin for isin, (page, _) in stored.items() if page not in unchanged_pages and isin not in changed]
+        venue_data = self._venue_data()
+
+        with self._lock:
+            self._db.execute('BEGIN')
+            try:
+                current = dict(self._db.execute('SELECT isin, data FROM instruments'))
+                rows = []
+                written = []
+                for isin, (page, position, instrument) in changed.items():
+                    data = json.dumps(instrument, sort_keys=True)
+                    if isin not in current:
+                        stats.added += 1
+                    elif current[isin] != data:
+                        stats.updated += 1
+                    elif stored.get(isin) == (page, position):
+                        continue
+                    rows.append((isin, instrument.get('wkn'), instrument.get('name'), instrument.get('title'),
+                                 instrument.get('symbol'), instrument.get('type'), page, position, data))
+                    written.append(instrument)
+                self._db.executemany('INSERT OR REPLACE INTO instruments VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+                self._db.executemany('DELETE FROM instruments WHERE isin = ?', ((isin,) for isin in removed))
+                stats.removed = len(removed)
+                self._db.execute('DELETE FROM pages WHERE page > ?', (pages,))
+                self._db.executemany('INSERT OR REPLACE INTO pages VALUES (?, ?)',
+                                     ((page, etag) for page, (data, etag) in responses.items() if data))
+                self._db.execute('DELETE FROM venues')
+                self._db.executemany('INSERT INTO venues VALUES (?, ?)',
+                                     ((mic, json.dumps(venue)) for mic, venue in venue_data.items()))
+                self._db.executemany('INSERT OR REPLACE INTO meta VALUES (?, ?)',
+                                     (('synced_at', str(time())), ('pages', str(pages))))
+                self._db.execute('COMMIT')
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+            if self._index is not None:
+                self._index.update(written)
+                for isin in removed:
+                    self._index.remove(isin)
+        stats.seconds = time() - started
+        return stats
+
+    def _request_page(self, page: int, etag: str = None) -> Tuple[Optional[dict], Optional[str]]:
+        """Request a page of the instrument listing, `None` if it didn't change since its `etag`."""
+        headers = {'If-None-Match': etag} if etag else None
+        response_headers = {}
+        data = self._request('instruments/', params={'page': page}, headers=headers, page=page,
+                             response_headers=response_headers)
+        return data, response_headers.get('ETag', etag)
+
+    def _sync_if_stale(self):
+        if self.stale:
+            self.sync()
+
+    def _venues(self) -> Dict[str, dict]:
+        with self._lock:
+            return {mic: json.loads(data) for mic, data in self._db.execute('SELECT mic, data FROM venues')}
+
+    def _instruments(self, documents: Iterable[dict], venue_data: Dict[str, dict]) -> Iterator[Instrument]:
+        for data in documents:
+            yield Instrument._from_response(self._account, data, venue_data)
+
+    def _documents(self, search: str = None, **kwargs) -> Iterator[dict]:
+        """Get the data of the stored instruments matching the filters of :meth:`list_instruments`, synced first."""
+        self._sync_if_stale()
+        if search is not None:
+            return (data for data in self.index.search(search) if _matches(data, **kwargs))
+        query, query_args = self._query(**kwargs)
+        with self._lock:
+            rows = self._db.execute(query, query_args).fetchall()
+        return (json.loads(data) for (data,) in rows)
+
+    def _query(self, type: str = None, currency: str = None, tradable: bool = None,
+               mic: str = None) -> Tuple[str, list]:
+        conditions = []
+        args = []
+        if type is not None:
+            conditions.append('type = ?')
+            args.append(getattr(type, 'value', type))
+        venue_conditions = []
+        if currency is not None:
+            venue_conditions.append("json_extract(value, '$.currency') = ?")
+            args.append(currency)
+        if tradable is not None:
+            venue_conditions.append("json_extract(value, '$.tradable') = ?")
+            args.append(1 if tradable else 0)
+        if mic is not None:
+            venue_conditions.append("json_extract(value, '$.mic') = ?")
+            args.append(mic)
+        if venue_conditions:
+            conditions.append("EXISTS (SELECT 1 FROM json_each(data, '$.venues') WHERE "
+                              + ' AND '.join(venue_conditions) + ')')
+        where = ' WHERE ' + ' AND '.join(conditions) if conditions else ''
+        return f'SELECT data FROM instruments{where} ORDER BY page, position', args
+
+    @traced
+    def list_instruments(self, *args, compact: bool = False, as_df: bool = False, as_arrow: bool = False,
+                         **kwargs) -> Union[List[Instrument], InstrumentList, 'DataFrame', 'Table']:
+        """
+        List the stored instruments with matching criteria.
+
+        Takes the same parameters as :meth:`Instruments.list_instruments`. `search` is
+        answered by the :attr:`index`, best matches first, see :meth:`search`.
+
+        Parameters
+        ----------
+        mic : str, optional
+            The mic of a venue the instrument is traded on
+        compact : bool, optional
+            Return an :class:`InstrumentList`, creating the instruments only when they
+            are accessed, by default `False`
+        as_df : bool, optional
+            Return a pandas DataFrame with one row per instrument and venue, by default `False`
+        as_arrow : bool, optional
+            Return an Arrow table like `as_df` does, by default `False`. Requires pyarrow.
+
+        Returns
+        -------
+        Union[List[Instrument], InstrumentList, pandas.DataFrame, pyarrow.Table]
+            List of instruments matching your query, in the order of the API
+
+        Raises
+        ------
+        ValueError
+            More than one of `compact`, `as_df` and `as_arrow` is set.
+
+        """
+        assert not args, 'Please supply the arguments with a keyword i.e. `tradable=True` instead of a positional `True`.'
+        _check_output(compact, as_df, as_arrow)
+        if as_df or as_arrow:
+            return _table(list(self._documents(**kwargs)), as_arrow)
+        if compact:
+            return InstrumentList(self._account, self._documents(**kwargs), self._venues())
+        return list(self.iter_instruments(**kwargs))
+
+    def iter_instruments(self, *args, **kwargs) -> Iterator[Instrument]:
+        """
+        Lazily iterate over the stored instruments with matching criteria.
+
+        Takes the same parameters as :meth:`list_instruments`.
+
+        Yields
+        ------
+        Instrument
+            The instruments matching your query
+
+        """
+        assert not args, 'Please supply the arguments with a keyword i.e. `tradable=True` instead of a positional `True`.'
+        yield from self._instruments(self._documents(**kwargs), self._venues())
+
+    @property
+    def index(self) -> SearchIndex:
+        """
+        The search index of the stored instruments, built on first use.
+
+        Returns
+        -------
+        SearchIndex
+            The index, kept up to date by :meth:`sync`
+
+        """
+        self._sync_if_stale()
+        if self._index is None:
+            with self._lock:
+                rows = self._db.execute('SELECT data FROM instruments ORDER BY page, position').fetchall()
+            index = SearchIndex()
+            index.update(json.loads(data) for (data,) in rows)
+            self._index = index
+        return self._index
+
+    @traced
+    def search(self, search: str, limit: Optional[int] = 10, fuzzy: bool = True, **kwargs) -> List[Instrument]:
+        """
+        Search the stored instruments, e.g. while a name or isin is typed.
+
+        Parameters
+        ----------
+        search : str
+            An isin, wkn or symbol, or words of the name or title, possibly incomplete
+            or, if `fuzzy`, with a typo
+        limit : int, optional
+            The maximum number of results, by default `10`. `None` returns all.
+        fuzzy : bool, optional
+            Whether to match words with a typo, by default `True`
+        kwargs
+            The other filters of :meth:`list_instruments`, e.g. `type` or `currency`
+
+        Returns
+        -------
+        List[Instrument]
+            The matching instruments, best matches first
+
+        """
+        documents = self.index.search(search, None if kwargs else limit, fuzzy)
+        if kwargs:
+            documents = [data for data in documents if _matches(data, **kwargs)][:limit]
+        venue_data = self._venues()
+        return [Instrument._from_response(self._account, data, venue_data) for data in documents]
+
+    def get_instrument(self, isin: str) -> Instrument:
+        """
+        Get a stored instrument by its isin.
+
+        Parameters
+        ----------
+        isin : str
+            The isin of the instrument
+
+        Returns
+        -------
+        Instrument
+            The instrument
+
+        Raises
+        ------
+        KeyError
+            No instrument with this isin is stored.
+
+        """
+        self._sync_if_stale()
+        with self._lock:
+            row = self._db.execute('SELECT data FROM instruments WHERE isin = ?', (isin,)).fetchone()
+        if row is None:
+            raise KeyError(isin)
+        return next(self._instruments([json.loads(row[0])], self._venues()))
+
+
+def _matches(data: dict, type: str = None, currency: str = None, tradable: bool = None, mic: str = None) -> bool:
+    # the same filters as InstrumentStore._query
+    if type is not None and data['type'] != getattr(type, 'value', type):
+        return False
+    if currency is None and tradable is None and mic is None:
+        return True
+    return any((currency is None or venue['currency'] == currency)
+               and (tradable is None or venue['tradable'] == tradable)
+               and (mic is None or venue['mic'] == mic) for venue in data['venues'])
@@ -1,16 +1,20 @@
 """Module for accessing market data."""
 
 from datetime import datetime
-from typing import Union
-
-from pandas import DataFrame
+from typing import TYPE_CHECKING, Union
 
 from lemon_markets.account import Account
 from lemon_markets.helpers.api_client import _ApiClient
+from lemon_markets.helpers.async_api_client import _AsyncApiClient
 from lemon_markets.helpers.time_helper import parse_datetime
+from lemon_markets.helpers.tracing import traced
 from lemon_markets.instrument import Instrument
 from lemon_markets.trading_venue import TradingVenue
 
+if TYPE_CHECKING:
+    # pandas takes long to import, so it is only imported when a DataFrame is built
+    from pandas import DataFrame
+
 
 class OHLC(_ApiClient):
     """
@@ -26,10 +30,11 @@ class OHLC(_ApiClient):
     def __init__(self, account: Account):
         super().__init__(account=account)
 
+    @traced
     def get_data(
             self, instrument: Instrument, x1: str, venue: TradingVenue = None,
             sorting: str = None, date_from: datetime = None,
-            date_to: datetime = None, decimals: bool = None, as_df: bool = True) -> Union[dict, DataFrame, None]:
+            date_to: datetime = None, decimals: bool = None, as_df: bool = True) -> Union[dict, 'DataFrame', None]:
         """
         Get OHLC data on the specified instrument.
 
@@ -61,31 +66,74 @@ class OHLC(_ApiClient):
 
         """
         endpoint = f'ohlc/{x1}/'
-        params = {'isin': instrument.isin}
-        if venue is not None:
-            params['mic'] = venue.mic
-        if sorting is not None:
-            params['sorting'] = sorting
-        if date_from is not None:
-            params['from'] = date_from
-        if date_to is not None:
-            params['to'] = date_to
-        if decimals is not None:
-            params['decimals'] = decimals
+        params = _ohlc_params(instrument, venue, sorting, date_from, date_to, decimals)
         results = self._request(endpoint=endpoint, params=params)['results']       # TODO make it _request_paged
+        return _ohlc_results(results, sorting, as_df)
+
+
+class AsyncOHLC(_AsyncApiClient):
+    """
+    Class to access OHLC data with asyncio.
+
+    Parameters
+    ----------
+    account : Account
+        The account object containing your credentials
 
-        if len(results) == 0:
-            return None
+    """
 
-        if not as_df:
-            return results
+    def __init__(self, account: Account):
+        """Create the client for OHLC data."""
+        super().__init__(account=account)
+
+    @traced
+    async def get_data(
+            self, instrument: Instrument, x1: str, venue: TradingVenue = None,
+            sorting: str = None, date_from: datetime = None,
+            date_to: datetime = None, decimals: bool = None, as_df: bool = True) -> Union[dict, 'DataFrame', None]:
+        """
+        Get OHLC data on the specified instrument.
 
-        df = DataFrame(results)
-        df['t'] = df['t'].apply(lambda t: parse_datetime(t))
-        df.set_index('t', inplace=True)
-        if sorting == 'desc':
-            df.sort_index(ascending=False, inplace=True)
-        else:
-            df.sort_index(ascending=True, inplace=True)
+        Takes the same parameters and returns the same data as :meth:`OHLC.get_data`.
 
-        return df
+        """
+        endpoint = f'ohlc/{x1}/'
+        params = _ohlc_params(instrument, venue, sorting, date_from, date_to, decimals)
+        results = (await self._request(endpoint=endpoint, params=params))['results']
+        return _ohlc_results(results, sorting, as_df)
+
+
+def _ohlc_params(instrument: Instrument, venue: TradingVenue, sorting: str,
+                 date_from: datetime, date_to: datetime, decimals: bool) -> dict:
+    params = {'isin': instrument.isin}
+    if venue is not None:
+        params['mic'] = venue.mic
+    if sorting is not None:
+        params['sorting'] = sorting
+    if date_from is not None:
+        params['from'] = date_from
+    if date_to is not None:
+        params['to'] = date_to
+    if decimals is not None:
+        params['decimals'] = decimals
+    return params
+
+
+def _ohlc_results(results: list, sorting: str, as_df: bool) -> Union[dict, 'DataFrame', None]:
+    if len(results) == 0:
+        return None
+
+    if not as_df:
+        return results
+
+    from pandas import DataFrame
+
+    df = DataFrame(results)
+    df['t'] = df['t'].apply(lambda t: parse_datetime(t))
+    df.set_index('t', inplace=True)
+    if sorting == 'desc':
+        df.sort_index(ascending=False, inplace=True)
+    else:
+        df.sort_index(ascending=True, inplace=True)
+
+    return df
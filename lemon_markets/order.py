@@ -1,17 +1,23 @@
 """Module for placing, listing and deleting orders."""
 
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
-from typing import Tuple, Union
+from typing import Optional, Tuple, Union
+from uuid import uuid4
 
 from lemon_markets.account import Account
 from lemon_markets.helpers.api_client import _ApiClient
-from lemon_markets.helpers.time_helper import (datetime_to_timestamp_seconds,
+from lemon_markets.helpers.async_api_client import _AsyncApiClient
+from lemon_markets.helpers.time_helper import (current_time, datetime_to_timestamp_seconds,
                                                timestamp_seconds_to_datetime)
-from lemon_markets.instrument import Instrument, Instruments, InstrumentType
+from lemon_markets.helpers.tracing import traced
+from lemon_markets.instrument import AsyncInstruments, Instrument, Instruments, InstrumentType
 from lemon_markets.space import Space
 
+# tolerated clock difference to the API when looking up orders created by a failed attempt
+_RECONCILE_SLACK = timedelta(minutes=1)
+
 
 class OrderStatus(Enum):
     """
@@ -174,16 +180,21 @@ class Orders(_ApiClient):
         for status in OrderStatus:
             self.orders[status.name] = {}
 
+    @traced
     def create_order(self,
                      instrument: Instrument,
                      valid_until: datetime,
                      side: str,
                      quantity: int,
                      stop_price: Union[int, float] = None,
-                     limit_price: Union[int, float] = None) -> Order:
+                     limit_price: Union[int, float] = None,
+                     idempotency_key: str = None) -> Order:
         """
         Create an order.
 
+        If the client has a retry policy and the request fails, the order is only
+        sent again after making sure it was not created by the failed attempt.
+
         Parameters
         ----------
         instrument : Instrument
@@ -198,6 +209,8 @@ class Orders(_ApiClient):
             The price at which to activate the order
         limit_price : Union[int, float], optional
             The price limit while ordering
+        idempotency_key : str, optional
+            A unique key for this order, sent with every attempt. By default a random one.
 
         Returns
         -------
@@ -205,22 +218,28 @@ class Orders(_ApiClient):
             The order created
 
         """
-        endpoint = f'spaces/{self._space.uuid}/orders/'
-        data = {
-            'isin': instrument.isin,
-            'valid_until': datetime_to_timestamp_seconds(valid_until),
-            'side': side, 'quantity': quantity}
-        if stop_price is not None:
-            data['stop_price'] = stop_price
-        if limit_price is not None:
-            data['limit_price'] = limit_price
-
-        data = self._request(endpoint=endpoint, method='POST', data=data)
+        endpoint = f'spaces/{self._space.id}/orders/'
+        order_data = _order_data(instrument, valid_until, side, quantity, stop_price, limit_price)
+        since = current_time() - _RECONCILE_SLACK
+
+        data = self._request(endpoint=endpoint, method='POST', data=order_data,
+                             idempotency_key=idempotency_key or str(uuid4()),
+                             reconcile=lambda: self._find_created_order(order_data, since))
         order = Order._from_response(instrument, data)
         status = order.status
         self.orders[status.name].update({order.uuid: order})
         return order
 
+    def _find_created_order(self, order_data: dict, since: datetime) -> Optional[dict]:
+        """Look up an unknown order matching `order_data` that was created by a failed attempt."""
+        endpoint = f'spaces/{self._space.id}/orders/'
+        params = _order_filter_params(None, since, order_data['side'], None, None)
+        for o in self._request_paged(endpoint=endpoint, params=params):
+            if _matches_order_data(o, order_data) and not any(o['uuid'] in orders for orders in self.orders.values()):
+                return o
+        return None
+
+    @traced
     def update_order(self, order: Order) -> Tuple[bool, OrderStatus]:
         """
         Update the order status.
@@ -245,6 +264,7 @@ class Orders(_ApiClient):
         status_changed = (old_status != new_status)
         return status_changed, new_status
 
+    @traced
     def activate_order(self, order: Order) -> bool:
         """
         Activate an order.
@@ -266,13 +286,14 @@ class Orders(_ApiClient):
         return new_status == 'ACTIVATED'
 
     def _update_oder_data(self, order, arg1, method):
-        endpoint = f'spaces/{self._space.uuid}/orders/{order.uuid}{arg1}'
+        endpoint = f'spaces/{self._space.id}/orders/{order.uuid}{arg1}'
         result = order.status.name
         self.orders[result].pop(order.uuid)
         data = self._request(endpoint=endpoint, method=method)
         order.update_data(data)
         return result
 
+    @traced
     def delete_order(self, order: Order) -> Tuple[bool, OrderStatus]:
         """
         Delete specified order.
@@ -289,12 +310,13 @@ class Orders(_ApiClient):
             and the OrderStatus is the new status of the order
 
         """
-        endpoint = f'spaces/{self._space.uuid}/orders/{order.uuid}/'
+        endpoint = f'spaces/{self._space.id}/orders/{order.uuid}/'
         self._request(endpoint=endpoint, method='DELETE')
         status_changed, new_status = self.update_order(order)
         return status_changed, new_status
 
     # requests all orders matching the paramerts and adds them to the orders dict
+    @traced
     def fetch_orders(self,
                      created_at_until: datetime = None,
                      created_at_from: datetime = None,
@@ -318,21 +340,11 @@ class Orders(_ApiClient):
             Filter by status.
 
         """
-        endpoint = f'spaces/{self._space.uuid}/orders/'
-        params = {}
-        if created_at_until is not None:
-            params['created_at_until'] = datetime_to_timestamp_seconds(
-                created_at_until)
-        if created_at_from is not None:
-            params['created_at_from'] = datetime_to_timestamp_seconds(created_at_from)
-        if side is not None:
-            params['side'] = side
-        if type is not None:
-            params['type'] = type
-        if status is not None:
-            params['status'] = status
+        endpoint = f'spaces/{self._space.id}/orders/'
+        params = _order_filter_params(created_at_until, created_at_from, side, type, status)
 
         results = self._request_paged(endpoint=endpoint, params=params)
+        instruments = Instruments(self._account).get_instruments(o['instrument']['isin'] for o in results)
 
         # uuid's in old status
         inactive_uuids = list(self.orders['INACTIVE'])
@@ -357,11 +369,7 @@ class Orders(_ApiClient):
             if uuid in expired_uuids:
                 self.orders['EXPIRED'].pop(uuid)
 
-            isin = o['instrument']['isin']
-            instrument = Instruments(
-                self._account).list_instruments(
-                search=isin)[0]
-            order = Order._from_response(instrument, o)
+            order = Order._from_response(instruments[o['instrument']['isin']], o)
             self.orders[order.status.name].update({order.uuid: order})
 
     def clean_orders(self):
@@ -375,3 +383,203 @@ class Orders(_ApiClient):
             self.orders['DELETED'].pop(uuid)
         for uuid in expired_uuids:
             self.orders['EXPIRED'].pop(uuid)
+
+
+class AsyncOrders(_AsyncApiClient):
+    """
+    Access orders for this space with asyncio.
+
+    Parameters
+    ----------
+    account : Account
+        The account object
+    space : Space
+        The space object
+
+    Attributes
+    ----------
+    orders : Mapping[str, Mapping[str, Order]]
+        The orders. In a dict grouped by state and uuid.
+
+    """
+
+    _space: Space
+
+    def __init__(self, account: Account, space: Space):
+        """Create the client for the orders of `space`."""
+        self._space = space
+        super().__init__(account=account)
+        self.orders = {status.name: {} for status in OrderStatus}
+
+    def _store(self, order: Order):
+        for orders in self.orders.values():
+            orders.pop(order.uuid, None)
+        self.orders[order.status.name][order.uuid] = order
+
+    @traced
+    async def create_order(self,
+                           instrument: Instrument,
+                           valid_until: datetime,
+                           side: str,
+                           quantity: int,
+                           stop_price: Union[int, float] = None,
+                           limit_price: Union[int, float] = None,
+                           idempotency_key: str = None) -> Order:
+        """
+        Create an order.
+
+        Takes the same parameters as :meth:`Orders.create_order`.
+
+        Returns
+        -------
+        Order
+            The order created
+
+        """
+        endpoint = f'spaces/{self._space.id}/orders/'
+        order_data = _order_data(instrument, valid_until, side, quantity, stop_price, limit_price)
+        since = current_time() - _RECONCILE_SLACK
+
+        data = await self._request(endpoint=endpoint, method='POST', data=order_data,
+                                   idempotency_key=idempotency_key or str(uuid4()),
+                                   reconcile=lambda: self._find_created_order(order_data, since))
+        order = Order._from_response(instrument, data)
+        self._store(order)
+        return order
+
+    async def _find_created_order(self, order_data: dict, since: datetime) -> Optional[dict]:
+        """Look up an unknown order matching `order_data` that was created by a failed attempt."""
+        endpoint = f'spaces/{self._space.id}/orders/'
+        params = _order_filter_params(None, since, order_data['side'], None, None)
+        for o in await self._request_paged(endpoint=endpoint, params=params):
+            if _matches_order_data(o, order_data) and not any(o['uuid'] in orders for orders in self.orders.values()):
+                return o
+        return None
+
+    async def _update_order_data(self, order: Order, arg1: str, method: str):
+        endpoint = f'spaces/{self._space.id}/orders/{order.uuid}{arg1}'
+        data = await self._request(endpoint=endpoint, method=method)
+        order.update_data(data)
+        self._store(order)
+
+    @traced
+    async def update_order(self, order: Order) -> Tuple[bool, OrderStatus]:
+        """
+        Update the order status.
+
+        Parameters
+        ----------
+        order : Order
+            The order to update
+
+        Returns
+        -------
+        Tuple[bool, OrderStatus]
+            Whether the status has changed and the new status
+
+        """
+        old_status = order.status
+        await self._update_order_data(order, '/', 'GET')
+        return old_status != order.status, order.status
+
+    @traced
+    async def activate_order(self, order: Order) -> bool:
+        """
+        Activate an order.
+
+        Parameters
+        ----------
+        order : Order
+            The order to activate
+
+        Returns
+        -------
+        bool
+            `True` if the order was successfully activated
+
+        """
+        await self._update_order_data(order, '/activate/', 'PUT')
+        return order.status == OrderStatus.ACTIVATED
+
+    @traced
+    async def delete_order(self, order: Order) -> Tuple[bool, OrderStatus]:
+        """
+        Delete specified order.
+
+        Parameters
+        ----------
+        order : Order
+            The order to delete
+
+        Returns
+        -------
+        Tuple[bool, OrderStatus]
+            Whether the status has changed and the new status
+
+        """
+        endpoint = f'spaces/{self._space.id}/orders/{order.uuid}/'
+        await self._request(endpoint=endpoint, method='DELETE')
+        return await self.update_order(order)
+
+    @traced
+    async def fetch_orders(self,
+                           created_at_until: datetime = None,
+                           created_at_from: datetime = None,
+                           side: str = None,
+                           type: str = None,
+                           status: str = None):
+        """
+        Fetch orders by criteria into the orders dict.
+
+        Takes the same parameters as :meth:`Orders.fetch_orders`.
+        The instruments of the orders are looked up concurrently.
+
+        """
+        endpoint = f'spaces/{self._space.id}/orders/'
+        params = _order_filter_params(created_at_until, created_at_from, side, type, status)
+        results = await self._request_paged(endpoint=endpoint, params=params)
+
+        instruments = await AsyncInstruments(self._account).get_instruments(o['instrument']['isin'] for o in results)
+
+        for o in results:
+            self._store(Order._from_response(instruments[o['instrument']['isin']], o))
+
+    clean_orders = Orders.clean_orders
+
+
+def _order_data(instrument: Instrument, valid_until: datetime, side: str, quantity: int,
+                stop_price: Union[int, float], limit_price: Union[int, float]) -> dict:
+    data = {
+        'isin': instrument.isin,
+        'valid_until': datetime_to_timestamp_seconds(valid_until),
+        'side': side, 'quantity': quantity}
+    if stop_price is not None:
+        data['stop_price'] = stop_price
+    if limit_price is not None:
+        data['limit_price'] = limit_price
+    return data
+
+
+def _matches_order_data(data: dict, order_data: dict) -> bool:
+    return (data['instrument']['isin'] == order_data['isin']
+            and data['valid_until'] == order_data['valid_until']
+            and data['side'] == order_data['side']
+            and data['quantity'] == order_data['quantity']
+            and data['stop_price'] == order_data.get('stop_price')
+            and data['limit_price'] == order_data.get('limit_price'))
+
+
+def _order_filter_params(created_at_until: datetime, created_at_from: datetime,
+                         side: str, type: str, status: str) -> dict:
+    params = {}
+    if created_at_until is not None:
+        params['created_at_until'] = datetime_to_timestamp_seconds(created_at_until)
+    if created_at_from is not None:
+        params['created_at_from'] = datetime_to_timestamp_seconds(created_at_from)
+    if side is not None:
+        params['side'] = side
+    if type is not None:
+        params['type'] = type
+    if status is not None:
+        params['status'] = status
+    return params
@@ -4,7 +4,9 @@ from dataclasses import dataclass
 
 from lemon_markets.account import Account
 from lemon_markets.helpers.api_client import _ApiClient
-from lemon_markets.instrument import Instrument, Instruments
+from lemon_markets.helpers.async_api_client import _AsyncApiClient
+from lemon_markets.helpers.tracing import traced
+from lemon_markets.instrument import AsyncInstruments, Instrument, Instruments
 from lemon_markets.space import Space
 
 
@@ -52,14 +54,52 @@ class Portfolio(_ApiClient):
         self._space = space
         super().__init__(account=account)
 
+    @traced
     def update_positions(self):
         """Update non-static portfolio data."""
-        endpoint = f'spaces/{self._space.uuid}/portfolio/'
+        endpoint = f'spaces/{self._space.id}/portfolio/'
         data_rows = self._request_paged(endpoint=endpoint)
 
+        instruments = Instruments(self._account).get_instruments(data['instrument']['isin'] for data in data_rows)
         self.positions = []
         for data in data_rows:
-            isin = data['instrument']['isin']
-            instrument = Instruments(
-                self._account).list_instruments(search=isin)[0]
+            instrument = instruments[data['instrument']['isin']]
             self.positions.append(Position._from_response(instrument=instrument, data=data))
+
+
+class AsyncPortfolio(_AsyncApiClient):
+    """
+    Class representing the space's portfolio, for use with asyncio.
+
+    Attributes
+    ----------
+    positions : list
+            The positions based on the last call of update_positions().
+
+    Parameters
+    ----------
+    account : Account
+        The account
+    space : Space
+        The space
+
+    """
+
+    _space: Space
+
+    def __init__(self, account: Account, space: Space):
+        """Create the portfolio of `space`, the positions are loaded by :meth:`update_positions`."""
+        self._space = space
+        self.positions = []
+        super().__init__(account=account)
+
+    @traced
+    async def update_positions(self):
+        """Update non-static portfolio data. The instruments of the positions are looked up concurrently."""
+        endpoint = f'spaces/{self._space.id}/portfolio/'
+        data_rows = await self._request_paged(endpoint=endpoint)
+
+        isins = [data['instrument']['isin'] for data in data_rows]
+        instruments = await AsyncInstruments(self._account).get_instruments(isins)
+        self.positions = [Position._from_response(instrument=instruments[data['instrument']['isin']], data=data)
+                          for data in data_rows]
@@ -7,7 +7,9 @@ from typing import List
 
 from lemon_markets.account import Account
 from lemon_markets.helpers.api_client import _ApiClient
+from lemon_markets.helpers.async_api_client import _AsyncApiClient
 from lemon_markets.helpers.time_helper import parse_datetime, timestamp
+from lemon_markets.helpers.tracing import traced
 
 
 class SpaceType(Enum):
@@ -102,21 +104,29 @@ class Space(_ApiClient):
         if timestamp() - self._latest_update > self.cache_seconds:
             print('updaring space cache')
             data = self._request(f'spaces/{self.id}')['results']
-            try:
-                type_ = SpaceType(data['type'])
-            except (ValueError, KeyError):
-                raise ValueError(f'Unexpected space type: {data["type"]}')
-            self._cache = {
-                'name': data['name'],
-                'description': data['description'],
-                'type': type_,
-                'linked': data['linked'],
-                'risk_limit': data['risk_limit'],
-                'buying_power': data['buying_power'],
-                'earnings': data['earnings'],
-                'backfire': data['backfire']
-            }
-            self._latest_update = timestamp()
+            self._set_space_cache(data)
+
+    def _set_space_cache(self, data: dict):
+        """Replace the state of the space with response data."""
+        self._cache = self._parse(data)
+        self._latest_update = timestamp()
+
+    @staticmethod
+    def _parse(data: dict) -> dict:
+        try:
+            type_ = SpaceType(data['type'])
+        except (ValueError, KeyError):
+            raise ValueError(f'Unexpected space type: {data["type"]}')
+        return {
+            'name': data['name'],
+            'description': data['description'],
+            'type': type_,
+            'linked': data['linked'],
+            'risk_limit': data['risk_limit'],
+            'buying_power': data['buying_power'],
+            'earnings': data['earnings'],
+            'backfire': data['backfire']
+        }
 
     def _get_space_cache(self) -> dict:
         """
@@ -131,20 +141,20 @@ class Space(_ApiClient):
         self._update_space_cache()
         return self._cache
 
+    @traced
     def delete(self):
         if self._deleted:
             raise ValueError('Space has been deleted')
         """Delete the space."""
-        self._request(f'spaces/{self.id}', method='DELETE', headers=self._account._authorize())
+        self._request(f'spaces/{self.id}', method='DELETE')
         del self
 
     def _alter(self, data: dict):
         if self._deleted:
             raise ValueError('Space has been deleted')
         """Alter the space."""
-        data = self._request(f'spaces/{self.id}', method='PUT', data=data, headers=self._account._authorize())
-        self._cache = self._parse(data['results'])
-        self._latest_update = timestamp()
+        data = self._request(f'spaces/{self.id}', method='PUT', data=data)
+        self._set_space_cache(data['results'])
 
     @name.setter
     def name(self, name: str):
@@ -171,6 +181,7 @@ class Spaces(_ApiClient):
     def __init__(self, account: Account):
         super().__init__(account=account)
 
+    @traced
     def list_spaces(self, type: SpaceType = None) -> List[Space]:
         """
         List all spaces with matching criteria.
@@ -192,6 +203,7 @@ class Spaces(_ApiClient):
         result_pages = self._request_paged('spaces', params=params)
         return [Space._from_response(self._account, res) for res in result_pages]
 
+    @traced
     def get_space(self, id: str) -> Space:
         """
         Get a space by id.
@@ -210,6 +222,7 @@ class Spaces(_ApiClient):
         data = self._request(f'spaces/{id}')
         return Space._from_response(self._account, data['results'])
 
+    @traced
     def create_space(self, name: str, type: SpaceType, risk_limit: float, description: str = None) -> Space:
         """
         Create a space.
@@ -239,5 +252,122 @@ class Spaces(_ApiClient):
         if description is not None:
             data['description'] = description
 
-        data = self._request('spaces', method='POST', data=data, headers=self._account._authorize())
+        data = self._request('spaces', method='POST', data=data)
         return Space._from_response(self._account, data['results'])
+
+
+class AsyncSpaces(_AsyncApiClient):
+    """
+    Class for managing spaces with asyncio.
+
+    The returned spaces have their state loaded, so their properties can be read
+    without blocking for `cache_seconds`. Use :meth:`update_space` to refresh them.
+
+    Parameters
+    ----------
+    account : Account
+        The account object
+
+    """
+
+    def __init__(self, account: Account):
+        """Create the client for spaces."""
+        super().__init__(account=account)
+
+    def _space(self, data: dict) -> Space:
+        space = Space._from_response(self._account, data)
+        space._set_space_cache(data)
+        return space
+
+    @traced
+    async def list_spaces(self, type: SpaceType = None) -> List[Space]:
+        """
+        List all spaces with matching criteria.
+
+        Parameters
+        ----------
+        type : SpaceType, optional
+            Search for spaces of the specified type.
+
+        Returns
+        -------
+        List[Space]
+            List of spaces matching your query
+
+        """
+        params = {}
+        if type is not None:
+            params['type'] = type.value
+        result_pages = await self._request_paged('spaces', params=params)
+        return [self._space(res) for res in result_pages]
+
+    @traced
+    async def get_space(self, id: str) -> Space:
+        """
+        Get a space by id.
+
+        Parameters
+        ----------
+        id : str
+            The id of the space
+
+        Returns
+        -------
+        Space
+            The space
+
+        """
+        data = await self._request(f'spaces/{id}')
+        return self._space(data['results'])
+
+    @traced
+    async def update_space(self, space: Space):
+        """
+        Refresh the state of a space.
+
+        Parameters
+        ----------
+        space : Space
+            The space to refresh
+
+        """
+        data = await self._request(f'spaces/{space.id}')
+        space._set_space_cache(data['results'])
+
+    @traced
+    async def create_space(self, name: str, type: SpaceType, risk_limit: float, description: str = None) -> Space:
+        """
+        Create a space.
+
+        Takes the same parameters as :meth:`Spaces.create_space`.
+
+        Returns
+        -------
+        Space
+            The space
+
+        """
+        data = {
+            'name': name,
+            'type': type.value,
+            'risk_limit': risk_limit
+        }
+        if description is not None:
+            data['description'] = description
+
+        data = await self._request('spaces', method='POST', data=data)
+        return self._space(data['results'])
+
+    @traced
+    async def delete_space(self, space: Space):
+        """
+        Delete a space.
+
+        Parameters
+        ----------
+        space : Space
+            The space to delete
+
+        """
+        await self._request(f'spaces/{space.id}', method='DELETE')
+        space._deleted = True
@@ -5,7 +5,9 @@ from typing import List
 
 from lemon_markets.account import Account
 from lemon_markets.helpers.api_client import _ApiClient
-from lemon_markets.helpers.time_helper import current_time
+from lemon_markets.helpers.async_api_client import _AsyncApiClient
+from lemon_markets.helpers.time_helper import current_time, timestamp
+from lemon_markets.helpers.tracing import traced
 from lemon_markets.space import Space
 
 
@@ -44,12 +46,13 @@ class State(_ApiClient):
     _cash_storage_time: int = 10
 
     def __init__(self, account: Account, cash_time_in_seconds: int = 10):
-        super().__init__(account)
+        super().__init__(account=account)
         self._cash_storage_time = cash_time_in_seconds
         self.get_state()
         self.get_spaces()
         self._latest_update = current_time()
 
+    @traced
     def get_state(self):
         """
         Get the state of a space.
@@ -70,6 +73,7 @@ class State(_ApiClient):
             except Exception:
                 raise Exception
 
+    @traced
     def get_spaces(self):
         """Return a list of your spaces."""
         diff_since_last_update = self._latest_update - current_time()
@@ -80,6 +84,7 @@ class State(_ApiClient):
                 self._account, data) for data in data_rows]
 
     # TODO revise docstring
+    @traced
     def change_cash_time(self, new_cash_time_in_seconds: int):
         """
         Change the time request results are cashed by multiple property calls.
@@ -133,3 +138,72 @@ class State(_ApiClient):
         """
         self.get_spaces()
         return self._spaces
+
+
+class AsyncState(_AsyncApiClient):
+    """
+    Represents the state of an account, for use with asyncio.
+
+    Parameters
+    ----------
+    account : Account
+        The account with your space's credentials.
+    cash_time_in_seconds : int
+        Optional: The time requested data is cashed. Default is 10 seconds.
+
+    """
+
+    def __init__(self, account: Account, cash_time_in_seconds: int = 10):
+        """Create the state, it is loaded with the first call of :meth:`get_state`."""
+        super().__init__(account=account)
+        self._cash_storage_time = cash_time_in_seconds
+        self._state = None
+        self._spaces = None
+        self._state_update = 0
+        self._spaces_update = 0
+
+    @traced
+    async def get_state(self) -> dict:
+        """
+        Get the state of the account.
+
+        Returns
+        -------
+        dict
+            The state
+
+        """
+        if timestamp() - self._state_update > self._cash_storage_time:
+            self._state = await self._request(endpoint='state/')
+            self._state_update = timestamp()
+        return self._state
+
+    @traced
+    async def get_balance(self) -> float:
+        """
+        Get the balance of the account.
+
+        Returns
+        -------
+        float
+            The balance of the account
+
+        """
+        return float((await self.get_state())['state']['balance'])
+
+    @traced
+    async def get_spaces(self) -> List[Space]:
+        """
+        Get the spaces of your account.
+
+        Returns
+        -------
+        List of Spaces
+            List of your spaces
+
+        """
+        if timestamp() - self._spaces_update > self._cash_storage_time:
+            data_rows = await self._request_paged('spaces/')
+            self._spaces = [Space._from_response(self._account, data) for data in data_rows]
+            self._spaces_update = timestamp()
+        return self._spaces
@@ -0,0 +1,59 @@
+from concurrent.futures import CancelledError
+from threading import Lock
+from time import perf_counter, sleep
+from unittest import TestCase
+
+from lemon_markets.client import Client
+from lemon_markets.helpers.batch import Batch
+
+
+class _TestBatch(TestCase):
+    def setUp(self):
+        self.running = 0
+        self.max_running = 0
+        self.lock = Lock()
+
+    def slow(self, value, seconds=0.05):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        sleep(seconds)
+        with self.lock:
+            self.running -= 1
+        if value < 0:
+            raise ValueError(value)
+        return value
+
+    def test_results_in_submission_order(self):
+        with Batch(concurrency=4) as batch:
+            for i in range(8):
+                batch.submit(self.slow, i, seconds=0.01 * (8 - i))
+        self.assertEqual([result.get() for result in batch.results()], list(range(8)))
+
+    def test_concurrency_bounded(self):
+        started = perf_counter()
+        with Batch(concurrency=3) as batch:
+            batch.map(self.slow, range(9))
+        self.assertEqual(self.max_running, 3)
+        self.assertLess(perf_counter() - started, 9 * 0.05)
+
+    def test_errors_per_item(self):
+        with Batch(concurrency=2) as batch:
+            batch.map(self.slow, [1, -1, 2])
+        results = batch.results()
+        self.assertEqual([result.ok for result in results], [True, False, True])
+        self.assertIsInstance(results[1].error, ValueError)
+        with self.assertRaises(ValueError):
+            results[1].get()
+
+    def test_cancel_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with Batch(concurrency=1) as batch:
+                batch.map(self.slow, range(5))
+                raise RuntimeError()
+        self.assertTrue(any(isinstance(result.error, CancelledError) for result in batch.results()))
+
+    def test_client_batch(self):
+        batch = Client('token', pool_maxsize=5).batch()
+        self.assertEqual(batch.concurrency, 5)
+        batch.close()
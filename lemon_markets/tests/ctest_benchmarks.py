@@ -0,0 +1,26 @@
+import json
+from unittest import TestCase
+
+from lemon_markets.benchmarks import BENCHMARKS, run
+
+
+class _TestBenchmarks(TestCase):
+    def test_run(self):
+        report = run(['instrument_from_response', 'memory_per_object', 'fetch_orders'], quick=True)
+        json.dumps(report)
+        self.assertEqual(report['source'], 'fake_server')
+        self.assertEqual(list(report['benchmarks']), ['instrument_from_response', 'memory_per_object',
+                                                      'fetch_orders'])
+        self.assertEqual(report['benchmarks']['instrument_from_response']['instruments'], 200)
+        self.assertGreater(report['benchmarks']['memory_per_object']['instrument'], 0)
+        self.assertLess(report['benchmarks']['memory_per_object']['instrument_compact'],
+                        report['benchmarks']['memory_per_object']['instrument'])
+        self.assertEqual(report['benchmarks']['fetch_orders']['full_store']['orders'], 100)
+
+    def test_unknown_benchmark(self):
+        with self.assertRaises(KeyError):
+            run(['missing'])
+
+    def test_registry(self):
+        self.assertIn('import_time', BENCHMARKS)
+        self.assertIn('ohlc_dataframe', BENCHMARKS)
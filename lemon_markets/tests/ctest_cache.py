@@ -0,0 +1,71 @@
+from time import time
+from unittest import TestCase
+
+from lemon_markets.helpers.cache import CacheEntry, MemoryCache, ResponseCache, SQLiteCache
+
+
+class _TestResponseCache(TestCase):
+    def test_incomplete_backend(self):
+        class GetOnlyCache(ResponseCache):
+            def get(self, key):
+                return None
+
+        with self.assertRaises(TypeError):
+            GetOnlyCache()
+
+
+class _TestMemoryCache(TestCase):
+    def make_cache(self, **kwargs):
+        return MemoryCache(**kwargs)
+
+    def test_ttl_patterns(self):
+        cache = self.make_cache(ttls={'venues*': 60, 'ohlc/d1*': 10})
+        self.assertEqual(cache.ttl('venues/'), 60)
+        self.assertEqual(cache.ttl('ohlc/D1/'), 10)
+        self.assertEqual(cache.ttl('spaces/'), 0)
+
+    def test_default_ttls(self):
+        cache = self.make_cache()
+        self.assertGreater(cache.ttl('ohlc/d1/'), 0)
+        # venue opening states and instruments synced with ETags are not cached by default
+        self.assertEqual(cache.ttl('venues/'), 0)
+        self.assertEqual(cache.ttl('instruments/'), 0)
+
+    def test_uncached_endpoint(self):
+        cache = self.make_cache(ttls={'venues*': 60})
+        self.assertEqual(cache.lookup('spaces/', 'https://x/spaces/'), (None, None))
+
+    def test_key_per_token(self):
+        cache = self.make_cache()
+        self.assertNotEqual(cache.key('https://x/venues/', headers={'Authorization': 'Bearer a'}),
+                            cache.key('https://x/venues/', headers={'Authorization': 'Bearer b'}))
+
+    def test_store_and_revalidate(self):
+        cache = self.make_cache(ttls={'venues*': 60})
+        key, entry = cache.lookup('venues/', 'https://x/venues/')
+        self.assertIsNone(entry)
+        cache.update(key, 'venues/', 200, {'ETag': '"1"'}, b'{}')
+        _, entry = cache.lookup('venues/', 'https://x/venues/')
+        self.assertTrue(entry.fresh)
+        self.assertEqual(entry.validators(), {'If-None-Match': '"1"'})
+        stale = CacheEntry(b'{"a": 1}', time() - 1, '"2"')
+        self.assertEqual(cache.update(key, 'venues/', 304, {}, b'', stale).body, b'{"a": 1}')
+
+    def test_errors_not_stored(self):
+        cache = self.make_cache(ttls={'venues*': 60})
+        self.assertIsNone(cache.update('k', 'venues/', 500, {}, b''))
+        self.assertIsNone(cache.get('k'))
+
+    def test_lru_eviction(self):
+        cache = self.make_cache(max_entries=2)
+        cache.set('a', CacheEntry(b'a', 0))
+        cache.set('b', CacheEntry(b'b', 0))
+        cache.get('a')
+        cache.set('c', CacheEntry(b'c', 0))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+
+
+class _TestSQLiteCache(_TestMemoryCache):
+    def make_cache(self, max_bytes=None, **kwargs):
+        return SQLiteCache(':memory:', **kwargs)
@@ -0,0 +1,82 @@
+import json
+import os
+from datetime import timedelta
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from unittest import TestCase
+
+from requests import Response, Session
+from requests.adapters import BaseAdapter
+
+from lemon_markets.client import Client
+from lemon_markets.config import _PAPER_TRADING_REST_URL
+from lemon_markets.exceptions import CassetteError
+from lemon_markets.helpers.api_client import _ApiClient
+from lemon_markets.helpers.cassette import Cassette, RecordingAdapter
+
+
+class _StubAdapter(BaseAdapter):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def send(self, request, **kwargs):
+        self.calls += 1
+        res = Response()
+        res.status_code = 200
+        res.headers['Content-Type'] = 'application/json'
+        res.headers['Set-Cookie'] = 'secret'
+        res._content = json.dumps({'results': [self.calls], 'next': None}).encode()
+        res.elapsed = timedelta(milliseconds=50)
+        res.request = request
+        res.url = request.url
+        return res
+
+    def close(self):
+        pass
+
+
+class _TestCassette(TestCase):
+    def setUp(self):
+        self.dir = TemporaryDirectory()
+        self.url = _PAPER_TRADING_REST_URL + 'venues/'
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def record(self, name='venues.jsonl', times=2):
+        path = os.path.join(self.dir.name, name)
+        session = Session()
+        session.mount('https://', RecordingAdapter(Cassette(path, 'record'), _StubAdapter()))
+        for _ in range(times):
+            session.get(self.url, params={'b': 1, 'a': 2}, headers={'Authorization': 'Token secret'})
+        return path
+
+    def test_token_not_recorded(self):
+        with open(self.record()) as f:
+            content = f.read()
+        self.assertNotIn('secret', content)
+        self.assertEqual(len(content.splitlines()), 2)
+
+    def test_replay_in_order(self):
+        client = Client('token', cassette=Cassette(self.record('venues.jsonl.gz')))
+        api = _ApiClient(client=client, endpoint=client._TRADING_REST_URL)
+        # the query is matched regardless of its order
+        results = [api._request('venues/', params={'a': 2, 'b': 1})['results'] for _ in range(3)]
+        self.assertEqual(results, [[1], [2], [2]])
+
+    def test_replay_latency(self):
+        path = self.record()
+        session = Session()
+        Cassette(path, latency='recorded').mount(session)
+        started = perf_counter()
+        res = session.get(self.url + '?a=2&b=1')
+        self.assertGreaterEqual(perf_counter() - started, 0.05)
+        self.assertGreaterEqual(res.elapsed, timedelta(milliseconds=50))
+        self.assertEqual(res.headers['Content-Type'], 'application/json')
+
+    def test_unrecorded_request(self):
+        session = Session()
+        Cassette(self.record()).mount(session)
+        with self.assertRaises(CassetteError):
+            session.get(self.url)
@@ -0,0 +1,55 @@
+import json
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import patch
+
+from lemon_markets.client import Client
+from lemon_markets.helpers.api_client import _ApiClient
+from lemon_markets.helpers.decoding import get_decoder
+from lemon_markets.helpers.fake_server import FakeServer
+
+
+def _fake_json_library():
+    return SimpleNamespace(loads=lambda body: json.loads(body))
+
+
+class _TestDecoding(TestCase):
+    def test_decoder_by_name(self):
+        self.assertIs(get_decoder('json'), json.loads)
+        ujson = _fake_json_library()
+        with patch.dict('sys.modules', {'ujson': ujson}):
+            self.assertIs(get_decoder('ujson'), ujson.loads)
+
+    def test_unknown_decoder(self):
+        with self.assertRaises(ValueError):
+            get_decoder('simplejson')
+
+    def test_callable_decoder(self):
+        def decode(body):
+            return {}
+
+        self.assertIs(get_decoder(decode), decode)
+
+    def test_fallback_order(self):
+        orjson, ujson = _fake_json_library(), _fake_json_library()
+        # a module set to None can't be imported
+        with patch.dict('sys.modules', {'orjson': orjson, 'ujson': ujson}):
+            self.assertIs(get_decoder(), orjson.loads)
+        with patch.dict('sys.modules', {'orjson': None, 'ujson': ujson}):
+            self.assertIs(get_decoder(), ujson.loads)
+        with patch.dict('sys.modules', {'orjson': None, 'ujson': None}):
+            self.assertIs(get_decoder(), json.loads)
+
+    def test_client_decoder_used(self):
+        bodies = []
+
+        def decode(body):
+            bodies.append(body)
+            return json.loads(body)
+
+        with FakeServer(token='token', instruments=3) as server:
+            client = Client('token', base_url=server.url, json_decoder=decode)
+            data = _ApiClient(client=client)._request('venues/')
+            client.close()
+        self.assertEqual(len(bodies), 1)
+        self.assertEqual(data['results'], server.venues)
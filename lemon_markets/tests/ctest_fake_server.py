@@ -0,0 +1,253 @@
+import asyncio
+from datetime import datetime, timedelta
+from importlib.util import find_spec
+from threading import Barrier, Thread
+from unittest import skipUnless
+from unittest.mock import patch
+
+import requests
+
+from lemon_markets.account import Account
+from lemon_markets.client import Client
+from lemon_markets.helpers.api_client import _ApiClient
+from lemon_markets.helpers.async_api_client import _AsyncApiClient
+from lemon_markets.helpers.fake_server import FakeServer
+from lemon_markets.helpers.retry import RetryPolicy
+from lemon_markets.instrument import AsyncInstruments, Instruments
+from lemon_markets.order import Orders
+from lemon_markets.space import Spaces
+from lemon_markets.tests.fake_server_case import _FakeServerTestCase
+from lemon_markets.trading_venue import TradingVenues
+
+
+class _TestFakeServer(_FakeServerTestCase):
+    server_options = {'instruments': 120, 'orders': 30, 'page_size': 50}
+
+    def test_account(self):
+        self.assertEqual(self.account.firstname, 'Fake')
+        self.assertEqual(self.account.balance, 100000)
+
+    def test_unauthorized(self):
+        res = requests.get(self.server.url + 'account/', headers={'Authorization': 'Bearer wrong'})
+        self.assertEqual(res.status_code, 401)
+
+    def test_paging(self):
+        res = requests.get(self.server.url + 'instruments/', params={'page': 2},
+                           headers={'Authorization': 'Bearer token'}).json()
+        self.assertEqual((res['total'], res['page'], res['pages']), (120, 2, 3))
+        self.assertEqual(len(res['results']), 50)
+        self.assertIn('page=3', res['next'])
+        self.assertEqual(len(Instruments(self.account).list_instruments()), 120)
+
+    def test_shared_venues(self):
+        received = self.server.requests
+        instruments = Instruments(self.account).list_instruments()
+        # three pages of instruments and one request for all venues
+        self.assertEqual(self.server.requests - received, 4)
+        self.assertEqual(instruments[0].trading_venues[0].mic, self.server.instruments[0]['venues'][0]['mic'])
+        received = self.server.requests
+        Instruments(self.account).list_instruments(search=self.server.instruments[0]['isin'])
+        self.assertEqual(self.server.requests - received, 1)
+
+    def test_iteration_stopped_early(self):
+        api = _ApiClient(client=self.client)
+        received = self.server.requests
+        results = api._iter_paged('instruments/', prefetch=False)
+        self.assertEqual(next(results)['isin'], self.server.instruments[0]['isin'])
+        results.close()
+        self.assertEqual(self.server.requests - received, 1)
+
+        received = self.server.requests
+        results = api._iter_paged('instruments/')
+        next(results)
+        results.close()
+        # at most the prefetched second page was requested too
+        self.assertLessEqual(self.server.requests - received, 2)
+
+    def test_all_venue_pages_shared(self):
+        with FakeServer(token='token', instruments=1, spaces=0, page_size=1) as server:
+            client = Client('token', base_url=server.url)
+            venues = TradingVenues(Account(client))
+            mics = [venue['mic'] for venue in server.venues]
+            self.assertGreater(len(mics), 1)
+            self.assertEqual([venue.mic for venue in venues.trading_venues], mics)
+            self.assertEqual(list(client._venues.get(None)), mics)
+            client.close()
+
+    def test_unknown_venue_requested_once(self):
+        venues = self.server.venues
+        mic = venues[0]['mic']
+        listed = sum(mic in (venue['mic'] for venue in instrument['venues']) for instrument in self.server.instruments)
+        self.assertGreater(listed, 1)
+        # the shared venue data is missing one venue, e.g. one opened after it was requested
+        self.client._venues.update(venues[1:])
+        instruments = Instruments(self.account)
+        for compact in (False, True):
+            with self.subTest(compact=compact):
+                received = self.server.requests
+                listing = instruments.list_instruments(compact=compact)
+                self.assertEqual(len(list(listing)), 120)
+                # the three instrument pages and the missing venue
+                self.assertEqual(self.server.requests - received, 4)
+        self.assertNotIn(mic, self.client._venues.get(None))
+
+    def test_etag(self):
+        url = self.server.url + 'venues/'
+        res = requests.get(url, headers={'Authorization': 'Bearer token'})
+        res = requests.get(url, headers={'Authorization': 'Bearer token', 'If-None-Match': res.headers['ETag']})
+        self.assertEqual(res.status_code, 304)
+
+    def test_orders(self):
+        space = Spaces(self.account).list_spaces()[0]
+        orders = Orders(self.account, space)
+        orders.fetch_orders()
+        self.assertEqual(sum(len(by_uuid) for by_uuid in orders.orders.values()), 30)
+
+        instrument = Instruments(self.account).list_instruments(search=self.server.instruments[0]['isin'])[0]
+        order = orders.create_order(instrument, datetime.now() + timedelta(days=1), 'buy', 1, idempotency_key='key')
+        self.assertTrue(orders.activate_order(order))
+        again = orders.create_order(instrument, datetime.now() + timedelta(days=1), 'buy', 1, idempotency_key='key')
+        self.assertEqual(again.uuid, order.uuid)
+
+    def test_compression(self):
+        Instruments(self.account).list_instruments(type='stock')
+        entry = self.client.metrics.snapshot()['GET instruments/']
+        self.assertGreater(entry['compression_ratio'], 2)
+
+        client = Client('token', base_url=self.server.url, compression=False)
+        Instruments(Account(client)).list_instruments(type='stock')
+        self.assertEqual(client.metrics.snapshot()['GET instruments/']['compression_ratio'], 1)
+
+    def test_injected_errors_retried(self):
+        self.server.fail_next(2)
+        client = Client('token', base_url=self.server.url, retry=RetryPolicy(backoff_factor=0.01))
+        self.assertEqual(Account(client).firstname, 'Fake')
+        self.assertEqual(client.metrics.snapshot()['GET account/']['retries'], 2)
+
+    def test_reconcile_after_backoff(self):
+        client = Client('token', base_url=self.server.url, retry=RetryPolicy(backoff_factor=0.01))
+        endpoint = f'spaces/{Spaces(Account(client)).list_spaces()[0].id}/orders/'
+        calls = []
+
+        def reconcile():
+            calls.append('reconcile')
+            return {'uuid': 'found'}
+
+        self.server.fail_next()
+        received = self.server.requests
+        with patch('lemon_markets.helpers.api_client.sleep', lambda seconds: calls.append('sleep')):
+            data = _ApiClient(client=client)._request(endpoint, method='POST', data={}, reconcile=reconcile)
+        self.assertEqual(data, {'uuid': 'found'})
+        self.assertEqual(calls, ['sleep', 'reconcile'])
+        self.assertEqual(self.server.requests - received, 1)
+
+    def test_failed_reconcile_not_resent(self):
+        client = Client('token', base_url=self.server.url, retry=RetryPolicy(backoff_factor=0.01))
+        endpoint = f'spaces/{Spaces(Account(client)).list_spaces()[0].id}/orders/'
+
+        def reconcile():
+            raise requests.exceptions.ConnectionError('still offline')
+
+        self.server.fail_next()
+        received = self.server.requests
+        with self.assertRaises(requests.HTTPError) as raised:
+            _ApiClient(client=client)._request(endpoint, method='POST', data={}, reconcile=reconcile)
+        self.assertEqual(raised.exception.response.status_code, 503)
+        self.assertEqual(self.server.requests - received, 1)
+
+    def test_failed_page_cancels_the_others(self):
+        cancelled = []
+
+        class Pages(_AsyncApiClient):
+            async def _request(self, endpoint, params=None, page=None, **kwargs):
+                if page == 1:
+                    return {'pages': 4, 'results': [], 'next': None}
+                if page == 2:
+                    raise requests.exceptions.ConnectionError('offline')
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled.append(page)
+                    raise
+
+        async def request_pages():
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                await Pages(client=self.client)._request_paged('instruments/', concurrency=4)
+            return sorted(cancelled)
+
+        self.assertEqual(asyncio.run(request_pages()), [3, 4])
+
+    @skipUnless(find_spec('httpx'), 'httpx is not installed')
+    def test_async_client_in_several_event_loops(self):
+        async def list_instruments():
+            return await AsyncInstruments(self.account).list_instruments(type='stock')
+
+        first = asyncio.run(list_instruments())
+        # the session and semaphore of the closed first loop are replaced
+        self.assertEqual(asyncio.run(list_instruments()), first)
+        self.assertEqual(len(self.client._async_resources), 1)
+
+    @skipUnless(find_spec('httpx'), 'httpx is not installed')
+    def test_async_coalescing_in_several_event_loops(self):
+        api = _AsyncApiClient(client=self.client)
+        barrier = Barrier(2)
+        results = []
+
+        async def request_venues():
+            return await asyncio.gather(*(api._request('venues/') for _ in range(3)))
+
+        def run():
+            barrier.wait()
+            try:
+                results.append(asyncio.run(request_venues()))
+            except Exception as e:
+                results.append(e)
+
+        # the identical requests of both loops are running at the same time
+        self.server.stall_next(2, seconds=0.3)
+        received = self.server.requests
+        threads = [Thread(target=run) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), 2)
+        for result in results:
+            self.assertIsInstance(result, list)
+            self.assertEqual(result[0]['results'], self.server.venues)
+        # coalesced within every loop, but not across them
+        self.assertEqual(self.server.requests - received, 2)
+
+    @skipUnless(find_spec('httpx'), 'httpx is not installed')
+    def test_async_not_modified_without_cache(self):
+        response_headers = {}
+        _ApiClient(client=self.client)._request('venues/', response_headers=response_headers)
+
+        async def request():
+            return await _AsyncApiClient(client=self.client)._request(
+                'venues/', headers={'If-None-Match': response_headers['ETag']})
+
+        self.assertIsNone(asyncio.run(request()))
+
+    @skipUnless(find_spec('httpx'), 'httpx is not installed')
+    def test_async_errors_like_sync(self):
+        with self.assertRaises(requests.HTTPError) as raised:
+            _ApiClient(client=self.client)._request('spaces/missing/')
+        sync_error = raised.exception
+
+        async def request():
+            await _AsyncApiClient(client=self.client)._request('spaces/missing/')
+
+        with self.assertRaises(requests.HTTPError) as raised:
+            asyncio.run(request())
+        self.assertEqual(raised.exception.response.status_code, sync_error.response.status_code)
+        self.assertEqual(str(raised.exception), str(sync_error))
+
+    def test_throttling(self):
+        server = FakeServer(rate_limit=5, instruments=1, spaces=0).start()
+        try:
+            statuses = [requests.get(server.url + 'venues/').status_code for _ in range(10)]
+        finally:
+            server.stop()
+        self.assertIn(429, statuses)
+        self.assertEqual(statuses[0], 200)
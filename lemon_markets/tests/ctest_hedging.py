@@ -0,0 +1,121 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Semaphore
+from time import perf_counter, sleep
+from unittest import TestCase
+from unittest.mock import patch
+from urllib.parse import urlsplit
+
+from requests.exceptions import ChunkedEncodingError
+
+from lemon_markets.account import Account
+from lemon_markets.client import Client
+from lemon_markets.exceptions import CircuitOpenError
+from lemon_markets.helpers.api_client import _ApiClient
+from lemon_markets.helpers.circuit_breaker import CircuitBreaker
+from lemon_markets.helpers.fake_server import FakeServer
+from lemon_markets.helpers.hedging import HedgePolicy, call_hedged
+from lemon_markets.helpers.metrics import MetricsRegistry
+from lemon_markets.trading_venue import TradingVenues
+
+
+class _TestHedgePolicy(TestCase):
+    def test_delay(self):
+        metrics = MetricsRegistry()
+        policy = HedgePolicy(min_samples=10, endpoints=['venues/'])
+        for _ in range(9):
+            metrics.record_response('GET', 'venues/', 200, 0.02)
+        self.assertIsNone(policy.delay(metrics, 'GET', 'venues/'))
+        metrics.record_response('GET', 'venues/', 200, 0.02)
+        self.assertEqual(policy.delay(metrics, 'GET', 'venues/'), 0.025)
+        self.assertIsNone(policy.delay(metrics, 'POST', 'venues/'))
+        self.assertIsNone(policy.delay(metrics, 'GET', 'instruments/'))
+
+    def test_hedged_request(self):
+        with FakeServer(instruments=10, spaces=0) as server:
+            client = Client('token', base_url=server.url, hedge=HedgePolicy(min_samples=5, max_delay=0.05))
+            venues = TradingVenues(Account(client))
+            for _ in range(5):
+                venues.get_venues()
+            server.stall_next(1, 0.5)
+            started = perf_counter()
+            venues.get_venues()
+            self.assertLess(perf_counter() - started, 0.4)
+            sleep(0.6)
+            client.close()
+        entry = client.metrics.snapshot()['GET venues/']
+        self.assertEqual((entry['hedges'], entry['hedge_wins'], entry['hedges_abandoned']), (1, 1, 1))
+
+    def test_no_hedge_without_free_worker(self):
+        hedges = []
+
+        def slow():
+            sleep(0.05)
+            return 'done'
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            self.assertEqual(call_hedged(executor, slow, 0.01, lambda: hedges.append(1), slots=Semaphore(0)),
+                             ('done', False))
+            self.assertEqual(call_hedged(executor, slow, 0.01, lambda: hedges.append(1), slots=Semaphore(1)),
+                             ('done', False))
+            self.assertEqual(call_hedged(executor, slow, 0.01, lambda: hedges.append(1), slots=Semaphore(2))[0],
+                             'done')
+        self.assertEqual(hedges, [1])
+
+
+class _TestCircuitBreaker(TestCase):
+    def test_states(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+        breaker.on_response('host', 503)
+        breaker.on_response('host', 200)
+        breaker.on_response('host', None)
+        self.assertEqual(breaker.state('host'), 'closed')
+        breaker.on_response('host', 500)
+        self.assertEqual(breaker.state('host'), 'open')
+        self.assertRaises(CircuitOpenError, breaker.before_request, 'host')
+        breaker.before_request('other')
+
+        breaker._circuits['host'].opened_at -= 0.05
+        self.assertEqual(breaker.state('host'), 'half_open')
+        breaker.before_request('host')
+        self.assertRaises(CircuitOpenError, breaker.before_request, 'host')
+        breaker.on_response('host', 503)
+        self.assertEqual(breaker.state('host'), 'open')
+
+        breaker._circuits['host'].opened_at -= 0.05
+        breaker.before_request('host')
+        breaker.on_response('host', 200)
+        self.assertEqual(breaker.state('host'), 'closed')
+
+    def test_probe_slot_released(self):
+        with FakeServer(instruments=10, spaces=0) as server:
+            breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+            client = Client('token', base_url=server.url, circuit_breaker=breaker)
+            api = _ApiClient(client=client)
+            host = urlsplit(server.url).netloc
+            breaker.on_response(host, 503)
+            breaker._circuits[host].opened_at -= 0.05
+
+            with patch.object(client._session, 'request', side_effect=KeyboardInterrupt):
+                self.assertRaises(KeyboardInterrupt, api._request, 'venues/')
+            self.assertEqual(breaker.state(host), 'half_open')
+            with patch.object(client._session, 'request', side_effect=ChunkedEncodingError):
+                self.assertRaises(ChunkedEncodingError, api._request, 'venues/')
+            self.assertEqual(breaker.state(host), 'open')
+
+            breaker._circuits[host].opened_at -= 0.05
+            api._request('venues/')
+            self.assertEqual(breaker.state(host), 'closed')
+            client.close()
+
+    def test_fail_fast(self):
+        with FakeServer(instruments=10, spaces=0) as server:
+            client = Client('token', base_url=server.url, circuit_breaker=CircuitBreaker(failure_threshold=3))
+            venues = TradingVenues(Account(client))
+            server.fail_next(3)
+            for _ in range(3):
+                self.assertRaises(Exception, venues.get_venues)
+            received = server.requests
+            self.assertRaises(CircuitOpenError, venues.get_venues)
+            self.assertEqual(server.requests, received)
+            client.close()
+        self.assertEqual(client.metrics.snapshot()['GET venues/']['circuit_open'], 1)
@@ -0,0 +1,69 @@
+import socket
+import ssl
+from unittest import TestCase
+
+import requests
+from requests.utils import DEFAULT_CA_BUNDLE_PATH
+
+from lemon_markets.client import Client
+from lemon_markets.helpers.fake_server import FakeServer
+from lemon_markets.helpers.session import HTTP2Adapter, _ssl_context, create_session
+
+
+class _TestHTTP2Adapter(TestCase):
+    def setUp(self):
+        try:
+            self.adapter = HTTP2Adapter()
+        except ImportError as e:
+            self.skipTest(str(e))
+
+    def tearDown(self):
+        self.adapter.close()
+
+    def test_mounted_for_https(self):
+        session = create_session(http2=True)
+        self.assertIsInstance(session.get_adapter('https://trading.lemon.markets/v1/'), HTTP2Adapter)
+        self.assertNotIsInstance(session.get_adapter('http://localhost/'), HTTP2Adapter)
+        self.assertIsInstance(Client('token', http2=True)._session.get_adapter('https://x/'), HTTP2Adapter)
+
+    def test_response(self):
+        session = requests.Session()
+        session.mount('http://', self.adapter)
+        with FakeServer(instruments=3) as server:
+            res = session.get(server.url + 'venues/', params={'mic': 'XMUN'})
+            missing = session.get(server.url + 'missing/')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()['results'][0]['mic'], 'XMUN')
+        self.assertEqual(res.headers['content-type'], 'application/json')
+        self.assertEqual(missing.status_code, 404)
+        with self.assertRaises(requests.exceptions.HTTPError):
+            missing.raise_for_status()
+
+    def test_connection_error(self):
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            port = s.getsockname()[1]
+        session = requests.Session()
+        session.mount('http://', self.adapter)
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            session.get(f'http://127.0.0.1:{port}/', timeout=(1, 1))
+
+    def test_proxy(self):
+        session = requests.Session()
+        session.mount('http://', self.adapter)
+        with FakeServer(instruments=3) as server:
+            res = session.get('http://lemon.invalid/venues/', proxies={'http': server.url})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(res.json()['results']), len(server.venues))
+
+    def test_tls_settings(self):
+        session = requests.Session()
+        # the CA bundle and proxies of the environment would be passed on too
+        session.trust_env = False
+        session.mount('http://', self.adapter)
+        with FakeServer(instruments=3) as server:
+            session.get(server.url + 'venues/')
+            session.get(server.url + 'venues/', verify=False)
+        self.assertEqual(set(self.adapter._clients), {(True, None, None), (False, None, None)})
+        self.assertFalse(_ssl_context(False))
+        self.assertEqual(_ssl_context(DEFAULT_CA_BUNDLE_PATH).verify_mode, ssl.CERT_REQUIRED)
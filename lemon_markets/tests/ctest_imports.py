@@ -0,0 +1,17 @@
+from unittest import TestCase
+
+from lemon_markets.benchmarks.suite import IMPORTED_MODULES, import_module_fresh
+
+
+class _TestImports(TestCase):
+    def test_lazy_dependencies_not_imported(self):
+        for module in IMPORTED_MODULES:
+            with self.subTest(module=module):
+                self.assertEqual(import_module_fresh(module)['lazy_dependencies'], [])
+
+    def test_dataframe_still_built(self):
+        from lemon_markets.market_data import _ohlc_results
+
+        df = _ohlc_results([{'o': 1, 'h': 2, 'l': 0.5, 'c': 1.5, 't': '2021-06-01T12:00:00.000+00:00'}], None, True)
+        self.assertEqual(df.index[0].isoformat()[:10], '2021-06-01')
+        self.assertEqual(df['c'].iloc[0], 1.5)
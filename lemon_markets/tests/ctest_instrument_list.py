@@ -0,0 +1,41 @@
+from lemon_markets.instrument import Instrument, InstrumentList, Instruments, InstrumentType
+from lemon_markets.tests.fake_server_case import _FakeServerTestCase
+
+
+class _TestInstrumentList(_FakeServerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.instruments = Instruments(self.account)
+
+    def test_same_instruments(self):
+        compact = self.instruments.list_instruments(compact=True)
+        self.assertIsInstance(compact, InstrumentList)
+        self.assertEqual(len(compact), 120)
+        self.assertEqual(list(compact), self.instruments.list_instruments())
+
+    def test_access(self):
+        compact = self.instruments.list_instruments(compact=True)
+        self.assertIsInstance(compact[0], Instrument)
+        self.assertEqual(compact[-1].isin, self.server.instruments[-1]['isin'])
+        self.assertEqual([instrument.isin for instrument in compact[2:5]],
+                         [data['isin'] for data in self.server.instruments[2:5]])
+        with self.assertRaises(IndexError):
+            compact[120]
+        self.assertEqual(compact.column('isin'), [data['isin'] for data in self.server.instruments])
+        self.assertTrue(all(isinstance(type_, InstrumentType) for type_ in compact.column('type')))
+        with self.assertRaises(KeyError):
+            compact.column('price')
+
+    def test_shared_venues(self):
+        compact = self.instruments.list_instruments(compact=True)
+        venue = compact[0].trading_venues[0]
+        self.assertIs(compact[0].trading_venues[0], venue)
+        shared = [instrument.trading_venues[0] for instrument in compact
+                  if (instrument.trading_venues[0].mic, instrument.trading_venues[0].currency,
+                      instrument.trading_venues[0].tradable) == (venue.mic, venue.currency, venue.tradable)]
+        self.assertTrue(all(other is venue for other in shared))
+
+    def test_unknown_type(self):
+        data = dict(self.server.instruments[0], type='future')
+        with self.assertRaises(ValueError):
+            InstrumentList(self.account, [data], {})
@@ -0,0 +1,67 @@
+from unittest import TestCase
+
+from lemon_markets.account import Account
+from lemon_markets.client import Client
+from lemon_markets.helpers.fake_server import FakeServer
+from lemon_markets.helpers.instrument_registry import InstrumentRegistry
+from lemon_markets.instrument import Instruments
+from lemon_markets.order import Orders
+from lemon_markets.portfolio import Portfolio
+from lemon_markets.space import Spaces
+
+
+class _TestInstrumentRegistry(TestCase):
+    def test_lru(self):
+        registry = InstrumentRegistry(max_size=2)
+        registry.put('a', 1)
+        registry.put('b', 2)
+        registry.get('a')
+        registry.put('c', 3)
+        self.assertEqual((registry.get('a'), registry.get('b'), registry.get('c')), (1, None, 3))
+        self.assertEqual(len(registry), 2)
+
+    def test_ttl(self):
+        registry = InstrumentRegistry(ttl=0)
+        registry.put('a', 1)
+        self.assertNotIn('a', registry)
+
+    def test_resolve(self):
+        registry = InstrumentRegistry()
+        fetched = []
+
+        def fetch(isin):
+            fetched.append(isin)
+            return isin.lower()
+
+        self.assertEqual(registry.resolve(['A', 'B', 'A'], fetch), {'A': 'a', 'B': 'b'})
+        self.assertEqual(registry.resolve(['B', 'C'], fetch), {'B': 'b', 'C': 'c'})
+        self.assertEqual(sorted(fetched), ['A', 'B', 'C'])
+        self.assertEqual((registry.hits, registry.misses), (1, 3))
+
+    def test_shared_by_orders_and_portfolio(self):
+        with FakeServer(instruments=50, orders=40, positions=10) as server:
+            client = Client('token', base_url=server.url)
+            account = Account(client)
+            space = Spaces(account).list_spaces()[0]
+            orders = Orders(account, space)
+            orders.fetch_orders()
+            received = server.requests
+            orders.fetch_orders()
+            # only the orders are requested again
+            self.assertEqual(server.requests - received, 1)
+            Portfolio(account, space).update_positions()
+            client.close()
+        isins = {order['instrument']['isin'] for order in server.orders[space.id].values()}
+        isins |= {position['instrument']['isin'] for position in server.positions[space.id]}
+        self.assertEqual(client._instrument_registry.misses, len(isins))
+
+    def test_no_other_instrument_cached(self):
+        with FakeServer(instruments=20, spaces=0) as server:
+            client = Client('token', base_url=server.url)
+            instruments = Instruments(Account(client))
+            # a prefix of an isin finds other instruments, but not one with this isin
+            isin = server.instruments[1]['isin'][:-1]
+            self.assertTrue(instruments.list_instruments(search=isin))
+            self.assertRaises(ValueError, instruments.get_instrument, isin)
+            client.close()
+        self.assertNotIn(isin, client._instrument_registry)
@@ -0,0 +1,94 @@
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from lemon_markets.account import Account
+from lemon_markets.client import Client
+from lemon_markets.helpers.cache import MemoryCache
+from lemon_markets.helpers.fake_server import FakeServer
+from lemon_markets.instrument import Instruments
+from lemon_markets.instrument_store import InstrumentStore
+
+
+class _TestInstrumentStore(TestCase):
+    def setUp(self):
+        self.server = FakeServer(instruments=250, spaces=0, page_size=50).start()
+        self.client = Client('token', base_url=self.server.url)
+        self.directory = TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'instruments.db')
+        self.store = InstrumentStore(Account(self.client), self.path)
+
+    def tearDown(self):
+        self.store.close()
+        self.client.close()
+        self.server.stop()
+        self.directory.cleanup()
+
+    def test_incremental_sync(self):
+        stats = self.store.sync()
+        self.assertEqual((stats.pages, stats.added, stats.unchanged_pages), (5, 250, 0))
+        stats = self.store.sync()
+        self.assertEqual((stats.unchanged_pages, stats.added, stats.updated), (5, 0, 0))
+
+        self.server.instruments[60]['name'] = 'Renamed'
+        stats = self.store.sync()
+        self.assertEqual((stats.unchanged_pages, stats.updated), (4, 1))
+        self.assertEqual(self.store.get_instrument(self.server.instruments[60]['isin']).name, 'Renamed')
+
+        removed = self.server.instruments.pop(0)
+        stats = self.store.sync()
+        self.assertEqual(stats.removed, 1)
+        self.assertRaises(KeyError, self.store.get_instrument, removed['isin'])
+        self.assertEqual(len(self.store), 249)
+
+    def test_sync_bypasses_response_cache(self):
+        client = Client('token', base_url=self.server.url, cache=MemoryCache(ttls={'instruments*': 3600}))
+        store = InstrumentStore(Account(client), os.path.join(self.directory.name, 'cached.db'))
+        store.sync()
+        self.assertEqual(store.sync().unchanged_pages, 5)
+        store.close()
+        client.close()
+
+    def test_read_offline(self):
+        self.store.sync()
+        self.store.close()
+        account = Account(self.client)
+        received = self.server.requests
+        self.store = InstrumentStore(account, self.path)
+        instruments = self.store.list_instruments()
+        self.assertEqual(self.server.requests, received)
+        self.assertEqual([i.isin for i in instruments], [i['isin'] for i in self.server.instruments])
+        self.assertEqual(instruments[0].trading_venues[0].mic, self.server.instruments[0]['venues'][0]['mic'])
+
+    def test_filters(self):
+        expected = [i['isin'] for i in self.server.instruments
+                    if i['type'] == 'stock' and any(v['currency'] == 'EUR' for v in i['venues'])]
+        self.assertEqual([i.isin for i in self.store.list_instruments(type='stock', currency='EUR')], expected)
+        isin = self.server.instruments[3]['isin']
+        self.assertEqual([i.isin for i in self.store.list_instruments(search=isin)], [isin])
+
+    def test_search(self):
+        instrument = self.server.instruments[42]
+        self.assertEqual(self.store.search(instrument['isin'])[0].isin, instrument['isin'])
+        self.assertEqual(self.store.search(instrument['wkn'])[0].isin, instrument['isin'])
+        self.assertEqual(self.store.search(instrument['isin'][:-1], limit=None)[0].isin, instrument['isin'])
+        self.assertEqual(len(self.store.search(instrument['name'][:4], limit=3)), 3)
+        self.assertEqual(self.store.search(instrument['title'])[0].isin, instrument['isin'])
+
+    def test_compact(self):
+        compact = self.store.list_instruments(type='stock', compact=True)
+        self.assertEqual(list(compact), self.store.list_instruments(type='stock'))
+        isin = self.server.instruments[42]['isin']
+        self.assertEqual(self.store.list_instruments(search=isin, compact=True)[0].isin, isin)
+
+    def test_dataframe(self):
+        df = self.store.list_instruments(type='stock', as_df=True)
+        self.assertEqual(set(df['isin']), {instrument.isin for instrument in self.store.list_instruments(type='stock')})
+
+    def test_instruments_search_fast_path(self):
+        self.store.sync()
+        instruments = Instruments(Account(self.client), store=self.store)
+        received = self.server.requests
+        isin = self.server.instruments[7]['isin']
+        self.assertEqual(instruments.list_instruments(search=isin)[0].isin, isin)
+        self.assertEqual(self.server.requests, received)
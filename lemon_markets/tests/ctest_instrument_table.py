@@ -0,0 +1,52 @@
+from importlib.util import find_spec
+from unittest import skipUnless
+
+from lemon_markets.helpers.instrument_table import COLUMNS, instrument_columns, instruments_arrow
+from lemon_markets.instrument import Instruments
+from lemon_markets.tests.fake_server_case import _FakeServerTestCase
+
+
+class _TestInstrumentTable(_FakeServerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.instruments = Instruments(self.account)
+
+    def test_columns(self):
+        data = self.server.instruments[0]
+        columns = instrument_columns([data, dict(data, isin='XX0000000000', venues=[])])
+        self.assertEqual(list(columns), list(COLUMNS))
+        self.assertEqual(columns['isin'], [data['isin']] * len(data['venues']) + ['XX0000000000'])
+        self.assertEqual(columns['mic'], [venue['mic'] for venue in data['venues']] + [None])
+        with self.assertRaises(ValueError):
+            instrument_columns([dict(data, type='future')])
+
+    def test_dataframe(self):
+        received = self.server.requests
+        df = self.instruments.list_instruments(as_df=True)
+        # only the pages of instruments, no venues
+        self.assertEqual(self.server.requests - received, 3)
+        self.assertEqual(list(df.columns), list(COLUMNS))
+        self.assertEqual(len(df), sum(len(data['venues']) for data in self.server.instruments))
+        self.assertEqual(df['isin'].nunique(), 120)
+        for column in ('type', 'mic', 'currency'):
+            self.assertEqual(df[column].dtype.name, 'category')
+        self.assertEqual(df['tradable'].dtype.name, 'boolean')
+        eager = self.instruments.list_instruments()
+        self.assertEqual(list(df['mic'][df['isin'] == eager[1].isin]),
+                         [venue.mic for venue in eager[1].trading_venues])
+
+    def test_one_output(self):
+        with self.assertRaises(ValueError):
+            self.instruments.list_instruments(as_df=True, compact=True)
+
+    @skipUnless(find_spec('pyarrow'), 'pyarrow is not installed')
+    def test_arrow(self):
+        table = self.instruments.list_instruments(as_arrow=True)
+        self.assertEqual(table.column_names, list(COLUMNS))
+        self.assertEqual(table.num_rows, sum(len(data['venues']) for data in self.server.instruments))
+        self.assertEqual(str(table.schema.field('mic').type), 'dictionary<values=string, indices=int32, ordered=0>')
+
+    @skipUnless(find_spec('pyarrow') is None, 'pyarrow is installed')
+    def test_arrow_missing(self):
+        with self.assertRaises(ImportError):
+            instruments_arrow(self.server.instruments)
@@ -0,0 +1,60 @@
+from unittest import TestCase
+
+from lemon_markets.helpers.metrics import MetricsRegistry, endpoint_template
+
+
+class _TestEndpointTemplate(TestCase):
+    def test_ids_replaced(self):
+        self.assertEqual(endpoint_template('spaces/0b6c9d3e-1f1f-4c4c-8a8a-123456789012/orders/'),
+                         'spaces/{id}/orders/')
+        self.assertEqual(endpoint_template('/spaces/sp_pyMXHwJ4/portfolio/'), 'spaces/{id}/portfolio/')
+
+    def test_query_removed(self):
+        self.assertEqual(endpoint_template('venues?mic=XMUN'), 'venues')
+
+    def test_static_kept(self):
+        self.assertEqual(endpoint_template('ohlc/M1/'), 'ohlc/M1/')
+
+
+class _TestMetricsRegistry(TestCase):
+    def setUp(self):
+        self.metrics = MetricsRegistry(buckets=(0.1, 1))
+
+    def test_snapshot(self):
+        self.metrics.record_response('get', 'venues/', 200, 0.05, response_bytes=10)
+        self.metrics.record_response('GET', 'venues/', 200, 0.5, response_bytes=10)
+        self.metrics.count('cache_hits', 'GET', 'venues/')
+        summary = self.metrics.snapshot()['GET venues/']
+        self.assertEqual(summary['requests'], 2)
+        self.assertEqual(summary['response_bytes'], 20)
+        self.assertAlmostEqual(summary['mean_seconds'], 0.275)
+        self.assertEqual(summary['p50_seconds'], 0.1)
+        self.assertEqual(summary['p99_seconds'], 1)
+        self.assertAlmostEqual(summary['cache_hit_ratio'], 1)
+
+    def test_compression_ratio(self):
+        self.metrics.record_response('GET', 'instruments/', 200, 0.1, response_bytes=1000, wire_bytes=100)
+        self.metrics.record_response('GET', 'instruments/', 200, 0.1, response_bytes=1000)
+        entry = self.metrics.snapshot()['GET instruments/']
+        self.assertEqual(entry['response_wire_bytes'], 1100)
+        self.assertAlmostEqual(entry['compression_ratio'], 2000 / 1100)
+
+    def test_quantile_above_buckets(self):
+        self.metrics.record_response('GET', 'venues/', 200, 5)
+        self.assertEqual(self.metrics.quantile(0.5, method='GET', endpoint='venues/'), float('inf'))
+
+    def test_quantile_unknown(self):
+        self.assertIsNone(self.metrics.quantile(0.5, method='GET', endpoint='venues/'))
+
+    def test_prometheus(self):
+        self.metrics.record_response('GET', 'venues/', 200, 0.05)
+        text = self.metrics.to_prometheus()
+        self.assertIn('lemon_markets_requests_total{endpoint="venues/",method="GET",status="200"} 1\n', text)
+        self.assertIn('lemon_markets_request_duration_seconds_bucket{endpoint="venues/",method="GET",le="+Inf"} 1',
+                      text)
+        self.assertIn('lemon_markets_request_duration_seconds_count{endpoint="venues/",method="GET"} 1', text)
+
+    def test_reset(self):
+        self.metrics.record_response('GET', 'venues/', 200, 0.05)
+        self.metrics.reset()
+        self.assertEqual(self.metrics.snapshot(), {})
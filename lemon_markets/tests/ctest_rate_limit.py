@@ -0,0 +1,50 @@
+from email.utils import formatdate
+from time import time
+from unittest import TestCase
+
+from lemon_markets.helpers.rate_limit import RateLimiter, parse_retry_after
+
+
+class _TestRateLimiter(TestCase):
+    def setUp(self):
+        self.limiter = RateLimiter(rate=10, burst=2)
+
+    def test_burst_is_free(self):
+        self.assertEqual(self.limiter.acquire(), 0)
+        self.assertEqual(self.limiter.acquire(), 0)
+
+    def test_wait_after_burst(self):
+        self.limiter.acquire()
+        self.limiter.acquire()
+        self.assertAlmostEqual(self.limiter.acquire(), 0.1, delta=0.01)
+
+    def test_throttle_halves_rate(self):
+        self.limiter.on_throttle(0)
+        self.assertEqual(self.limiter.rate, 5)
+
+    def test_throttle_pauses(self):
+        self.limiter.on_throttle(2)
+        self.assertAlmostEqual(self.limiter.acquire(), 2, delta=0.01)
+
+    def test_success_recovers_rate(self):
+        self.limiter.on_throttle(0)
+        for _ in range(100):
+            self.limiter.on_success()
+        self.assertEqual(self.limiter.rate, 10)
+
+    def test_min_rate(self):
+        for _ in range(20):
+            self.limiter.on_throttle(0)
+        self.assertEqual(self.limiter.rate, 1)
+
+
+class _TestParseRetryAfter(TestCase):
+    def test_seconds(self):
+        self.assertEqual(parse_retry_after('3'), 3)
+
+    def test_http_date(self):
+        self.assertAlmostEqual(parse_retry_after(formatdate(time() + 10, usegmt=True)), 10, delta=1.5)
+
+    def test_invalid(self):
+        self.assertIsNone(parse_retry_after('soon'))
+        self.assertIsNone(parse_retry_after(None))
@@ -0,0 +1,39 @@
+from unittest import TestCase
+
+from lemon_markets.helpers.retry import RetryPolicy
+
+
+class _TestRetryPolicy(TestCase):
+    def setUp(self):
+        self.policy = RetryPolicy(total=2)
+
+    def test_retry_idempotent_on_error(self):
+        self.assertTrue(self.policy.can_retry(0, 'GET'))
+        self.assertTrue(self.policy.can_retry(0, 'DELETE', 503))
+
+    def test_no_retry_unguarded_post(self):
+        self.assertFalse(self.policy.can_retry(0, 'POST'))
+        self.assertFalse(self.policy.can_retry(0, 'PUT', 502))
+
+    def test_retry_guarded_post(self):
+        self.assertTrue(self.policy.can_retry(0, 'POST', guarded=True))
+
+    def test_idempotency_key_trusted_on_opt_in(self):
+        headers = {'Idempotency-Key': 'key'}
+        self.assertFalse(self.policy.guarded(headers, False))
+        self.assertTrue(self.policy.guarded(headers, True))
+        self.assertTrue(RetryPolicy(trust_idempotency_key=True).guarded(headers, False))
+        self.assertFalse(RetryPolicy(trust_idempotency_key=True).guarded({}, False))
+
+    def test_retry_throttled_post(self):
+        self.assertTrue(self.policy.can_retry(0, 'POST', 429))
+
+    def test_no_retry_client_error(self):
+        self.assertFalse(self.policy.can_retry(0, 'GET', 404))
+
+    def test_total(self):
+        self.assertFalse(self.policy.can_retry(2, 'GET'))
+
+    def test_backoff_bounds(self):
+        for attempt in range(1, 10):
+            self.assertLessEqual(self.policy.backoff(attempt), self.policy.max_backoff)
@@ -0,0 +1,54 @@
+from unittest import TestCase
+
+from lemon_markets.helpers.search_index import SearchIndex, tokenize
+
+INSTRUMENTS = [
+    {'isin': 'US0378331005', 'wkn': '865985', 'symbol': 'APC', 'name': 'APPLE INC.', 'title': 'Apple'},
+    {'isin': 'US5949181045', 'wkn': '870747', 'symbol': 'MSF', 'name': 'MICROSOFT CORP.', 'title': 'Microsoft'},
+    {'isin': 'DE0007164600', 'wkn': '716460', 'symbol': 'SAP', 'name': 'SAP SE', 'title': 'SAP'},
+    {'isin': 'US02079K3059', 'wkn': 'A14Y6F', 'symbol': 'ABEA', 'name': 'ALPHABET INC. CL. A', 'title': 'Alphabet'},
+]
+
+
+class _TestSearchIndex(TestCase):
+    def setUp(self):
+        self.index = SearchIndex()
+        self.index.update(INSTRUMENTS)
+
+    def isins(self, query, **kwargs):
+        return [data['isin'] for data in self.index.search(query, **kwargs)]
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize('ALPHABET INC. CL. A'), ['alphabet', 'inc', 'cl', 'a'])
+
+    def test_identifiers(self):
+        self.assertEqual(self.isins('us0378331005'), ['US0378331005'])
+        self.assertEqual(self.isins('716460'), ['DE0007164600'])
+        self.assertEqual(self.isins('sap')[0], 'DE0007164600')
+        self.assertEqual(self.isins('US'), ['US0378331005', 'US5949181045', 'US02079K3059'])
+
+    def test_prefix(self):
+        self.assertEqual(self.isins('micro'), ['US5949181045'])
+        self.assertEqual(self.isins('alph cl'), ['US02079K3059'])
+        # `A` is a word of the name of Alphabet
+        self.assertEqual(self.isins('a'), ['US02079K3059', 'US0378331005'])
+        self.assertEqual(self.isins('a', limit=1), ['US02079K3059'])
+
+    def test_ranking(self):
+        # the exact word ranks before words starting with it
+        self.index.update([{'isin': 'XX0000000001', 'name': 'SAPPHIRE', 'title': 'Sapphire'}])
+        self.assertEqual(self.isins('sap'), ['DE0007164600', 'XX0000000001'])
+
+    def test_fuzzy(self):
+        self.assertEqual(self.isins('appel'), ['US0378331005'])
+        self.assertEqual(self.isins('mircosoft'), ['US5949181045'])
+        self.assertEqual(self.isins('microsft'), ['US5949181045'])
+        self.assertEqual(self.isins('appel', fuzzy=False), [])
+
+    def test_update_and_remove(self):
+        self.index.update([dict(INSTRUMENTS[0], name='PEAR INC.', title='Pear')])
+        self.assertEqual(self.isins('apple'), [])
+        self.assertEqual(self.isins('pear'), ['US0378331005'])
+        self.index.remove('US0378331005')
+        self.assertEqual(self.isins('pear'), [])
+        self.assertEqual(len(self.index), 3)
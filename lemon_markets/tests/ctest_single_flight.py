@@ -0,0 +1,85 @@
+import asyncio
+from threading import Barrier, Thread
+from time import sleep
+from unittest import TestCase
+
+from lemon_markets.helpers.single_flight import AsyncSingleFlight, SingleFlight
+
+
+class _TestSingleFlight(TestCase):
+    def setUp(self):
+        self.flights = SingleFlight()
+        self.calls = 0
+
+    def slow_call(self):
+        self.calls += 1
+        sleep(0.1)
+        return {'results': [self.calls]}
+
+    def run_threads(self, target, count=10):
+        barrier = Barrier(count)
+        results = []
+
+        def run():
+            barrier.wait()
+            try:
+                results.append(target())
+            except Exception as e:
+                results.append(e)
+
+        threads = [Thread(target=run) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_concurrent_calls_coalesced(self):
+        results = self.run_threads(lambda: self.flights.do('key', self.slow_call))
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [{'results': [1]}] * 10)
+
+    def test_results_are_copies(self):
+        results = self.run_threads(lambda: self.flights.do('key', self.slow_call), count=2)
+        results[0]['results'].append(2)
+        self.assertEqual(results[1]['results'][-1:], [1])
+
+    def test_callers_mutating_results(self):
+        def mutate():
+            result = self.flights.do('key', self.slow_call)
+            result['results'].append('changed')
+            return result
+
+        results = self.run_threads(mutate)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [{'results': [1, 'changed']}] * 10)
+
+    def test_async_callers_mutating_results(self):
+        flights = AsyncSingleFlight()
+
+        async def slow_call():
+            await asyncio.sleep(0.05)
+            return {'results': [1]}
+
+        async def mutate():
+            result = await flights.do('key', slow_call)
+            result['results'].append('changed')
+            return result
+
+        async def main():
+            return await asyncio.gather(*(mutate() for _ in range(5)))
+
+        self.assertEqual(asyncio.run(main()), [{'results': [1, 'changed']}] * 5)
+
+    def test_errors_shared(self):
+        def fail():
+            sleep(0.1)
+            raise ValueError()
+
+        results = self.run_threads(lambda: self.flights.do('key', fail), count=3)
+        self.assertTrue(all(isinstance(res, ValueError) for res in results))
+
+    def test_sequential_calls_not_coalesced(self):
+        self.flights.do('key', self.slow_call)
+        self.flights.do('key', self.slow_call)
+        self.assertEqual(self.calls, 2)
@@ -0,0 +1,92 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import TestCase
+from unittest.mock import patch
+
+from requests import PreparedRequest, Response
+
+from lemon_markets.client import Client
+from lemon_markets.helpers.api_client import _ApiClient
+from lemon_markets.helpers.tracing import InMemoryCollector, Tracer, current_span, submit_in_context, traced
+
+
+def _response(data: dict, status: int = 200) -> Response:
+    res = Response()
+    res.status_code = status
+    res._content = json.dumps(data).encode()
+    res.elapsed = timedelta(milliseconds=1)
+    res.request = PreparedRequest()
+    return res
+
+
+class _Listing(_ApiClient):
+    @traced
+    def list_all(self):
+        return self._request_paged('instruments/', concurrency=2)
+
+
+class _TestTracer(TestCase):
+    def setUp(self):
+        self.collector = InMemoryCollector()
+        self.tracer = Tracer([self.collector])
+
+    def test_nested_spans(self):
+        with self.tracer.span('outer') as outer:
+            with self.tracer.span('inner') as inner:
+                self.assertIs(current_span(), inner)
+        self.assertIsNone(current_span())
+        self.assertEqual(inner.trace_id, outer.trace_id)
+        self.assertEqual(inner.parent_id, outer.span_id)
+        self.assertIsNone(outer.parent_id)
+        self.assertEqual(self.collector.children(outer), [inner])
+        self.assertGreaterEqual(outer.duration, inner.duration)
+
+    def test_hooks(self):
+        calls = []
+        self.tracer.before_send.append(lambda span: calls.append(('before', span.name)))
+        self.tracer.after_receive.append(lambda span: calls.append(('after', span.name)))
+        self.tracer.on_error.append(lambda span: calls.append(('error', span.name)))
+        with self.tracer.span('call'):
+            with self.tracer.span('GET venues/', 'request'):
+                pass
+        with self.assertRaises(ValueError):
+            with self.tracer.span('GET spaces/', 'request') as failed:
+                raise ValueError()
+        self.assertEqual(calls, [('before', 'GET venues/'), ('after', 'GET venues/'),
+                                 ('before', 'GET spaces/'), ('error', 'GET spaces/')])
+        self.assertIsInstance(failed.error, ValueError)
+
+    def test_submit_in_context(self):
+        with ThreadPoolExecutor(1) as executor:
+            with self.tracer.span('outer') as outer:
+                parent = submit_in_context(executor, current_span).result()
+            self.assertIs(parent, outer)
+            self.assertIsNone(executor.submit(current_span).result())
+
+    def test_paged_requests_correlated(self):
+        client = Client('token', tracer=self.tracer)
+        pages = {None: 1, 2: 2, 3: 3}
+
+        def request(method, url, params=None, **kwargs):
+            page = pages[(params or {}).get('page')]
+            return _response({'results': [page], 'page': page, 'pages': 3, 'next': None})
+
+        with patch.object(client._session, 'request', side_effect=request):
+            results = _Listing(client=client, endpoint=client._TRADING_REST_URL).list_all()
+
+        self.assertEqual(sorted(results), [1, 2, 3])
+        call = next(span for span in self.collector.spans if span.kind == 'call')
+        self.assertEqual(call.name, '_Listing.list_all')
+        requests = self.collector.children(call)
+        self.assertEqual(sorted(span.attributes['page'] for span in requests), [1, 2, 3])
+        for span in requests:
+            self.assertEqual(span.trace_id, call.trace_id)
+            self.assertEqual(span.name, 'GET instruments/')
+            self.assertEqual(span.attributes['status'], 200)
+            self.assertEqual(span.attributes['retries'], 0)
+
+    def test_untraced_client(self):
+        client = Client('token')
+        with patch.object(client._session, 'request', return_value=_response({'results': [], 'next': None})):
+            self.assertEqual(_Listing(client=client, endpoint=client._TRADING_REST_URL).list_all(), [])
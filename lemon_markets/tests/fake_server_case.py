@@ -0,0 +1,27 @@
+from unittest import TestCase
+
+from lemon_markets.account import Account
+from lemon_markets.client import Client
+from lemon_markets.helpers.fake_server import FakeServer
+
+
+class _FakeServerTestCase(TestCase):
+    """Runs its tests against one fake server, with a new client and account for every test."""
+
+    # passed on to the FakeServer of the test case
+    server_options = {'instruments': 120, 'spaces': 0, 'page_size': 50}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeServer(token='token', **cls.server_options).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.client = Client('token', base_url=self.server.url)
+        self.account = Account(self.client)
+
+    def tearDown(self):
+        self.client.close()
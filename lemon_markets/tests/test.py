@@ -1,8 +1,27 @@
 import unittest
 
 from .ctest_account import _TestAccount
+from .ctest_batch import _TestBatch
+from .ctest_benchmarks import _TestBenchmarks
+from .ctest_cache import _TestMemoryCache, _TestResponseCache, _TestSQLiteCache
+from .ctest_cassette import _TestCassette
+from .ctest_decoding import _TestDecoding
+from .ctest_fake_server import _TestFakeServer
+from .ctest_hedging import _TestCircuitBreaker, _TestHedgePolicy
+from .ctest_http2 import _TestHTTP2Adapter
+from .ctest_imports import _TestImports
 from .ctest_instrument import _TestInstrument, _TestInstruments
+from .ctest_instrument_list import _TestInstrumentList
+from .ctest_instrument_registry import _TestInstrumentRegistry
+from .ctest_instrument_store import _TestInstrumentStore
+from .ctest_instrument_table import _TestInstrumentTable
 from .ctest_market_data import _TestOHLC
+from .ctest_metrics import _TestEndpointTemplate, _TestMetricsRegistry
+from .ctest_rate_limit import _TestParseRetryAfter, _TestRateLimiter
+from .ctest_retry import _TestRetryPolicy
+from .ctest_search_index import _TestSearchIndex
+from .ctest_single_flight import _TestSingleFlight
+from .ctest_tracing import _TestTracer
 from .ctest_venues import _TestVenue, _TestVenues
 
 
@@ -14,6 +33,30 @@ def _suite():
     suite.addTest(_TestVenues())
     suite.addTest(_TestVenue())
     suite.addTest(_TestOHLC())
+    suite.addTest(_TestRateLimiter())
+    suite.addTest(_TestParseRetryAfter())
+    suite.addTest(_TestRetryPolicy())
+    suite.addTest(_TestResponseCache())
+    suite.addTest(_TestMemoryCache())
+    suite.addTest(_TestSQLiteCache())
+    suite.addTest(_TestSingleFlight())
+    suite.addTest(_TestDecoding())
+    suite.addTest(_TestEndpointTemplate())
+    suite.addTest(_TestMetricsRegistry())
+    suite.addTest(_TestTracer())
+    suite.addTest(_TestCassette())
+    suite.addTest(_TestFakeServer())
+    suite.addTest(_TestBenchmarks())
+    suite.addTest(_TestBatch())
+    suite.addTest(_TestHTTP2Adapter())
+    suite.addTest(_TestImports())
+    suite.addTest(_TestHedgePolicy())
+    suite.addTest(_TestCircuitBreaker())
+    suite.addTest(_TestInstrumentRegistry())
+    suite.addTest(_TestInstrumentStore())
+    suite.addTest(_TestSearchIndex())
+    suite.addTest(_TestInstrumentList())
+    suite.addTest(_TestInstrumentTable())
     return suite
 
 
@@ -2,10 +2,13 @@
 
 from dataclasses import dataclass
 from datetime import datetime, time, timedelta
+from typing import List
 
 from lemon_markets.account import Account
 from lemon_markets.helpers.api_client import _ApiClient
+from lemon_markets.helpers.async_api_client import _AsyncApiClient
 from lemon_markets.helpers.time_helper import parse_datetime
+from lemon_markets.helpers.tracing import traced
 
 
 class TradingVenues(_ApiClient):
@@ -32,10 +35,12 @@ class TradingVenues(_ApiClient):
         super().__init__(account=_account)
         self.get_venues()
 
+    @traced
     def get_venues(self):
         """Load the list of trading venues."""
-        data = self._request(endpoint='venues/')
-        data_rows = data['results']
+        # all pages, as they replace the venues shared by the client
+        data_rows = self._request_paged(endpoint='venues/')
+        self._client._venues.update(data_rows)
         self.trading_venues = [TradingVenue._from_response(
             self._account, data) for data in data_rows]
 
@@ -100,7 +105,7 @@ class TradingVenue(_ApiClient):
         )
 
     def __post_init__(self):
-        super().__init__(self._account)
+        super().__init__(account=self._account)
 
     @property
     def is_open(self) -> bool:
@@ -158,3 +163,79 @@ class TradingVenue(_ApiClient):
             if local_now > local_open:
                 continue
             return local_open - local_now
+
+
+class AsyncTradingVenues(_AsyncApiClient):
+    """
+    Available trading venues, for use with asyncio.
+
+    Attributes
+    ----------
+    trading_venues : list[TradingVenue]
+        The trading venues from the last call of :meth:`get_venues`.
+
+    Parameters
+    ----------
+    account : Account
+        Your auth data
+
+    """
+
+    trading_venues = None
+
+    def __init__(self, account: Account):
+        """Create the client, the venues are loaded by :meth:`get_venues`."""
+        super().__init__(account=account)
+
+    @traced
+    async def get_venues(self) -> List[TradingVenue]:
+        """
+        Load the list of trading venues.
+
+        Returns
+        -------
+        List[TradingVenue]
+            All trading venues
+
+        """
+        # all pages, as they replace the venues shared by the client
+        data_rows = await self._request_paged(endpoint='venues/')
+        self._client._venues.update(data_rows)
+        self.trading_venues = [TradingVenue._from_response(self._account, data) for data in data_rows]
+        return self.trading_venues
+
+    @traced
+    async def get_venue(self, mic: str) -> TradingVenue:
+        """
+        Get a trading venue by its mic.
+
+        Parameters
+        ----------
+        mic : str
+            The mic identifier of the venue
+
+        Returns
+        -------
+        TradingVenue
+            The trading venue
+
+        """
+        data = (await self._request(f'venues?mic={mic}'))['results'][0]
+        return TradingVenue._from_response(self._account, data)
+
+    async def is_open(self, venue: TradingVenue) -> bool:
+        """
+        Check if a venue is open.
+
+        Parameters
+        ----------
+        venue : TradingVenue
+            The venue to check
+
+        Returns
+        -------
+        bool
+            `True` if the venue is currently open, `False` otherwise.
+
+        """
+        return (await self._request(f'venues?mic={venue.mic}'))['results'][0]['is_open']
@@ -25,4 +25,11 @@ if __name__ == '__main__':
             'pytz',
             'requests'
         ],
+        extras_require={
+            'async': ['httpx'],
+            'http2': ['httpx[http2]'],
+            'compression': ['brotli', 'zstandard'],
+            'speedups': ['orjson'],
+            'arrow': ['pyarrow']
+        },
     )